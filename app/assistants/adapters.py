@@ -42,10 +42,21 @@ class DeliveryAdapterRegistry:
 
     def __init__(self) -> None:
         self._adapters: Dict[str, AdapterFn] = {}
+        self._limits: Dict[str, int] = {}
         self._noop = _NoOpAdapter()
 
-    def register(self, channel: str, handler: AdapterFn) -> None:
+    def register(
+        self, channel: str, handler: AdapterFn, *, concurrency: Optional[int] = None
+    ) -> None:
+        """Register ``handler``; ``concurrency`` caps in-flight outbox sends."""
         self._adapters[channel.lower()] = handler
+        if concurrency:
+            self._limits[channel.lower()] = concurrency
+        else:
+            self._limits.pop(channel.lower(), None)
+
+    def concurrency_for(self, channel: str, default: int) -> int:
+        return self._limits.get(channel.lower(), default)
 
     def adapter_for_channel(self, channel: str) -> _CallableAdapter | _NoOpAdapter:
         handler = self._adapters.get(channel.lower())
@@ -58,6 +69,7 @@ class DeliveryAdapterRegistry:
 
     def clear(self) -> None:
         self._adapters.clear()
+        self._limits.clear()
 
 
 __all__ = ["DeliveryAdapterRegistry", "AdapterFn"]
@@ -0,0 +1,384 @@
+"""Event bus behind the assistants SSE stream.
+
+Events are framed as SSE bytes once at publish time and the same buffer is
+handed to every subscriber. Each bus keeps the most recent events in a ring
+buffer so a reconnecting client can resume from ``Last-Event-ID``.
+
+Subscribers get a bounded queue. A subscriber whose queue fills up is
+disconnected rather than silently skipped; EventSource reconnects with the
+last id it saw and catches up from the ring buffer.
+
+Backends:
+
+- ``memory`` (default): in-process fan-out; fine for a single worker.
+- ``redis``: events are appended to a Redis Stream (``XADD``, trimmed to the
+  replay size) and every worker tails it with ``XREAD``, so all workers see
+  every event in the same order with the same ids. If ``XADD`` fails the
+  event is still delivered to this worker's subscribers, under a
+  ``local-`` id that cannot be ordered against stream ids; resuming across
+  such an event sends ``event: reset`` instead of trusting id order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+try:  # optional: only needed for the redis backend
+    import redis.asyncio as aioredis  # type: ignore
+except ImportError:  # pragma: no cover - exercised only without redis installed
+    aioredis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+PING_FRAME = b"event: ping\ndata: {}\n\n"
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+# Prefix of ids for events that never reached the shared stream.
+LOCAL_ID_PREFIX = "local-"
+
+EVENTS_PUBLISHED = Counter(
+    "assistants_events_published_total", "Events published to the SSE bus", ["backend"]
+)
+EVENTS_REPLAYED = Counter(
+    "assistants_events_replayed_total", "Events replayed to reconnecting subscribers"
+)
+SLOW_CONSUMER_DISCONNECTS = Counter(
+    "assistants_events_slow_consumer_disconnects_total",
+    "Subscribers disconnected because their queue was full",
+)
+SUBSCRIBERS = Gauge("assistants_events_subscribers", "Connected SSE subscribers")
+DELIVERY_LAG = Histogram(
+    "assistants_events_delivery_lag_seconds",
+    "Time from publish until a subscriber dequeues the event",
+    buckets=(0.005, 0.025, 0.1, 0.5, 1, 2.5, 5, 15, 60),
+)
+SUBSCRIBER_BACKLOG = Histogram(
+    "assistants_events_subscriber_backlog",
+    "Events still queued for a subscriber when it dequeues one",
+    buckets=(0, 1, 5, 25, 100, 250, 500, 1000),
+)
+
+
+def event_key(event_id: Optional[str]) -> Tuple[int, int]:
+    """Sort key for ``<ms>-<seq>`` ids (the Redis Streams format).
+
+    Unparseable ids, including ``local-`` ones, sort before everything.
+    """
+    if not event_id:
+        return (-1, -1)
+    ms, _, seq = event_id.partition("-")
+    try:
+        return (int(ms), int(seq or 0))
+    except ValueError:
+        return (-1, -1)
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    id: str
+    data: bytes
+    frame: bytes
+
+    @classmethod
+    def create(cls, event_id: str, data: bytes) -> "Event":
+        return cls(event_id, data, b"id: " + event_id.encode() + b"\ndata: " + data + b"\n\n")
+
+    @property
+    def published_at(self) -> float:
+        return event_key(self.id.removeprefix(LOCAL_ID_PREFIX))[0] / 1000.0
+
+    @property
+    def local(self) -> bool:
+        return self.id.startswith(LOCAL_ID_PREFIX)
+
+
+class SlowConsumerError(Exception):
+    """Raised by :meth:`Subscription.get` once the bus dropped the subscriber."""
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: "asyncio.Queue[Event]"
+    gap: bool = False
+    closed: Optional[str] = None
+    delivered: int = 0
+    last_event_id: Optional[str] = None
+    connected_at: float = field(default_factory=time.time)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, ``None`` on timeout; raises once the bus closed us."""
+        if self.closed:
+            raise SlowConsumerError(self.closed)
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if self.closed:
+            raise SlowConsumerError(self.closed)
+        self.delivered += 1
+        self.last_event_id = event.id
+        DELIVERY_LAG.observe(max(0.0, time.time() - event.published_at))
+        SUBSCRIBER_BACKLOG.observe(self.queue.qsize())
+        return event
+
+    @property
+    def backlog(self) -> int:
+        return self.queue.qsize()
+
+
+class MemoryEventBus:
+    """In-process fan-out with a replay ring buffer."""
+
+    backend = "memory"
+
+    def __init__(self, *, queue_size: int = 1000, replay_size: int = 1000) -> None:
+        self.queue_size = queue_size
+        self._ring: Deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self._seq = count()
+        self._last_ms = 0
+        # Events at or below this key may be missing from the ring: anything
+        # from before this process started, then whatever the ring evicted.
+        self._floor = (int(time.time() * 1000), -1)
+        self.slow_disconnects = 0
+
+    def _next_id(self) -> str:
+        # Millisecond prefix keeps ids increasing across restarts.
+        self._last_ms = max(self._last_ms, int(time.time() * 1000))
+        return f"{self._last_ms}-{next(self._seq)}"
+
+    async def start(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def publish(self, data: bytes) -> str:
+        event = Event.create(self._next_id(), data)
+        self._deliver(event)
+        EVENTS_PUBLISHED.labels(backend=self.backend).inc()
+        return event.id
+
+    def _deliver(self, event: Event) -> None:
+        if len(self._ring) == self._ring.maxlen:
+            self._floor = max(self._floor, event_key(self._ring[0].id))
+        self._ring.append(event)
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(sub)
+
+    def _drop(self, sub: Subscription) -> None:
+        sub.closed = "slow_consumer"
+        self._subscribers.discard(sub)
+        self.slow_disconnects += 1
+        SLOW_CONSUMER_DISCONNECTS.inc()
+        SUBSCRIBERS.set(len(self._subscribers))
+        logger.warning(
+            "Disconnecting slow SSE subscriber (backlog %d, last id %s)",
+            sub.backlog,
+            sub.last_event_id,
+        )
+
+    def _unordered(self, last_event_id: str) -> bool:
+        """True when local-only events make id order meaningless for a resume."""
+        return last_event_id.startswith(LOCAL_ID_PREFIX) or any(
+            event.local for event in self._ring
+        )
+
+    async def _history_after(self, last_event_id: str) -> Tuple[List[Event], bool]:
+        """Retained events newer than ``last_event_id`` and whether some were lost."""
+        if last_event_id.startswith(LOCAL_ID_PREFIX):
+            return [], True
+        after = event_key(last_event_id)
+        missed = [event for event in self._ring if event_key(event.id) > after]
+        return missed, after < self._floor or self._unordered(last_event_id)
+
+    async def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        await self.start()
+        sub = Subscription(asyncio.Queue(maxsize=self.queue_size))
+        if last_event_id:
+            ring_head = max((event_key(event.id) for event in self._ring), default=(-1, -1))
+            missed, sub.gap = await self._history_after(last_event_id)
+            # Events delivered while history was being fetched.
+            if missed:
+                seen = event_key(missed[-1].id)
+            elif last_event_id.startswith(LOCAL_ID_PREFIX):
+                seen = ring_head
+            else:
+                seen = event_key(last_event_id)
+            missed.extend(event for event in self._ring if event_key(event.id) > seen)
+            if len(missed) > self.queue_size:
+                missed, sub.gap = missed[-self.queue_size :], True
+            for event in missed:
+                sub.queue.put_nowait(event)
+            EVENTS_REPLAYED.inc(len(missed))
+        self._subscribers.add(sub)
+        SUBSCRIBERS.set(len(self._subscribers))
+        return sub
+
+    async def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+        SUBSCRIBERS.set(len(self._subscribers))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "backend": self.backend,
+            "replay_buffer": len(self._ring),
+            "last_event_id": self._ring[-1].id if self._ring else None,
+            "slow_consumer_disconnects": self.slow_disconnects,
+            "subscribers": [
+                {
+                    "backlog": sub.backlog,
+                    "delivered": sub.delivered,
+                    "last_event_id": sub.last_event_id,
+                    "connected_seconds": round(now - sub.connected_at, 1),
+                }
+                for sub in self._subscribers
+            ],
+        }
+
+
+class RedisEventBus(MemoryEventBus):
+    """Shares events between workers through a Redis Stream."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        stream: str,
+        *,
+        queue_size: int = 1000,
+        replay_size: int = 1000,
+        block_ms: int = 5000,
+    ) -> None:
+        if aioredis is None:
+            raise RuntimeError("ASSISTANTS_EVENT_BUS=redis requires the redis package")
+        super().__init__(queue_size=queue_size, replay_size=replay_size)
+        self.stream = stream
+        self.replay_size = replay_size
+        self.block_ms = block_ms
+        self._redis = aioredis.from_url(url)
+        self._reader: Optional[asyncio.Task[None]] = None
+        self._cursor = "$"
+
+    async def start(self) -> None:
+        if self._reader is not None and not self._reader.done():
+            return
+        # Seed the ring from the stream tail so replay survives a restart.
+        try:
+            tail = await self._redis.xrevrange(self.stream, count=self.replay_size)
+        except Exception:
+            logger.exception("Could not read %s; starting with an empty buffer", self.stream)
+        else:
+            for entry_id, fields in reversed(tail):
+                self._ring.append(Event.create(_text(entry_id), fields[b"d"]))
+            self._cursor = self._ring[-1].id if self._ring else "0-0"
+            if self._ring:
+                self._floor = min(self._floor, event_key(self._ring[0].id))
+        self._reader = asyncio.create_task(self._read_loop(), name="assistants-event-reader")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self._redis.aclose()
+
+    async def publish(self, data: bytes) -> str:
+        try:
+            entry_id = await self._redis.xadd(
+                self.stream, {"d": data}, maxlen=self.replay_size, approximate=True
+            )
+        except Exception:
+            # Keep local subscribers informed even if Redis is unavailable. The
+            # id is marked local: it does not interleave with stream ids, so a
+            # client resuming across it is reset rather than compared by id.
+            logger.exception("XADD to %s failed; delivering locally only", self.stream)
+            event = Event.create(LOCAL_ID_PREFIX + self._next_id(), data)
+            self._deliver(event)
+            EVENTS_PUBLISHED.labels(backend=self.backend).inc()
+            return event.id
+        EVENTS_PUBLISHED.labels(backend=self.backend).inc()
+        return _text(entry_id)
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                batches = await self._redis.xread(
+                    {self.stream: self._cursor}, block=self.block_ms, count=500
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("XREAD on %s failed; retrying", self.stream)
+                await asyncio.sleep(1.0)
+                continue
+            for _, entries in batches or []:
+                for entry_id, fields in entries:
+                    self._cursor = _text(entry_id)
+                    self._deliver(Event.create(self._cursor, fields[b"d"]))
+
+    async def _history_after(self, last_event_id: str) -> Tuple[List[Event], bool]:
+        missed, gap = await super()._history_after(last_event_id)
+        if not gap or last_event_id.startswith(LOCAL_ID_PREFIX):
+            return missed, gap
+        # Older than the local ring: the stream may still hold it.
+        try:
+            entries = await self._redis.xrange(self.stream, min=f"({last_event_id}", max="+")
+            oldest = await self._redis.xrange(self.stream, count=1)
+        except Exception:
+            logger.exception("XRANGE on %s failed; replaying local buffer", self.stream)
+            return missed, True
+        events = [Event.create(_text(entry_id), fields[b"d"]) for entry_id, fields in entries]
+        gap = not oldest or event_key(_text(oldest[0][0])) > event_key(last_event_id)
+        return events, gap or self._unordered(last_event_id)
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def create_event_bus() -> MemoryEventBus:
+    """Build the bus selected by ``ASSISTANTS_EVENT_BUS`` (memory or redis)."""
+    queue_size = int(os.getenv("EVENT_QUEUE_MAXSIZE", "1000"))
+    replay_size = int(os.getenv("ASSISTANTS_EVENT_REPLAY", "1000"))
+    backend = os.getenv("ASSISTANTS_EVENT_BUS", "memory").lower()
+    if backend == "redis":
+        return RedisEventBus(
+            os.getenv("ASSISTANTS_EVENT_REDIS_URL")
+            or os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            os.getenv("ASSISTANTS_EVENT_STREAM", "assistants:events"),
+            queue_size=queue_size,
+            replay_size=replay_size,
+        )
+    if backend != "memory":
+        raise RuntimeError(f"Unknown ASSISTANTS_EVENT_BUS backend: {backend}")
+    return MemoryEventBus(queue_size=queue_size, replay_size=replay_size)
+
+
+__all__ = [
+    "Event",
+    "LOCAL_ID_PREFIX",
+    "MemoryEventBus",
+    "PING_FRAME",
+    "RESET_FRAME",
+    "RedisEventBus",
+    "SlowConsumerError",
+    "Subscription",
+    "create_event_bus",
+]
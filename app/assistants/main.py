@@ -3,15 +3,21 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import base64
+import html
 import json
+import logging
 import os
+import random
 import re
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set, Tuple
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import HTTPException, Request
+from fastapi import Header, HTTPException, Request
 from fastapi.applications import FastAPI
 from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -20,15 +26,29 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Float,
+    ForeignKey,
+    Index,
     Integer,
     String,
     Text,
-    create_engine,
+    and_,
+    bindparam,
+    delete,
     func,
+    insert,
+    literal,
+    literal_column,
+    or_,
     select,
+    text,
+    tuple_,
+    update,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
-from prometheus_client import generate_latest
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from prometheus_client import Counter, generate_latest
 # Optional telemetry; disable if not installed
 try:
     from opentelemetry import trace  # type: ignore
@@ -48,26 +68,54 @@ except Exception:
     from adapters import DeliveryAdapterRegistry
 
 # ---------------------------------------------------------------------------
-from .rag_integration import cleanup_rag_resources, generate_rag_draft
+from .event_bus import PING_FRAME, RESET_FRAME, SlowConsumerError, create_event_bus
+from .rag_integration import (
+    RAGError,
+    RAGTimeout,
+    cleanup_rag_resources,
+    generate_rag_draft,
+    generate_rag_drafts,
+)
+
+logger = logging.getLogger(__name__)
 
 # Database setup
 # ---------------------------------------------------------------------------
 
 
 def _database_url() -> str:
-    return os.getenv("ASSISTANTS_DB_URL", "sqlite:///./assistants.db")
+    raw = os.getenv("ASSISTANTS_DB_URL", "sqlite+aiosqlite:///./assistants.db")
+    if raw.startswith("sqlite:///"):
+        return raw.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if raw.startswith("postgresql+psycopg2://"):
+        return raw.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if raw.startswith("postgresql://"):
+        return raw.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return raw
+
+
+def _engine_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "echo": False,
+        "pool_pre_ping": os.getenv("ASSISTANTS_DB_POOL_PRE_PING", "true").lower()
+        in {"1", "true", "yes"},
+    }
+    if not IS_SQLITE:
+        # SQLite (aiosqlite) uses a single-writer file; pool sizing applies to Postgres
+        options.update(
+            pool_size=int(os.getenv("ASSISTANTS_DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("ASSISTANTS_DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("ASSISTANTS_DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("ASSISTANTS_DB_POOL_RECYCLE", "1800")),
+        )
+    return options
 
 
 DATABASE_URL = _database_url()
 IS_SQLITE = DATABASE_URL.startswith("sqlite")
-ENGINE = create_engine(
-    DATABASE_URL,
-    future=True,
-    echo=False,
-    connect_args={"check_same_thread": False} if IS_SQLITE else {},
-)
-SessionLocal = sessionmaker(
-    bind=ENGINE, autoflush=False, autocommit=False, expire_on_commit=False
+ENGINE = create_async_engine(DATABASE_URL, **_engine_options())
+SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    ENGINE, autoflush=False, expire_on_commit=False
 )
 
 
@@ -79,7 +127,7 @@ class DraftModel(Base):
     __tablename__ = "drafts"
 
     id: Mapped[str] = mapped_column(
-        String(64), primary_key=True, default=lambda: f"d{uuid4().hex}"
+        String(64), primary_key=True, default=lambda: new_draft_id()
     )
     channel: Mapped[str] = mapped_column(String(16), nullable=False)
     conversation_id: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -110,6 +158,8 @@ class DraftModel(Base):
     extra_metadata: Mapped[Dict[str, Any]] = mapped_column(
         "metadata", JSON, default=dict
     )
+    # Legacy JSON history: superseded by draft_notes / draft_audit_events and
+    # emptied by the backfill in _migrate(); kept so old rows stay readable.
     notes: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
     learning_notes: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
     assigned_to: Mapped[Optional[str]] = mapped_column(String(255))
@@ -119,7 +169,298 @@ class DraftModel(Base):
     usd_sent_copy: Mapped[bool] = mapped_column(Boolean, default=False)
 
 
-Base.metadata.create_all(ENGINE)
+class DraftAuditEvent(Base):
+    """Append-only audit trail; one row per action on a draft."""
+
+    __tablename__ = "draft_audit_events"
+    __table_args__ = (
+        Index("ix_draft_audit_events_draft_ts", "draft_id", "ts", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    draft_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False
+    )
+    ts: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), nullable=False, default=lambda: utc_now()
+    )
+    actor: Mapped[str] = mapped_column(String(255), nullable=False)
+    action: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+
+
+class DraftNote(Base):
+    """Append-only operator notes (including JSON feedback notes)."""
+
+    __tablename__ = "draft_notes"
+    __table_args__ = (
+        Index("ix_draft_notes_draft_created", "draft_id", "created_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    draft_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False
+    )
+    note_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    author_user_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), nullable=False, default=lambda: utc_now()
+    )
+
+
+class DeliveryOutbox(Base):
+    """Transactional outbox: one row per outbound message, written with the draft."""
+
+    __tablename__ = "delivery_outbox"
+    __table_args__ = (
+        Index("ix_delivery_outbox_due", "status", "next_attempt_at"),
+        Index("ix_delivery_outbox_draft", "draft_id"),
+        Index("ix_delivery_outbox_claim", "claim_token"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
+    draft_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False
+    )
+    channel: Mapped[str] = mapped_column(String(16), nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    # pending -> sending -> sent | failed (pending again between retries)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), nullable=False, default=lambda: utc_now()
+    )
+    claim_token: Mapped[Optional[str]] = mapped_column(String(32))
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False))
+    external_id: Mapped[Optional[str]] = mapped_column(String(255))
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), nullable=False, default=lambda: utc_now()
+    )
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False))
+
+
+# Columns rendered by serialize_list; the inbox list selects only these so the
+# heavy Text/JSON columns (incoming/draft text, audit log, notes, snippets,
+# order context...) are never read or decoded for list pages.
+LIST_COLUMNS = (
+    DraftModel.id,
+    DraftModel.channel,
+    DraftModel.conversation_id,
+    DraftModel.customer_display,
+    DraftModel.subject,
+    DraftModel.chat_topic,
+    DraftModel.incoming_excerpt,
+    DraftModel.draft_excerpt,
+    DraftModel.confidence,
+    DraftModel.llm_model,
+    DraftModel.estimated_tokens_in,
+    DraftModel.estimated_tokens_out,
+    DraftModel.usd_cost,
+    DraftModel.created_at,
+    DraftModel.sla_deadline,
+    DraftModel.status,
+    DraftModel.tags,
+    DraftModel.auto_escalated,
+    DraftModel.auto_escalation_reason,
+    DraftModel.assigned_to,
+    DraftModel.escalation_reason,
+)
+
+# Inbox ordering key; keyset cursors and the indexes below share this expression
+SLA_ORDER = func.coalesce(DraftModel.sla_deadline, DraftModel.created_at)
+
+Index(
+    "ix_drafts_status_sla_order",
+    DraftModel.status,
+    SLA_ORDER,
+    DraftModel.created_at,
+    DraftModel.id,
+)
+Index("ix_drafts_sla_order", SLA_ORDER, DraftModel.created_at, DraftModel.id)
+Index("ix_drafts_channel_status", DraftModel.channel, DraftModel.status)
+Index("ix_drafts_assigned_status", DraftModel.assigned_to, DraftModel.status)
+
+
+_schema_ready = False
+_schema_lock = asyncio.Lock()
+
+
+async def init_db() -> None:
+    """Create tables once per process (startup hook, or lazily on first session)."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    async with _schema_lock:
+        if _schema_ready:
+            return
+        async with ENGINE.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_migrate)
+        _schema_ready = True
+
+
+def _migrate(conn: Any) -> None:
+    """Idempotent in-place upgrades for databases created by older releases.
+
+    ``create_all`` only creates missing tables, so indexes added to existing
+    tables are created here.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    _ensure_search_index(conn)
+    _backfill_history(conn)
+
+
+SEARCH_COLUMNS = ("subject", "customer_display", "incoming_text", "draft_text")
+# Postgres text search configuration baked into drafts.search_vector; changing
+# it later requires dropping the column so _migrate recreates it.
+SEARCH_CONFIG = os.getenv("ASSISTANTS_SEARCH_CONFIG", "simple")
+
+
+def _ensure_search_index(conn: Any) -> None:
+    """Create the full-text index over ``SEARCH_COLUMNS``.
+
+    SQLite gets an external-content FTS5 table kept in step by triggers (and
+    rebuilt from ``drafts`` when first created); Postgres gets a generated
+    weighted ``tsvector`` column with a GIN index. Either way every insert or
+    update of the searchable columns is indexed by the database itself.
+
+    ``drafts`` has a string primary key, so its implicit rowid is not stable
+    (``VACUUM`` may renumber it). The FTS table is therefore keyed on
+    ``drafts.search_rowid``, an integer assigned once per draft by the insert
+    trigger.
+    """
+    columns = ", ".join(SEARCH_COLUMNS)
+    if IS_SQLITE:
+        ddl = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'drafts_fts'")
+        ).scalar()
+        if ddl is not None and "content_rowid='search_rowid'" not in ddl:
+            # Index from older releases, keyed on the implicit rowid.
+            for trigger in ("drafts_fts_ai", "drafts_fts_ad", "drafts_fts_au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            conn.execute(text("DROP TABLE drafts_fts"))
+            ddl = None
+        draft_columns = set(
+            conn.execute(text("SELECT name FROM pragma_table_info('drafts')")).scalars()
+        )
+        if "search_rowid" not in draft_columns:
+            conn.execute(text("ALTER TABLE drafts ADD COLUMN search_rowid INTEGER"))
+            conn.execute(text("UPDATE drafts SET search_rowid = rowid"))
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ux_drafts_search_rowid "
+                "ON drafts (search_rowid)"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS drafts_fts USING fts5({columns}, "
+                "content='drafts', content_rowid='search_rowid', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        )
+        new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+        assign = (
+            "UPDATE drafts SET search_rowid = "
+            "(SELECT coalesce(max(search_rowid), 0) + 1 FROM drafts) "
+            "WHERE rowid = new.rowid;"
+        )
+        insert_new = (
+            f"INSERT INTO drafts_fts(rowid, {columns}) "
+            f"SELECT search_rowid, {new_values} FROM drafts WHERE rowid = new.rowid;"
+        )
+        add = f"INSERT INTO drafts_fts(rowid, {columns}) VALUES (new.search_rowid, {new_values});"
+        remove = (
+            f"INSERT INTO drafts_fts(drafts_fts, rowid, {columns}) "
+            f"VALUES ('delete', old.search_rowid, {old_values});"
+        )
+        for name, event, body in (
+            ("drafts_fts_ai", "AFTER INSERT", assign + " " + insert_new),
+            ("drafts_fts_ad", "AFTER DELETE", remove),
+            ("drafts_fts_au", f"AFTER UPDATE OF {columns}", remove + " " + add),
+        ):
+            conn.execute(
+                text(f"CREATE TRIGGER IF NOT EXISTS {name} {event} ON drafts BEGIN {body} END")
+            )
+        if ddl is None:
+            conn.execute(text("INSERT INTO drafts_fts(drafts_fts) VALUES ('rebuild')"))
+        return
+
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", SEARCH_CONFIG):
+        raise ValueError(f"Invalid ASSISTANTS_SEARCH_CONFIG: {SEARCH_CONFIG!r}")
+    vector = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(SEARCH_COLUMNS, "ABCD")
+    )
+    conn.execute(
+        text(
+            "ALTER TABLE drafts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_drafts_search ON drafts USING GIN (search_vector)")
+    )
+
+
+def _backfill_history(conn: Any, batch_size: int = 500) -> None:
+    """Move JSON ``audit_log`` / ``notes`` arrays into the append-only tables.
+
+    Each migrated draft has its arrays emptied in the same transaction, so
+    the backfill is idempotent and only touches rows that still carry JSON
+    history.
+    """
+    drafts = DraftModel.__table__
+    pending = (
+        select(drafts.c.id, drafts.c.audit_log, drafts.c.notes)
+        .where(
+            (func.json_array_length(drafts.c.audit_log) > 0)
+            | (func.json_array_length(drafts.c.notes) > 0)
+        )
+        .limit(batch_size)
+    )
+    while True:
+        rows = conn.execute(pending).all()
+        if not rows:
+            return
+        events: List[Dict[str, Any]] = []
+        notes: List[Dict[str, Any]] = []
+        for draft_id, audit_log, legacy_notes in rows:
+            for entry in audit_log or []:
+                events.append(
+                    {
+                        "draft_id": draft_id,
+                        "ts": parse_iso8601(entry.get("timestamp")) or utc_now(),
+                        "actor": str(entry.get("actor") or "unknown"),
+                        "action": str(entry.get("action") or "event"),
+                        "payload": entry.get("payload") or {},
+                    }
+                )
+            for index, note in enumerate(legacy_notes or []):
+                notes.append(
+                    {
+                        "draft_id": draft_id,
+                        "note_id": str(note.get("note_id") or f"n{index + 1}"),
+                        "author_user_id": str(note.get("author_user_id") or "unknown"),
+                        "text": str(note.get("text") or ""),
+                        "created_at": parse_iso8601(note.get("created_at")) or utc_now(),
+                    }
+                )
+        if events:
+            conn.execute(DraftAuditEvent.__table__.insert(), events)
+        if notes:
+            conn.execute(DraftNote.__table__.insert(), notes)
+        conn.execute(
+            drafts.update()
+            .where(drafts.c.id.in_([row[0] for row in rows]))
+            .values(audit_log=[], notes=[])
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -131,6 +472,29 @@ VALID_STATUSES = {"pending", "needs_review", "escalated", "sent"}
 DEFAULT_CHANNELS = {"email", "chat", "sms", "social", "instagram", "tiktok", "shopify"}
 MAX_EXCERPT_LEN = 160
 DEFAULT_REFRESH_SECONDS = 30
+COUNT_CACHE_SECONDS = float(os.getenv("ASSISTANTS_COUNT_CACHE_SECONDS", "30"))
+COUNT_MODES = {"exact", "cached", "none"}
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_TERMS = 16
+TICKET_CACHE_SIZE = int(os.getenv("ASSISTANTS_TICKET_CACHE_SIZE", "2048"))
+BULK_MAX_ITEMS = int(os.getenv("ASSISTANTS_BULK_MAX_ITEMS", "500"))
+RAG_BATCH_MAX_ITEMS = int(os.getenv("ASSISTANTS_RAG_BATCH_MAX_ITEMS", "200"))
+DELIVERY_WORKER_ENABLED = os.getenv("ASSISTANTS_DELIVERY_WORKER", "1").lower() not in {
+    "0",
+    "false",
+    "no",
+}
+DELIVERY_CONCURRENCY = int(os.getenv("ASSISTANTS_DELIVERY_CONCURRENCY", "4"))
+DELIVERY_BATCH_SIZE = int(os.getenv("ASSISTANTS_DELIVERY_BATCH_SIZE", "50"))
+DELIVERY_MAX_ATTEMPTS = int(os.getenv("ASSISTANTS_DELIVERY_MAX_ATTEMPTS", "8"))
+DELIVERY_BACKOFF_SECONDS = float(os.getenv("ASSISTANTS_DELIVERY_BACKOFF_SECONDS", "2"))
+DELIVERY_BACKOFF_MAX_SECONDS = float(
+    os.getenv("ASSISTANTS_DELIVERY_BACKOFF_MAX_SECONDS", "300")
+)
+DELIVERY_TIMEOUT_SECONDS = float(os.getenv("ASSISTANTS_DELIVERY_TIMEOUT_SECONDS", "30"))
+DELIVERY_LEASE_SECONDS = float(os.getenv("ASSISTANTS_DELIVERY_LEASE_SECONDS", "120"))
+DELIVERY_POLL_SECONDS = float(os.getenv("ASSISTANTS_DELIVERY_POLL_SECONDS", "2"))
+BULK_ACTIONS = {"approve", "escalate", "assign"}
 UNASSIGNED_ASSIGNEE = "__unassigned__"
 EVENT_PING_SECONDS = 15
 
@@ -154,40 +518,7 @@ STATUS_MAP = {
 CUSTOMER_DISPLAY_PATTERN = re.compile(r"^(.*?)(?:\s*<([^>]+)>)?$")
 
 
-class EventBroker:
-    """Minimal async pub/sub used to fan out approval events over SSE.
-
-    Bounded queue to prevent unbounded memory growth under backpressure.
-    Size can be tuned via EVENT_QUEUE_MAXSIZE env var (default: 1000).
-    """
-
-    def __init__(self) -> None:
-        self._listeners: Set[asyncio.Queue[str]] = set()
-        self._lock = asyncio.Lock()
-        self._maxsize: int = int(os.getenv("EVENT_QUEUE_MAXSIZE", "1000"))
-
-    async def subscribe(self) -> asyncio.Queue[str]:
-        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self._maxsize)
-        async with self._lock:
-            self._listeners.add(queue)
-        return queue
-
-    async def unsubscribe(self, queue: asyncio.Queue[str]) -> None:
-        async with self._lock:
-            self._listeners.discard(queue)
-
-    async def publish(self, payload: Dict[str, Any]) -> None:
-        data = json.dumps(payload)
-        async with self._lock:
-            listeners = list(self._listeners)
-        for listener in listeners:
-            try:
-                listener.put_nowait(data)
-            except asyncio.QueueFull:  # pragma: no cover - unbounded queue by default
-                continue
-
-
-events = EventBroker()
+events = create_event_bus()
 FALLBACK_CUSTOMER_NAME = "Customer"
 FALLBACK_ASSISTANT_ACTOR = "Assistant"
 
@@ -273,6 +604,31 @@ class NoteCreate(BaseModel):
     text: str
 
 
+class RagDraftBatch(BaseModel):
+    items: List[DraftCreate] = Field(min_length=1)
+
+
+class BulkItem(BaseModel):
+    draft_id: str
+    action: str
+    assign_to: Optional[str] = None
+    reason: Optional[str] = None
+    send_copy_to_customer: bool = False
+
+    @field_validator("action")
+    @classmethod
+    def validate_action(cls, value: str) -> str:
+        lowered = value.lower()
+        if lowered not in BULK_ACTIONS:
+            raise ValueError(f"Unsupported bulk action '{value}'")
+        return lowered
+
+
+class BulkActions(BaseModel):
+    actor_user_id: str
+    items: List[BulkItem] = Field(min_length=1)
+
+
 # ---------------------------------------------------------------------------
 # Utilities
 # ---------------------------------------------------------------------------
@@ -354,30 +710,68 @@ def parse_assigned_param(value: Optional[str]) -> Optional[str]:
     return token
 
 
-def _session() -> Session:
-    return SessionLocal()
+@asynccontextmanager
+async def _session() -> AsyncIterator[AsyncSession]:
+    await init_db()
+    async with SessionLocal() as session:
+        yield session
+
+
+def new_draft_id() -> str:
+    return f"d{uuid4().hex}"
+
+
+def audit_entry(event: DraftAuditEvent) -> Dict[str, Any]:
+    return {
+        "timestamp": to_iso(event.ts),
+        "actor": event.actor,
+        "action": event.action,
+        "payload": event.payload or {},
+    }
+
+
+def note_entry(note: DraftNote) -> Dict[str, Any]:
+    return {
+        "note_id": note.note_id,
+        "author_user_id": note.author_user_id,
+        "text": note.text,
+        "created_at": to_iso(note.created_at),
+    }
 
 
 def append_audit(
-    record: DraftModel,
+    session: AsyncSession,
+    draft_id: str,
     actor: str,
     action: str,
     payload: Optional[Dict[str, Any]] = None,
-) -> None:
-    payload = payload or {}
-    log = list(record.audit_log or [])
-    log.append(
-        {
-            "timestamp": to_iso(utc_now()),
-            "actor": actor,
-            "action": action,
-            "payload": payload,
-        }
+) -> DraftAuditEvent:
+    """Queue one audit row; an INSERT, never a rewrite of the draft row."""
+    event = DraftAuditEvent(
+        draft_id=draft_id,
+        ts=utc_now(),
+        actor=actor,
+        action=action,
+        payload=payload or {},
     )
-    record.audit_log = log
+    session.add(event)
+    return event
+
+
+async def load_detail(
+    session: AsyncSession, record: DraftModel
+) -> Tuple[Dict[str, Any], "TicketView"]:
+    """Detail payload plus the draft's cached ticket view, history brought up to date."""
+    view = await TICKET_VIEWS.refresh(session, record.id)
+    return serialize_detail(record, list(view.audit), list(view.notes)), view
+
+
+async def detail_for(session: AsyncSession, record: DraftModel) -> Dict[str, Any]:
+    detail, _ = await load_detail(session, record)
+    return detail
 
 
-def compute_time_fields(record: DraftModel) -> Dict[str, Any]:
+def compute_time_fields(record: Any) -> Dict[str, Any]:
     if not record.sla_deadline:
         return {"time_remaining_seconds": None, "overdue": False}
     delta = record.sla_deadline - utc_now()
@@ -397,52 +791,295 @@ def _source_urls(snippets: Optional[List[Any]]) -> List[str]:
     return urls
 
 
-def _draft_sort_key(record: DraftModel) -> Tuple[datetime, datetime]:
+def _draft_sort_key(record: Any) -> Tuple[datetime, datetime]:
     deadline = record.sla_deadline or record.created_at
     return (deadline, record.created_at)
 
 
-def load_drafts(
+def encode_cursor(record: Any) -> str:
+    deadline, created_at = _draft_sort_key(record)
+    raw = json.dumps([deadline.isoformat(), created_at.isoformat(), record.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        deadline, created_at, draft_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(deadline),
+            datetime.fromisoformat(created_at),
+            str(draft_id),
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class CountCache:
+    """Short-lived per-filter totals for the inbox list, cleared on every write."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Dict[Tuple[Any, ...], Tuple[float, int]] = {}
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Tuple[Any, ...], total: int) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+DRAFT_COUNTS = CountCache(COUNT_CACHE_SECONDS)
+
+
+def draft_filters(
+    statuses: Optional[set[str]],
+    channels: Optional[set[str]],
+    assigned: Optional[str],
+) -> List[Any]:
+    filters: List[Any] = []
+    if statuses:
+        filters.append(DraftModel.status.in_(tuple(statuses)))
+    if channels:
+        filters.append(DraftModel.channel.in_(tuple(channels)))
+    if assigned:
+        if assigned == UNASSIGNED_ASSIGNEE:
+            filters.append(DraftModel.assigned_to.is_(None))
+        else:
+            filters.append(DraftModel.assigned_to == assigned)
+    return filters
+
+
+async def load_drafts(
     statuses: Optional[set[str]] = None,
     channels: Optional[set[str]] = None,
     assigned: Optional[str] = None,
     *,
-    sort: bool = False,
-    cursor: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 25,
-) -> Tuple[List[DraftModel], Optional[str], int]:
-    offset = max(cursor, 0)
+    count: str = "cached",
+) -> Tuple[List[Row[Any]], Optional[str], Optional[int]]:
+    """Return one page of list rows ordered by (SLA deadline, created_at, id).
+
+    Rows carry only ``LIST_COLUMNS`` (attribute access, like a DraftModel).
+
+    ``cursor`` is the opaque token from a previous page's ``next_cursor``;
+    a bare integer is still accepted as a legacy offset. ``count`` selects
+    how ``total`` is produced: ``exact`` (COUNT query), ``cached`` (reuse a
+    recent count for the same filters) or ``none``.
+    """
     page_size = max(limit, 1)
+    filters = draft_filters(statuses, channels, assigned)
+
+    stmt = select(*LIST_COLUMNS).where(*filters)
+    offset = 0
+    if cursor and cursor.isdigit():
+        offset = int(cursor)
+    elif cursor:
+        deadline, created_at, draft_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(SLA_ORDER, DraftModel.created_at, DraftModel.id)
+            > tuple_(
+                literal(deadline, DateTime()),
+                literal(created_at, DateTime()),
+                literal(draft_id),
+            )
+        )
+    stmt = stmt.order_by(
+        SLA_ORDER.asc(), DraftModel.created_at.asc(), DraftModel.id.asc()
+    )
+
+    async with _session() as session:
+        # one extra row tells us whether another page exists without counting
+        records = list(
+            (await session.execute(stmt.offset(offset).limit(page_size + 1))).all()
+        )
+
+        total: Optional[int] = None
+        if count != "none":
+            key = (
+                tuple(sorted(statuses or ())),
+                tuple(sorted(channels or ())),
+                assigned,
+            )
+            total = DRAFT_COUNTS.get(key) if count == "cached" else None
+            if total is None:
+                total_stmt = select(func.count(DraftModel.id)).where(*filters)
+                total = await session.scalar(total_stmt) or 0
+                DRAFT_COUNTS.set(key, total)
+
+    next_cursor = encode_cursor(records[page_size - 1]) if len(records) > page_size else None
+    return records[:page_size], next_cursor, total
+
+
+# Snippet markers are private-use characters so the surrounding customer text
+# can be HTML-escaped before they are turned into <mark> tags.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+SNIPPET_TOKENS = 16
+
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())[:SEARCH_MAX_TERMS]
+
+
+def search_match(terms: List[str]) -> str:
+    """Backend query for ``terms``: all must match, the last one as a prefix."""
+    if IS_SQLITE:
+        return " ".join(f'"{term}"' for term in terms) + "*"
+    return " & ".join(terms) + ":*"
+
+
+def render_snippet(raw: Optional[str]) -> Optional[str]:
+    if not raw:
+        return None
+    return (
+        html.escape(raw)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def encode_search_cursor(score: float, draft_id: str) -> str:
+    raw = json.dumps([score, draft_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
 
-    with _session() as session:
-        stmt = select(DraftModel)
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, draft_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), str(draft_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _search_hits(match: str) -> Any:
+    """Subquery of matching drafts as (rid, score); lower score ranks first."""
+    if IS_SQLITE:
+        weights = "4.0, 3.0, 1.0, 1.0"  # subject, customer, incoming, draft
+        hits = text(
+            f"SELECT rowid AS rid, bm25(drafts_fts, {weights}) AS score "
+            "FROM drafts_fts WHERE drafts_fts MATCH :match"
+        )
+        return hits.bindparams(match=match).columns(rid=Integer, score=Float).subquery("hits")
+    hits = text(
+        "SELECT id AS rid, -ts_rank_cd(search_vector, to_tsquery(CAST(:config AS regconfig), :match)) AS score "
+        "FROM drafts WHERE search_vector @@ to_tsquery(CAST(:config AS regconfig), :match)"
+    )
+    return (
+        hits.bindparams(config=SEARCH_CONFIG, match=match)
+        .columns(rid=String, score=Float)
+        .subquery("hits")
+    )
 
-        if statuses:
-            stmt = stmt.where(DraftModel.status.in_(tuple(statuses)))
-        if channels:
-            stmt = stmt.where(DraftModel.channel.in_(tuple(channels)))
-        if assigned:
-            if assigned == UNASSIGNED_ASSIGNEE:
-                stmt = stmt.where(DraftModel.assigned_to.is_(None))
-            else:
-                stmt = stmt.where(DraftModel.assigned_to == assigned)
 
-        total_stmt = select(func.count()).select_from(stmt.subquery())
-        total = session.scalar(total_stmt) or 0
+async def _search_snippets(
+    session: AsyncSession, match: str, draft_ids: List[str]
+) -> Dict[str, Optional[str]]:
+    """Highlight snippets for one page only; snippet generation is the costly part."""
+    if not draft_ids:
+        return {}
+    if IS_SQLITE:
+        stmt = text(
+            "SELECT d.id, snippet(drafts_fts, -1, :start, :stop, '…', :tokens) "
+            "FROM drafts_fts JOIN drafts AS d ON d.search_rowid = drafts_fts.rowid "
+            "WHERE drafts_fts MATCH :match AND d.id IN :ids"
+        )
+        params = {"tokens": SNIPPET_TOKENS}
+    else:
+        stmt = text(
+            "SELECT id, ts_headline(CAST(:config AS regconfig), "
+            f"concat_ws(' … ', {', '.join(SEARCH_COLUMNS)}), "
+            "to_tsquery(CAST(:config AS regconfig), :match), :options) "
+            "FROM drafts WHERE id IN :ids"
+        )
+        params = {
+            "config": SEARCH_CONFIG,
+            "options": (
+                f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", '
+                f"MaxWords={SNIPPET_TOKENS}, MinWords=6, MaxFragments=2, "
+                'FragmentDelimiter=" … "'
+            ),
+        }
+    stmt = stmt.bindparams(bindparam("ids", expanding=True))
+    result = await session.execute(
+        stmt,
+        {
+            **params,
+            "start": HIGHLIGHT_START,
+            "stop": HIGHLIGHT_STOP,
+            "match": match,
+            "ids": draft_ids,
+        },
+    )
+    return {draft_id: render_snippet(raw) for draft_id, raw in result.all()}
 
-        if sort:
-            order_column = func.coalesce(DraftModel.sla_deadline, DraftModel.created_at)
-            stmt = stmt.order_by(order_column.asc(), DraftModel.created_at.asc())
 
-        page_stmt = stmt.offset(offset).limit(page_size)
-        records = session.scalars(page_stmt).all()
+async def search_drafts(
+    query: str,
+    statuses: Optional[set[str]] = None,
+    channels: Optional[set[str]] = None,
+    assigned: Optional[str] = None,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = 25,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of drafts matching ``query``, best match first.
 
-    consumed = offset + len(records)
-    next_cursor = str(consumed) if consumed < total else None
-    return records, next_cursor, total
+    Subject, customer, incoming and draft text are searched (in that order of
+    weight); every word must match and the last one may be a prefix. Results
+    are keyset-paginated on (score, id) and carry a highlighted ``snippet``.
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain a word")
+    match = search_match(terms)
+    page_size = min(max(limit, 1), SEARCH_MAX_LIMIT)
+
+    hits = _search_hits(match)
+    join_on = (
+        literal_column("drafts.search_rowid") == hits.c.rid
+        if IS_SQLITE
+        else DraftModel.id == hits.c.rid
+    )
+    stmt = (
+        select(*LIST_COLUMNS, hits.c.score)
+        .join_from(DraftModel, hits, join_on)
+        .where(*draft_filters(statuses, channels, assigned))
+    )
+    if cursor:
+        score, draft_id = decode_search_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(hits.c.score, DraftModel.id)
+            > tuple_(literal(score, Float()), literal(draft_id))
+        )
+    stmt = stmt.order_by(hits.c.score.asc(), DraftModel.id.asc()).limit(page_size + 1)
+
+    async with _session() as session:
+        rows = list((await session.execute(stmt)).all())
+        page = rows[:page_size]
+        snippets = await _search_snippets(session, match, [row.id for row in page])
+
+    results = []
+    for row in page:
+        item = serialize_list(row)
+        item["snippet"] = snippets.get(row.id)
+        results.append(item)
+    next_cursor = (
+        encode_search_cursor(page[-1].score, page[-1].id) if len(rows) > page_size else None
+    )
+    return results, next_cursor
 
 
-def serialize_list(record: DraftModel) -> Dict[str, Any]:
+def serialize_list(record: Any) -> Dict[str, Any]:
+    """Render the inbox row; ``record`` is a DraftModel or a LIST_COLUMNS row."""
     timing = compute_time_fields(record)
     return {
         "id": record.id,
@@ -472,7 +1109,11 @@ def serialize_list(record: DraftModel) -> Dict[str, Any]:
     }
 
 
-def serialize_detail(record: DraftModel) -> Dict[str, Any]:
+def serialize_detail(
+    record: DraftModel,
+    audit_log: List[Dict[str, Any]],
+    notes: List[Dict[str, Any]],
+) -> Dict[str, Any]:
     detail = serialize_list(record)
     detail.update(
         {
@@ -484,8 +1125,8 @@ def serialize_detail(record: DraftModel) -> Dict[str, Any]:
             "source_snippets": record.source_snippets or [],
             "conversation_summary": record.conversation_summary or [],
             "order_context": record.order_context or {},
-            "audit_log": record.audit_log or [],
-            "notes": record.notes or [],
+            "audit_log": audit_log,
+            "notes": notes,
             "learning_notes": record.learning_notes or [],
             "metadata": record.extra_metadata or {},
             "model_latency_ms": record.model_latency_ms,
@@ -506,6 +1147,42 @@ def delivery_metadata(record: DraftModel) -> Dict[str, Any]:
     }
 
 
+def enqueue_delivery(session: AsyncSession, record: DraftModel) -> DeliveryOutbox:
+    """Add the outbound message for ``record`` to the caller's transaction.
+
+    The key is stable for a given send (draft id + sent_at), so adapters can
+    drop duplicates if a worker dies between sending and recording success.
+    """
+    key = f"{record.id}:{to_iso(record.sent_at)}"
+    row = DeliveryOutbox(
+        idempotency_key=key,
+        draft_id=record.id,
+        channel=record.channel,
+        payload={**delivery_metadata(record), "idempotency_key": key},
+        status="pending",
+        attempts=0,
+        next_attempt_at=utc_now(),
+    )
+    session.add(row)
+    return row
+
+
+def serialize_delivery(row: DeliveryOutbox) -> Dict[str, Any]:
+    return {
+        "delivery_id": row.id,
+        "draft_id": row.draft_id,
+        "channel": row.channel,
+        "idempotency_key": row.idempotency_key,
+        "status": row.status,
+        "attempts": row.attempts,
+        "next_attempt_at": to_iso(row.next_attempt_at),
+        "sent_msg_id": row.external_id,
+        "last_error": row.last_error,
+        "created_at": to_iso(row.created_at),
+        "delivered_at": to_iso(row.delivered_at),
+    }
+
+
 def map_channel(channel: Optional[str]) -> str:
     if not channel:
         return "email"
@@ -621,11 +1298,12 @@ def describe_audit_action(entry: Dict[str, Any]) -> str:
     return normalized.title()
 
 
-def build_timeline(
+def message_timeline_items(
     detail: Dict[str, Any],
     customer_name: str,
     attachments: Optional[List[Dict[str, str]]],
 ) -> List[Dict[str, Any]]:
+    """The customer message and the reply; both track mutable draft columns."""
     timeline: List[Dict[str, Any]] = []
     draft_id = detail.get("draft_id") or detail.get("id") or "draft"
     created_at = safe_iso(detail.get("created_at"))
@@ -643,7 +1321,7 @@ def build_timeline(
         "body": incoming_body,
     }
     if attachments:
-        first_entry["attachments"] = copy.deepcopy(attachments)
+        first_entry["attachments"] = attachments
     timeline.append(first_entry)
 
     draft_text = (
@@ -665,42 +1343,43 @@ def build_timeline(
             }
         )
 
-    for index, entry in enumerate(detail.get("audit_log") or []):
-        timeline.append(
-            {
-                "id": f"{draft_id}-audit-{index}",
-                "type": "system",
-                "actor": entry.get("actor") or "System",
-                "timestamp": safe_iso(entry.get("timestamp")),
-                "body": describe_audit_action(entry),
-            }
-        )
+    return timeline
 
-    for index, note in enumerate(detail.get("notes") or []):
-        if parse_feedback_note(note):
-            continue
-        timeline.append(
-            {
-                "id": f"{draft_id}-note-{index}",
-                "type": "note",
-                "actor": note.get("author_user_id") or FALLBACK_ASSISTANT_ACTOR,
-                "timestamp": safe_iso(note.get("created_at")),
-                "body": note.get("text") or "",
-            }
-        )
 
-    for index, note in enumerate(detail.get("learning_notes") or []):
-        timeline.append(
-            {
-                "id": f"{draft_id}-learning-{index}",
-                "type": "note",
-                "actor": note.get("author") or FALLBACK_ASSISTANT_ACTOR,
-                "timestamp": safe_iso(note.get("timestamp")),
-                "body": note.get("note") or "",
-            }
-        )
+def audit_timeline_item(
+    draft_id: str, index: int, entry: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": f"{draft_id}-audit-{index}",
+        "type": "system",
+        "actor": entry.get("actor") or "System",
+        "timestamp": safe_iso(entry.get("timestamp")),
+        "body": describe_audit_action(entry),
+    }
+
+
+def note_timeline_item(
+    draft_id: str, index: int, note: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": f"{draft_id}-note-{index}",
+        "type": "note",
+        "actor": note.get("author_user_id") or FALLBACK_ASSISTANT_ACTOR,
+        "timestamp": safe_iso(note.get("created_at")),
+        "body": note.get("text") or "",
+    }
+
 
-    return sorted(timeline, key=lambda entry: entry["timestamp"])
+def learning_timeline_item(
+    draft_id: str, index: int, note: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": f"{draft_id}-learning-{index}",
+        "type": "note",
+        "actor": note.get("author") or FALLBACK_ASSISTANT_ACTOR,
+        "timestamp": safe_iso(note.get("timestamp")),
+        "body": note.get("note") or "",
+    }
 
 
 def parse_feedback_text(text: str) -> Optional[Dict[str, Any]]:
@@ -737,40 +1416,50 @@ def extract_feedback(detail: Dict[str, Any]) -> List[Dict[str, Any]]:
         parsed = parse_feedback_note(note)
         if not parsed:
             continue
-        entries.append(
-            {
-                "id": note.get("note_id") or f"{draft_id}-feedback",
-                "draftId": draft_id,
-                "ticketId": draft_id,
-                "vote": parsed["vote"],
-                "comment": parsed.get("comment"),
-                "submittedAt": safe_iso(note.get("created_at")),
-                "submittedBy": note.get("author_user_id") or FALLBACK_ASSISTANT_ACTOR,
-            }
-        )
+        entries.append(feedback_entry(draft_id, note, parsed))
 
     for index, note in enumerate(detail.get("learning_notes") or []):
-        entries.append(
-            {
-                "id": f"{draft_id}-learning-{index}",
-                "draftId": draft_id,
-                "ticketId": draft_id,
-                "vote": "up",
-                "comment": note.get("note"),
-                "submittedAt": safe_iso(note.get("timestamp")),
-                "submittedBy": note.get("author") or FALLBACK_ASSISTANT_ACTOR,
-            }
-        )
+        entries.append(learning_feedback_entry(draft_id, index, note))
 
     return sorted(entries, key=lambda entry: entry["submittedAt"])
 
 
+def feedback_entry(
+    draft_id: str, note: Dict[str, Any], parsed: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": note.get("note_id") or f"{draft_id}-feedback",
+        "draftId": draft_id,
+        "ticketId": draft_id,
+        "vote": parsed["vote"],
+        "comment": parsed.get("comment"),
+        "submittedAt": safe_iso(note.get("created_at")),
+        "submittedBy": note.get("author_user_id") or FALLBACK_ASSISTANT_ACTOR,
+    }
+
+
+def learning_feedback_entry(
+    draft_id: str, index: int, note: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": f"{draft_id}-learning-{index}",
+        "draftId": draft_id,
+        "ticketId": draft_id,
+        "vote": "up",
+        "comment": note.get("note"),
+        "submittedAt": safe_iso(note.get("timestamp")),
+        "submittedBy": note.get("author") or FALLBACK_ASSISTANT_ACTOR,
+    }
+
+
 def compute_revision(detail: Dict[str, Any]) -> int:
     audit_length = len(detail.get("audit_log") or [])
     return max(1, audit_length + 1)
 
 
-def to_inbox_draft(detail: Dict[str, Any]) -> Dict[str, Any]:
+def to_inbox_draft(
+    detail: Dict[str, Any], feedback: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
     draft_id = detail.get("draft_id") or detail.get("id") or f"draft-{uuid4().hex}"
     updated_source = detail.get("sent_at") or detail.get("created_at")
     audit_log = detail.get("audit_log") or []
@@ -796,11 +1485,15 @@ def to_inbox_draft(detail: Dict[str, Any]) -> Dict[str, Any]:
         or last_actor
         or FALLBACK_ASSISTANT_ACTOR,
         "revision": compute_revision(detail),
-        "feedback": extract_feedback(detail),
+        "feedback": extract_feedback(detail) if feedback is None else feedback,
     }
 
 
-def to_inbox_ticket(detail: Dict[str, Any]) -> Dict[str, Any]:
+def to_inbox_ticket(
+    detail: Dict[str, Any], view: Optional["TicketView"] = None
+) -> Dict[str, Any]:
+    if view is None:
+        view = TicketView.from_detail(detail)
     draft_id = detail.get("draft_id") or detail.get("id") or f"draft-{uuid4().hex}"
     channel = map_channel(detail.get("channel"))
     status = map_status(detail.get("status"))
@@ -809,9 +1502,9 @@ def to_inbox_ticket(detail: Dict[str, Any]) -> Dict[str, Any]:
     customer = parse_customer_display(
         detail.get("customer_display"), detail.get("conversation_id")
     )
-    attachments = extract_attachments(detail.get("source_snippets"))
-    timeline = build_timeline(detail, customer["name"], attachments)
-    ai_draft = to_inbox_draft(detail)
+    attachments = view.attachments(detail)
+    timeline = view.timeline(detail, customer["name"], attachments)
+    ai_draft = to_inbox_draft(detail, view.feedback(detail))
 
     last_message_preview = (
         detail.get("incoming_excerpt")
@@ -860,16 +1553,215 @@ def note_to_feedback(
         return None
 
     draft_id = detail.get("draft_id") or detail.get("id") or f"draft-{uuid4().hex}"
+    return feedback_entry(draft_id, note, parsed)
 
-    return {
-        "id": note.get("note_id") or f"{draft_id}-feedback",
-        "draftId": draft_id,
-        "ticketId": draft_id,
-        "vote": parsed["vote"],
-        "comment": parsed.get("comment"),
-        "submittedAt": safe_iso(note.get("created_at")),
-        "submittedBy": note.get("author_user_id") or FALLBACK_ASSISTANT_ACTOR,
-    }
+
+class TicketView:
+    """Memoized inbox-ticket parts for one draft.
+
+    Audit events, notes and learning notes are append-only, so their timeline
+    and feedback entries are converted once and extended as new rows arrive;
+    only the two message entries and the ticket header are rebuilt from the
+    draft columns on each call.
+    """
+
+    def __init__(self, draft_id: str) -> None:
+        self.draft_id = draft_id
+        self.audit: List[Dict[str, Any]] = []
+        self.notes: List[Dict[str, Any]] = []
+        # (time, id) of the newest history row applied, per table
+        self.cursors: Dict[str, Tuple[Any, int]] = {
+            "audit": (None, 0),
+            "notes": (None, 0),
+        }
+        self._audit_items: List[Dict[str, Any]] = []
+        self._note_items: List[Dict[str, Any]] = []
+        self._note_feedback: List[Dict[str, Any]] = []
+        self._learning_items: List[Dict[str, Any]] = []
+        self._learning_feedback: List[Dict[str, Any]] = []
+        self._attachments: Optional[Tuple[int, Any]] = None
+
+    @classmethod
+    def from_detail(cls, detail: Dict[str, Any]) -> "TicketView":
+        view = cls(detail.get("draft_id") or detail.get("id") or "draft")
+        for entry in detail.get("audit_log") or []:
+            view.add_audit(entry)
+        for note in detail.get("notes") or []:
+            view.add_note(note)
+        return view
+
+    def entries(self, kind: str) -> List[Dict[str, Any]]:
+        return self.audit if kind == "audit" else self.notes
+
+    def reset(self, kind: str) -> None:
+        if kind == "audit":
+            self.audit, self._audit_items = [], []
+        else:
+            self.notes, self._note_items, self._note_feedback = [], [], []
+        self.cursors[kind] = (None, 0)
+
+    def append_row(self, kind: str, row: Any) -> None:
+        if kind == "audit":
+            self.add_audit(audit_entry(row))
+            self.cursors[kind] = (row.ts, row.id)
+        else:
+            self.add_note(note_entry(row))
+            self.cursors[kind] = (row.created_at, row.id)
+
+    def add_audit(self, entry: Dict[str, Any]) -> None:
+        self._audit_items.append(
+            audit_timeline_item(self.draft_id, len(self.audit), entry)
+        )
+        self.audit.append(entry)
+
+    def add_note(self, note: Dict[str, Any]) -> None:
+        parsed = parse_feedback_note(note)
+        if parsed:
+            self._note_feedback.append(feedback_entry(self.draft_id, note, parsed))
+        else:
+            self._note_items.append(
+                note_timeline_item(self.draft_id, len(self.notes), note)
+            )
+        self.notes.append(note)
+
+    def _sync_learning(self, detail: Dict[str, Any]) -> None:
+        learning = detail.get("learning_notes") or []
+        if len(learning) < len(self._learning_items):
+            self._learning_items, self._learning_feedback = [], []
+        for index in range(len(self._learning_items), len(learning)):
+            note = learning[index]
+            self._learning_items.append(
+                learning_timeline_item(self.draft_id, index, note)
+            )
+            self._learning_feedback.append(
+                learning_feedback_entry(self.draft_id, index, note)
+            )
+
+    def attachments(self, detail: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
+        snippets = detail.get("source_snippets")
+        key = len(snippets or [])
+        if self._attachments is None or self._attachments[0] != key:
+            self._attachments = (key, extract_attachments(snippets))
+        return self._attachments[1]
+
+    def timeline(
+        self,
+        detail: Dict[str, Any],
+        customer_name: str,
+        attachments: Optional[List[Dict[str, str]]],
+    ) -> List[Dict[str, Any]]:
+        self._sync_learning(detail)
+        timeline = message_timeline_items(detail, customer_name, attachments)
+        timeline.extend(self._audit_items)
+        timeline.extend(self._note_items)
+        timeline.extend(self._learning_items)
+        return sorted(timeline, key=lambda entry: entry["timestamp"])
+
+    def feedback(self, detail: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._sync_learning(detail)
+        return sorted(
+            self._note_feedback + self._learning_feedback,
+            key=lambda entry: entry["submittedAt"],
+        )
+
+
+async def _history_since(
+    session: AsyncSession, model: Any, time_column: Any, cursors: Dict[str, int]
+) -> Tuple[Dict[str, List[Any]], Dict[str, int]]:
+    """Rows above each draft's id cursor in (time, id) order, plus per-draft counts."""
+    draft_ids = list(cursors)
+    rows = await session.scalars(
+        select(model)
+        .where(model.draft_id.in_(draft_ids), model.id > min(cursors.values()))
+        .order_by(model.draft_id, time_column, model.id)
+    )
+    fresh: Dict[str, List[Any]] = {draft_id: [] for draft_id in draft_ids}
+    for row in rows:
+        if row.id > cursors[row.draft_id]:
+            fresh[row.draft_id].append(row)
+    totals = await session.execute(
+        select(model.draft_id, func.count())
+        .where(model.draft_id.in_(draft_ids))
+        .group_by(model.draft_id)
+    )
+    return fresh, {draft_id: int(total) for draft_id, total in totals}
+
+
+class TicketViewCache:
+    """Process-local LRU of :class:`TicketView` objects keyed by draft id.
+
+    A refresh reads only history rows with an id above the view's cursor. If
+    the row count disagrees (an older id committed late) or a new row sorts
+    before the cached tail, that table's history is reloaded from scratch.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._views: "OrderedDict[str, TicketView]" = OrderedDict()
+
+    def clear(self) -> None:
+        self._views.clear()
+
+    def _get(self, draft_id: str) -> TicketView:
+        view = self._views.get(draft_id)
+        if view is None:
+            view = self._views[draft_id] = TicketView(draft_id)
+        self._views.move_to_end(draft_id)
+        while len(self._views) > self.maxsize:
+            self._views.popitem(last=False)
+        return view
+
+    async def refresh(self, session: AsyncSession, draft_id: str) -> TicketView:
+        return (await self.refresh_many(session, [draft_id]))[draft_id]
+
+    async def refresh_many(
+        self, session: AsyncSession, draft_ids: List[str]
+    ) -> Dict[str, TicketView]:
+        """Bring several views up to date with two queries per history table."""
+        views = {draft_id: self._get(draft_id) for draft_id in draft_ids}
+        if views:
+            await self._sync(session, views, "audit", DraftAuditEvent, DraftAuditEvent.ts)
+            await self._sync(session, views, "notes", DraftNote, DraftNote.created_at)
+        return views
+
+    @staticmethod
+    async def _sync(
+        session: AsyncSession,
+        views: Dict[str, TicketView],
+        kind: str,
+        model: Any,
+        time_column: Any,
+    ) -> None:
+        cursors = {draft_id: view.cursors[kind] for draft_id, view in views.items()}
+        fresh, totals = await _history_since(
+            session,
+            model,
+            time_column,
+            {draft_id: cursor[1] for draft_id, cursor in cursors.items()},
+        )
+        stale = [
+            draft_id
+            for draft_id, rows in fresh.items()
+            if len(views[draft_id].entries(kind)) + len(rows) != totals.get(draft_id, 0)
+            or (
+                rows
+                and cursors[draft_id][0] is not None
+                and (getattr(rows[0], time_column.key), rows[0].id) < cursors[draft_id]
+            )
+        ]
+        if stale:
+            for draft_id in stale:
+                views[draft_id].reset(kind)
+            reloaded, _ = await _history_since(
+                session, model, time_column, dict.fromkeys(stale, 0)
+            )
+            fresh.update(reloaded)
+        for draft_id, rows in fresh.items():
+            for row in rows:
+                views[draft_id].append_row(kind, row)
+
+
+TICKET_VIEWS = TicketViewCache(TICKET_CACHE_SIZE)
 
 
 def build_event_envelope(
@@ -879,9 +1771,11 @@ def build_event_envelope(
     event_type: str,
     event_payload: Dict[str, Any],
     feedback: Optional[Dict[str, Any]] = None,
+    view: Optional[TicketView] = None,
 ) -> Dict[str, Any]:
-    ticket = to_inbox_ticket(detail)
-    draft = copy.deepcopy(ticket["aiDraft"])
+    # The envelope is encoded once and never mutated, so ``draft`` can share
+    # the ticket's aiDraft block instead of deep-copying it.
+    ticket = to_inbox_ticket(detail, view)
     timestamp = to_iso(utc_now())
 
     envelope: Dict[str, Any] = {
@@ -890,7 +1784,7 @@ def build_event_envelope(
         "timestamp": timestamp,
         "message": message,
         "ticket": ticket,
-        "draft": draft,
+        "draft": ticket["aiDraft"],
         "event": {
             "type": event_type,
             "timestamp": timestamp,
@@ -904,6 +1798,195 @@ def build_event_envelope(
     return envelope
 
 
+def build_batch_envelope(
+    entries: List[Tuple[Dict[str, Any], TicketView]],
+    *,
+    message: str,
+    items: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """One SSE event for a bulk action: every touched ticket plus per-item results."""
+    timestamp = to_iso(utc_now())
+    return {
+        "type": "batch",
+        "id": f"assistants-event-{uuid4().hex}",
+        "timestamp": timestamp,
+        "message": message,
+        "tickets": [to_inbox_ticket(detail, view) for detail, view in entries],
+        "event": {
+            "type": "draft:batch",
+            "timestamp": timestamp,
+            "payload": {"items": items},
+        },
+    }
+
+
+def encode_event(envelope: Dict[str, Any]) -> bytes:
+    return json.dumps(envelope, separators=(",", ":")).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Delivery outbox
+# ---------------------------------------------------------------------------
+
+
+DELIVERIES_TOTAL = Counter(
+    "assistants_deliveries_total",
+    "Outbox delivery attempts by channel and outcome",
+    ["channel", "outcome"],
+)
+
+
+def _claimable(now: datetime) -> Any:
+    return or_(
+        and_(DeliveryOutbox.status == "pending", DeliveryOutbox.next_attempt_at <= now),
+        # a worker that died mid-send leaves its lease to expire
+        and_(DeliveryOutbox.status == "sending", DeliveryOutbox.locked_until < now),
+    )
+
+
+def delivery_backoff(attempts: int) -> float:
+    """Exponential backoff with jitter for the ``attempts``-th failure."""
+    delay = min(DELIVERY_BACKOFF_MAX_SECONDS, DELIVERY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxDispatcher:
+    """Drains ``delivery_outbox`` through the adapter registry.
+
+    Rows are claimed by stamping a per-batch token (``FOR UPDATE SKIP LOCKED``
+    where the database supports it), so several workers or processes can
+    drain the same table. Sends are bounded per channel.
+    """
+
+    def __init__(self, adapters: DeliveryAdapterRegistry) -> None:
+        self.adapters = adapters
+        self._limits: Dict[str, Tuple[int, asyncio.Semaphore]] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def _limit(self, channel: str) -> asyncio.Semaphore:
+        size = self.adapters.concurrency_for(channel, DELIVERY_CONCURRENCY)
+        cached = self._limits.get(channel)
+        if cached is None or cached[0] != size:
+            cached = self._limits[channel] = (size, asyncio.Semaphore(size))
+        return cached[1]
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="assistants-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Outbox drain failed")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=DELIVERY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> int:
+        """Deliver everything currently due; returns the number of attempts."""
+        total = 0
+        while processed := await self.drain_once():
+            total += processed
+        return total
+
+    async def _claim(self, token: str) -> List[DeliveryOutbox]:
+        now = utc_now()
+        async with _session() as session:
+            due = (
+                select(DeliveryOutbox.id)
+                .where(_claimable(now))
+                .order_by(DeliveryOutbox.next_attempt_at, DeliveryOutbox.id)
+                .limit(DELIVERY_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            ids = list(await session.scalars(due))
+            if not ids:
+                return []
+            await session.execute(
+                update(DeliveryOutbox)
+                .where(DeliveryOutbox.id.in_(ids), _claimable(now))
+                .values(
+                    status="sending",
+                    claim_token=token,
+                    locked_until=now + timedelta(seconds=DELIVERY_LEASE_SECONDS),
+                    attempts=DeliveryOutbox.attempts + 1,
+                )
+            )
+            await session.commit()
+            return list(
+                await session.scalars(
+                    select(DeliveryOutbox).where(DeliveryOutbox.claim_token == token)
+                )
+            )
+
+    async def _send(self, row: DeliveryOutbox) -> Dict[str, Any]:
+        async with self._limit(row.channel):
+            try:
+                external_id = await asyncio.wait_for(
+                    self.adapters.send(row.channel, row.payload or {}),
+                    timeout=DELIVERY_TIMEOUT_SECONDS,
+                )
+            except Exception as exc:
+                error = str(exc) or exc.__class__.__name__
+                if row.attempts >= DELIVERY_MAX_ATTEMPTS:
+                    DELIVERIES_TOTAL.labels(row.channel, "failed").inc()
+                    return {"status": "failed", "last_error": error, "claim_token": None}
+                DELIVERIES_TOTAL.labels(row.channel, "retry").inc()
+                return {
+                    "status": "pending",
+                    "last_error": error,
+                    "claim_token": None,
+                    "next_attempt_at": utc_now()
+                    + timedelta(seconds=delivery_backoff(row.attempts)),
+                }
+        DELIVERIES_TOTAL.labels(row.channel, "sent").inc()
+        return {
+            "status": "sent",
+            "external_id": external_id,
+            "last_error": None,
+            "claim_token": None,
+            "delivered_at": utc_now(),
+        }
+
+    async def drain_once(self) -> int:
+        token = uuid4().hex
+        rows = await self._claim(token)
+        if not rows:
+            return 0
+        outcomes = await asyncio.gather(*(self._send(row) for row in rows))
+        async with _session() as session:
+            for row, values in zip(rows, outcomes):
+                # The token guard keeps a worker whose lease expired from
+                # overwriting the row after another worker reclaimed it.
+                await session.execute(
+                    update(DeliveryOutbox)
+                    .where(DeliveryOutbox.id == row.id, DeliveryOutbox.claim_token == token)
+                    .values(locked_until=None, **values)
+                )
+            await session.commit()
+        return len(rows)
+
+
 # ---------------------------------------------------------------------------
 # FastAPI application
 # ---------------------------------------------------------------------------
@@ -911,6 +1994,7 @@ def build_event_envelope(
 
 app = FastAPI(title="Assistants Service", version="0.3.0")
 registry = DeliveryAdapterRegistry()
+deliveries = OutboxDispatcher(registry)
 
 
 def _maybe_setup_tracing(service_name: str) -> None:
@@ -930,16 +2014,31 @@ def _maybe_setup_tracing(service_name: str) -> None:
 _maybe_setup_tracing("assistants")
 
 
+@app.on_event("startup")
+async def startup() -> None:
+    await init_db()
+    await events.start()
+    if DELIVERY_WORKER_ENABLED:
+        await deliveries.start()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await deliveries.stop()
+    await events.close()
+    await ENGINE.dispose()
+
+
 @app.get("/health")
-def health() -> Dict[str, Any]:
+async def health() -> Dict[str, Any]:
     """Lightweight health check for readiness/liveness probes.
 
     Verifies database connectivity with a trivial SELECT 1 and returns
     service metadata. Keeps it fast and side-effect free.
     """
     try:
-        with ENGINE.connect() as conn:
-            conn.execute(select(1))
+        async with ENGINE.connect() as conn:
+            await conn.execute(select(1))
         db_ok = True
     except Exception:
         db_ok = False
@@ -957,24 +2056,28 @@ def prometheus_metrics() -> PlainTextResponse:
 
 
 @app.get("/assistants/events")
-async def events_stream(request: Request) -> StreamingResponse:
-    queue = await events.subscribe()
+async def events_stream(
+    request: Request, last_event_id: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    subscription = await events.subscribe(last_event_id)
 
     async def event_generator():
         try:
+            if subscription.gap:
+                # Replay could not cover the disconnect; clients refetch the inbox.
+                yield RESET_FRAME
             while True:
                 if await request.is_disconnected():
                     break
                 try:
-                    message = await asyncio.wait_for(
-                        queue.get(), timeout=EVENT_PING_SECONDS
-                    )
-                except asyncio.TimeoutError:
-                    yield "event: ping\ndata: {}\n\n"
-                    continue
-                yield f"data: {message}\n\n"
+                    event = await subscription.get(timeout=EVENT_PING_SECONDS)
+                except SlowConsumerError:
+                    # Closing lets EventSource reconnect and replay from its
+                    # Last-Event-ID instead of silently missing events.
+                    break
+                yield PING_FRAME if event is None else event.frame
         finally:
-            await events.unsubscribe(queue)
+            await events.unsubscribe(subscription)
 
     headers = {"Cache-Control": "no-cache", "Connection": "keep-alive"}
     return StreamingResponse(
@@ -982,8 +2085,22 @@ async def events_stream(request: Request) -> StreamingResponse:
     )
 
 
-@app.post("/assistants/draft")
-async def draft(body: DraftCreate) -> Dict[str, str]:
+@app.get("/assistants/deliveries/{delivery_id}")
+async def get_delivery(delivery_id: int) -> Dict[str, Any]:
+    async with _session() as session:
+        row = await session.get(DeliveryOutbox, delivery_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Delivery not found")
+        return serialize_delivery(row)
+
+
+@app.get("/assistants/events/stats")
+async def events_stats() -> Dict[str, Any]:
+    return events.stats()
+
+
+def draft_record(body: DraftCreate, *, default_model: str = "gpt-4o-mini") -> DraftModel:
+    """Build the draft row for ``body`` (extra fields and ``metadata`` merged)."""
     extra_fields = dict(getattr(body, "model_extra", {}) or {})
     combined_metadata: Dict[str, Any] = {**extra_fields}
     if body.metadata:
@@ -999,7 +2116,8 @@ async def draft(body: DraftCreate) -> Dict[str, str]:
             if isinstance(email, str) and email.strip():
                 resolved_customer_display = email.strip()
 
-    record = DraftModel(
+    return DraftModel(
+        id=new_draft_id(),
         channel=body.channel,
         conversation_id=body.conversation_id,
         customer_display=resolved_customer_display,
@@ -1010,7 +2128,7 @@ async def draft(body: DraftCreate) -> Dict[str, str]:
         incoming_excerpt=clean_excerpt(body.incoming_text),
         draft_excerpt=clean_excerpt(body.draft_text or ""),
         confidence=body.confidence if body.confidence is not None else 0.75,
-        llm_model=body.llm_model or "gpt-4o-mini",
+        llm_model=body.llm_model or default_model,
         estimated_tokens_in=body.estimated_tokens_in,
         estimated_tokens_out=body.estimated_tokens_out,
         usd_cost=body.usd_cost,
@@ -1025,30 +2143,36 @@ async def draft(body: DraftCreate) -> Dict[str, str]:
         assigned_to=body.assigned_to,
         extra_metadata=combined_metadata,
     )
-    append_audit(
-        record,
-        actor="assistant-service",
-        action="draft.created",
-        payload={"channel": body.channel},
-    )
-    with _session() as session:
+
+
+@app.post("/assistants/draft")
+async def draft(body: DraftCreate) -> Dict[str, str]:
+    record = draft_record(body)
+    async with _session() as session:
         session.add(record)
-        session.commit()
-        detail = serialize_detail(record)
-        revision = compute_revision(detail)
-        envelope = build_event_envelope(
-            detail,
-            message="Draft ready for review.",
-            event_type="draft:updated",
-            event_payload={
-                "ticketId": detail.get("draft_id") or record.id,
-                "revision": revision,
-            },
+        append_audit(
+            session,
+            record.id,
+            actor="assistant-service",
+            action="draft.created",
+            payload={"channel": body.channel},
         )
-        draft_id = record.id
-
-    await events.publish(envelope)
-    return {"draft_id": draft_id}
+        await session.commit()
+        DRAFT_COUNTS.clear()
+        detail, view = await load_detail(session, record)
+
+    envelope = build_event_envelope(
+        detail,
+        view=view,
+        message="Draft ready for review.",
+        event_type="draft:updated",
+        event_payload={
+            "ticketId": detail.get("draft_id") or record.id,
+            "revision": compute_revision(detail),
+        },
+    )
+    await events.publish(encode_event(envelope))
+    return {"draft_id": record.id}
 
 
 @app.get("/assistants/drafts")
@@ -1056,19 +2180,24 @@ async def list_drafts(
     status: Optional[str] = None,
     channel: Optional[str] = None,
     assigned: Optional[str] = None,
-    cursor: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 25,
+    count: str = "cached",
 ) -> JSONResponse:
+    if count not in COUNT_MODES:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported count mode: {count}"
+        )
     statuses = parse_statuses_param(status)
     channels = parse_channels_param(channel)
     assigned_filter = parse_assigned_param(assigned)
-    page, next_cursor, total = load_drafts(
+    page, next_cursor, total = await load_drafts(
         statuses=statuses,
         channels=channels,
         assigned=assigned_filter,
-        sort=True,
         cursor=cursor,
         limit=limit,
+        count=count,
     )
     content = {
         "drafts": [serialize_list(r) for r in page],
@@ -1081,22 +2210,41 @@ async def list_drafts(
     )
 
 
+@app.get("/assistants/search")
+async def search(
+    q: str,
+    status: Optional[str] = None,
+    channel: Optional[str] = None,
+    assigned: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 25,
+) -> Dict[str, Any]:
+    results, next_cursor = await search_drafts(
+        q,
+        # unlike the inbox list, search spans every status unless filtered
+        statuses=parse_statuses_param(status) if status else None,
+        channels=parse_channels_param(channel),
+        assigned=parse_assigned_param(assigned),
+        cursor=cursor,
+        limit=limit,
+    )
+    return {"drafts": results, "next_cursor": next_cursor}
+
+
 @app.get("/assistants/drafts/{draft_id}")
 async def get_draft(draft_id: str) -> Dict[str, Any]:
-    with _session() as session:
-        record = session.get(DraftModel, draft_id)
+    async with _session() as session:
+        record = await session.get(DraftModel, draft_id)
         if not record:
             raise HTTPException(status_code=404, detail="Draft not found")
-        return serialize_detail(record)
+        return await detail_for(session, record)
 
 
 @app.post("/assistants/approve")
 async def approve(body: Approve) -> Dict[str, Any]:
-    adapter_payload: Optional[Tuple[str, Dict[str, Any]]] = None
-    envelope: Optional[Dict[str, Any]] = None
     response: Dict[str, Any]
-    with _session() as session:
-        record = session.get(DraftModel, body.draft_id)
+    async with _session() as session:
+        record = await session.get(DraftModel, body.draft_id)
         if not record:
             raise HTTPException(status_code=404, detail="Draft not found")
         if record.status == "sent":
@@ -1109,7 +2257,8 @@ async def approve(body: Approve) -> Dict[str, Any]:
             if body.escalation_reason:
                 record.escalation_reason = body.escalation_reason
             append_audit(
-                record,
+                session,
+                record.id,
                 actor=body.approver_user_id,
                 action="draft.escalated_during_approve",
                 payload={
@@ -1119,64 +2268,53 @@ async def approve(body: Approve) -> Dict[str, Any]:
                 },
             )
             session.add(record)
-            session.commit()
-            detail = serialize_detail(record)
-            revision = compute_revision(detail)
-            envelope = build_event_envelope(
-                detail,
-                message="Draft escalated to specialist.",
-                event_type="draft:updated",
-                event_payload={
-                    "ticketId": detail.get("draft_id") or record.id,
-                    "revision": revision,
-                    "status": map_status(record.status),
-                },
-            )
+            await session.commit()
+            DRAFT_COUNTS.clear()
+            message, event_type = "Draft escalated to specialist.", "draft:updated"
             response = {"status": "escalated"}
         else:
             record.status = "sent"
             record.sent_at = utc_now()
             record.usd_sent_copy = body.send_copy_to_customer
             append_audit(
-                record,
+                session,
+                record.id,
                 actor=body.approver_user_id,
                 action="draft.approved",
                 payload={"send_copy_to_customer": body.send_copy_to_customer},
             )
             session.add(record)
-            session.commit()
-            detail = serialize_detail(record)
-            revision = compute_revision(detail)
-            envelope = build_event_envelope(
-                detail,
-                message="Draft approved.",
-                event_type="draft:approved",
-                event_payload={
-                    "ticketId": detail.get("draft_id") or record.id,
-                    "revision": revision,
-                },
-            )
-            adapter_payload = (record.channel, delivery_metadata(record))
-            response = {}
-
-    if adapter_payload:
-        channel, metadata = adapter_payload
-        external_id = await registry.send(channel, metadata)
-        response["sent_msg_id"] = external_id
-
-    if envelope:
-        await events.publish(envelope)
+            delivery = enqueue_delivery(session, record)
+            await session.commit()
+            DRAFT_COUNTS.clear()
+            message, event_type = "Draft approved.", "draft:approved"
+            response = {"delivery_id": delivery.id, "delivery_status": delivery.status}
+        detail, view = await load_detail(session, record)
+
+    event_payload: Dict[str, Any] = {
+        "ticketId": detail.get("draft_id") or record.id,
+        "revision": compute_revision(detail),
+    }
+    if event_type == "draft:updated":
+        event_payload["status"] = map_status(record.status)
+    envelope = build_event_envelope(
+        detail,
+        view=view,
+        message=message,
+        event_type=event_type,
+        event_payload=event_payload,
+    )
 
+    if event_type == "draft:approved":
+        deliveries.wake()
+    await events.publish(encode_event(envelope))
     return response
 
 
 @app.post("/assistants/edit")
 async def edit(body: Edit) -> Dict[str, Any]:
-    metadata: Dict[str, Any]
-    channel: str
-    envelope: Dict[str, Any]
-    with _session() as session:
-        record = session.get(DraftModel, body.draft_id)
+    async with _session() as session:
+        record = await session.get(DraftModel, body.draft_id)
         if not record:
             raise HTTPException(status_code=404, detail="Draft not found")
         record.draft_text = body.final_text
@@ -1195,131 +2333,260 @@ async def edit(body: Edit) -> Dict[str, Any]:
             )
             record.learning_notes = notes
         append_audit(
-            record,
+            session,
+            record.id,
             actor=body.editor_user_id,
             action="draft.edited",
             payload={"send_copy_to_customer": body.send_copy_to_customer},
         )
         session.add(record)
-        session.commit()
-        metadata = delivery_metadata(record)
-        channel = record.channel
-        detail = serialize_detail(record)
-        revision = compute_revision(detail)
-        envelope = build_event_envelope(
-            detail,
-            message="Draft sent with edits.",
-            event_type="draft:updated",
-            event_payload={
-                "ticketId": detail.get("draft_id") or record.id,
-                "revision": revision,
-            },
-        )
-
-    external_id = await registry.send(channel, metadata)
-    await events.publish(envelope)
-    return {"sent_msg_id": external_id}
+        delivery = enqueue_delivery(session, record)
+        await session.commit()
+        DRAFT_COUNTS.clear()
+        detail, view = await load_detail(session, record)
+
+    envelope = build_event_envelope(
+        detail,
+        view=view,
+        message="Draft sent with edits.",
+        event_type="draft:updated",
+        event_payload={
+            "ticketId": detail.get("draft_id") or record.id,
+            "revision": compute_revision(detail),
+        },
+    )
+    deliveries.wake()
+    await events.publish(encode_event(envelope))
+    return {"delivery_id": delivery.id, "delivery_status": delivery.status}
 
 
 @app.post("/assistants/escalate")
 async def escalate(body: Escalate) -> Dict[str, Any]:
-    with _session() as session:
-        record = session.get(DraftModel, body.draft_id)
+    async with _session() as session:
+        record = await session.get(DraftModel, body.draft_id)
         if not record:
             raise HTTPException(status_code=404, detail="Draft not found")
         record.status = "escalated"
         record.assigned_to = body.assigned_to
         record.escalation_reason = body.reason
         append_audit(
-            record,
+            session,
+            record.id,
             actor=body.requester_user_id,
             action="draft.escalated",
             payload={"assigned_to": body.assigned_to, "reason": body.reason},
         )
         session.add(record)
-        session.commit()
-        detail = serialize_detail(record)
-        revision = compute_revision(detail)
-        envelope = build_event_envelope(
-            detail,
-            message="Draft escalated.",
-            event_type="draft:updated",
-            event_payload={
-                "ticketId": detail.get("draft_id") or record.id,
-                "revision": revision,
-                "status": map_status(record.status),
-            },
-        )
-
-    await events.publish(envelope)
+        await session.commit()
+        DRAFT_COUNTS.clear()
+        detail, view = await load_detail(session, record)
+
+    envelope = build_event_envelope(
+        detail,
+        view=view,
+        message="Draft escalated.",
+        event_type="draft:updated",
+        event_payload={
+            "ticketId": detail.get("draft_id") or record.id,
+            "revision": compute_revision(detail),
+            "status": map_status(record.status),
+        },
+    )
+    await events.publish(encode_event(envelope))
     return {"status": "escalated"}
 
 
 @app.post("/assistants/notes")
 async def add_note(body: NoteCreate) -> Dict[str, Any]:
-    with _session() as session:
-        record = session.get(DraftModel, body.draft_id)
+    async with _session() as session:
+        record = await session.get(DraftModel, body.draft_id)
         if not record:
             raise HTTPException(status_code=404, detail="Draft not found")
-        notes = list(record.notes or [])
-        note_id = f"n{len(notes) + 1}"
-        note = {
-            "note_id": note_id,
-            "author_user_id": body.author_user_id,
-            "text": body.text,
-            "created_at": to_iso(utc_now()),
-        }
-        notes.append(note)
-        record.notes = notes
+        note_id = f"n{uuid4().hex[:12]}"
+        note_row = DraftNote(
+            draft_id=record.id,
+            note_id=note_id,
+            author_user_id=body.author_user_id,
+            text=body.text,
+            created_at=utc_now(),
+        )
+        session.add(note_row)
+        note = note_entry(note_row)
         append_audit(
-            record,
+            session,
+            record.id,
             actor=body.author_user_id,
             action="draft.note_added",
             payload={"note_id": note_id},
         )
-        session.add(record)
-        session.commit()
-        detail = serialize_detail(record)
-        revision = compute_revision(detail)
-        ticket_id = detail.get("draft_id") or record.id
-        feedback_entry = note_to_feedback(detail, note)
-        if feedback_entry:
-            envelope = build_event_envelope(
-                detail,
-                message="Feedback recorded.",
-                event_type="draft:feedback",
-                event_payload={
-                    "ticketId": ticket_id,
-                    "draftId": ticket_id,
-                    "vote": feedback_entry["vote"],
-                    "revision": revision,
-                },
-                feedback=feedback_entry,
-            )
-        else:
-            envelope = build_event_envelope(
-                detail,
-                message="Note added to draft.",
-                event_type="draft:updated",
-                event_payload={
-                    "ticketId": ticket_id,
-                    "revision": revision,
-                },
-            )
+        await session.commit()
+        detail, view = await load_detail(session, record)
+
+    revision = compute_revision(detail)
+    ticket_id = detail.get("draft_id") or record.id
+    feedback = note_to_feedback(detail, note)
+    if feedback:
+        envelope = build_event_envelope(
+            detail,
+            view=view,
+            message="Feedback recorded.",
+            event_type="draft:feedback",
+            event_payload={
+                "ticketId": ticket_id,
+                "draftId": ticket_id,
+                "vote": feedback["vote"],
+                "revision": revision,
+            },
+            feedback=feedback,
+        )
+    else:
+        envelope = build_event_envelope(
+            detail,
+            view=view,
+            message="Note added to draft.",
+            event_type="draft:updated",
+            event_payload={
+                "ticketId": ticket_id,
+                "revision": revision,
+            },
+        )
 
-    await events.publish(envelope)
+    await events.publish(encode_event(envelope))
     return {"note": note}
 
 
+def apply_bulk_item(
+    item: BulkItem, record: DraftModel, actor: str, now: datetime
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Mutate ``record`` for one bulk item; returns (error, audit row)."""
+    if item.action == "approve":
+        if record.status == "sent":
+            return "already_sent", None
+        record.status = "sent"
+        record.sent_at = now
+        record.usd_sent_copy = item.send_copy_to_customer
+        action = "draft.approved"
+        payload: Dict[str, Any] = {"send_copy_to_customer": item.send_copy_to_customer}
+    elif item.action == "escalate":
+        if not item.reason:
+            return "reason_required", None
+        record.status = "escalated"
+        record.assigned_to = item.assign_to
+        record.escalation_reason = item.reason
+        action = "draft.escalated"
+        payload = {"assigned_to": item.assign_to, "reason": item.reason}
+    else:
+        record.assigned_to = item.assign_to
+        action = "draft.assigned"
+        payload = {"assigned_to": item.assign_to}
+    payload["bulk"] = True
+    return None, {
+        "draft_id": record.id,
+        "ts": now,
+        "actor": actor,
+        "action": action,
+        "payload": payload,
+    }
+
+
+@app.post("/assistants/bulk")
+async def bulk_actions(body: BulkActions) -> Dict[str, Any]:
+    """Apply approve/escalate/assign to many drafts in one transaction.
+
+    Items are applied independently (a missing or already-sent draft fails
+    only its own item). Approved drafts are queued in the delivery outbox in
+    the same commit and a single ``draft:batch`` event is published.
+    """
+    if len(body.items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request"
+        )
+    results: List[Dict[str, Any]] = []
+    audit_rows: List[Dict[str, Any]] = []
+    queued: List[Tuple[Dict[str, Any], DeliveryOutbox]] = []
+    entries: List[Tuple[Dict[str, Any], TicketView]] = []
+    now = utc_now()
+    async with _session() as session:
+        draft_ids = list(dict.fromkeys(item.draft_id for item in body.items))
+        records = {
+            record.id: record
+            for record in await session.scalars(
+                select(DraftModel).where(DraftModel.id.in_(draft_ids))
+            )
+        }
+        touched: Dict[str, Dict[str, Any]] = {}
+        for item in body.items:
+            result: Dict[str, Any] = {"draft_id": item.draft_id, "action": item.action}
+            results.append(result)
+            record = records.get(item.draft_id)
+            if record is None:
+                result["error"] = "not_found"
+                continue
+            if item.draft_id in touched:
+                result["error"] = "duplicate"
+                continue
+            error, audit_row = apply_bulk_item(item, record, body.actor_user_id, now)
+            if error:
+                result["error"] = error
+                continue
+            audit_rows.append(audit_row)
+            touched[record.id] = result
+            result["status"] = map_status(record.status)
+            if item.action == "approve":
+                queued.append((result, enqueue_delivery(session, record)))
+
+        if audit_rows:
+            await session.execute(insert(DraftAuditEvent), audit_rows)
+            await session.commit()
+            DRAFT_COUNTS.clear()
+            for result, delivery in queued:
+                result["delivery_id"] = delivery.id
+            views = await TICKET_VIEWS.refresh_many(session, list(touched))
+            for draft_id, view in views.items():
+                record = records[draft_id]
+                detail = serialize_detail(record, list(view.audit), list(view.notes))
+                touched[draft_id]["revision"] = compute_revision(detail)
+                entries.append((detail, view))
+
+    if queued:
+        deliveries.wake()
+    if entries:
+        envelope = build_batch_envelope(
+            entries,
+            message=f"{len(entries)} drafts updated.",
+            items=[
+                {
+                    "ticketId": result["draft_id"],
+                    "action": result["action"],
+                    "status": result["status"],
+                    "revision": result["revision"],
+                }
+                for result in touched.values()
+            ],
+        )
+        await events.publish(encode_event(envelope))
+
+    return {
+        "results": results,
+        "applied": len(entries),
+        "failed": len(results) - len(entries),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Test utilities
 # ---------------------------------------------------------------------------
 
 
-def reset_state_for_tests() -> None:
-    with _session() as session:
-        session.query(DraftModel).delete()
-        session.commit()
+async def reset_state_for_tests() -> None:
+    async with _session() as session:
+        await session.execute(delete(DraftAuditEvent))
+        await session.execute(delete(DraftNote))
+        await session.execute(delete(DeliveryOutbox))
+        await session.execute(delete(DraftModel))
+        await session.commit()
+        DRAFT_COUNTS.clear()
+        TICKET_VIEWS.clear()
 
 
 __all__ = [
@@ -1329,127 +2596,160 @@ __all__ = [
     "Edit",
     "Escalate",
     "NoteCreate",
+    "BulkActions",
     "reset_state_for_tests",
     "registry",
 ]
 
 
-# Add RAG draft generation endpoint
+def merge_rag_draft(body: DraftCreate, rag_data: Dict[str, Any]) -> DraftCreate:
+    """Overlay generated fields on the request (extra fields are kept)."""
+    return body.model_copy(
+        update={
+            "draft_text": rag_data["draft_text"],
+            "confidence": rag_data["confidence"],
+            "llm_model": rag_data["llm_model"],
+            "estimated_tokens_in": rag_data["estimated_tokens_in"],
+            "estimated_tokens_out": rag_data["estimated_tokens_out"],
+            "usd_cost": rag_data["usd_cost"],
+            "tags": body.tags + rag_data["tags"],
+            "source_snippets": [
+                SourceSnippet(**snippet) for snippet in rag_data["source_snippets"]
+            ],
+            "conversation_summary": rag_data["conversation_summary"],
+            "model_latency_ms": rag_data["model_latency_ms"],
+        }
+    )
+
+
+def rag_http_error(exc: RAGError) -> HTTPException:
+    status = 504 if isinstance(exc, RAGTimeout) else 502
+    return HTTPException(status_code=status, detail=f"RAG draft generation failed: {exc}")
+
+
 @app.post("/assistants/draft/rag")
 async def create_rag_draft(body: DraftCreate) -> Dict[str, str]:
     """Create a draft using RAG system for CS reply generation."""
     try:
-        # Generate draft using RAG
         rag_data = await generate_rag_draft(
             incoming_text=body.incoming_text, customer_display=body.customer_display
         )
+    except RAGError as exc:
+        raise rag_http_error(exc) from exc
 
-        # Merge RAG data with the request body
-        rag_draft = DraftCreate(
-            channel=body.channel,
-            conversation_id=body.conversation_id,
-            incoming_text=body.incoming_text,
-            draft_text=rag_data["draft_text"],
-            customer_display=body.customer_display,
-            subject=body.subject,
-            chat_topic=body.chat_topic,
-            confidence=rag_data["confidence"],
-            llm_model=rag_data["llm_model"],
-            estimated_tokens_in=rag_data["estimated_tokens_in"],
-            estimated_tokens_out=rag_data["estimated_tokens_out"],
-            usd_cost=rag_data["usd_cost"],
-            sla_deadline=body.sla_deadline,
-            tags=body.tags + rag_data["tags"],
-            source_snippets=rag_data["source_snippets"],
-            conversation_summary=rag_data["conversation_summary"],
-            order_context=body.order_context,
-            model_latency_ms=rag_data["model_latency_ms"],
-            auto_escalated=body.auto_escalated,
-            auto_escalation_reason=body.auto_escalation_reason,
-            assigned_to=body.assigned_to,
-            metadata=body.metadata,
-        )
-
-        # Create the draft using the existing logic
-        extra_fields = dict(getattr(rag_draft, "model_extra", {}) or {})
-        combined_metadata: Dict[str, Any] = {**extra_fields}
-        if rag_draft.metadata:
-            combined_metadata.update(rag_draft.metadata)
-
-        resolved_customer_display = rag_draft.customer_display
-        if not resolved_customer_display:
-            candidate = combined_metadata.get("customer_display")
-            if isinstance(candidate, str) and candidate.strip():
-                resolved_customer_display = candidate.strip()
-            else:
-                email = combined_metadata.get("customer_email")
-                if isinstance(email, str) and email.strip():
-                    resolved_customer_display = email.strip()
-
-        record = DraftModel(
-            channel=rag_draft.channel,
-            conversation_id=rag_draft.conversation_id,
-            customer_display=resolved_customer_display,
-            subject=rag_draft.subject,
-            chat_topic=rag_draft.chat_topic,
-            incoming_text=rag_draft.incoming_text,
-            draft_text=rag_draft.draft_text,
-            incoming_excerpt=clean_excerpt(rag_draft.incoming_text),
-            draft_excerpt=clean_excerpt(rag_draft.draft_text or ""),
-            confidence=(
-                rag_draft.confidence if rag_draft.confidence is not None else 0.75
-            ),
-            llm_model=rag_draft.llm_model or "rag-system",
-            estimated_tokens_in=rag_draft.estimated_tokens_in,
-            estimated_tokens_out=rag_draft.estimated_tokens_out,
-            usd_cost=rag_draft.usd_cost,
-            sla_deadline=parse_iso8601(rag_draft.sla_deadline),
-            tags=rag_draft.tags,
-            source_snippets=[
-                snippet.model_dump() for snippet in rag_draft.source_snippets
-            ],
-            conversation_summary=rag_draft.conversation_summary,
-            order_context=rag_draft.order_context,
-            model_latency_ms=rag_draft.model_latency_ms,
-            auto_escalated=rag_draft.auto_escalated,
-            auto_escalation_reason=rag_draft.auto_escalation_reason,
-            assigned_to=rag_draft.assigned_to,
-            extra_metadata=combined_metadata,
-        )
+    rag_draft = merge_rag_draft(body, rag_data)
+    record = draft_record(rag_draft, default_model="rag-system")
+    async with _session() as session:
+        session.add(record)
         append_audit(
-            record,
+            session,
+            record.id,
             actor="rag-system",
             action="draft.created",
             payload={"channel": rag_draft.channel, "source": "rag"},
         )
-        with _session() as session:
-            session.add(record)
-            session.commit()
-            detail = serialize_detail(record)
-            revision = compute_revision(detail)
-            envelope = build_event_envelope(
-                detail,
-                message="RAG-generated draft ready for review.",
-                event_type="draft:updated",
-                event_payload={
-                    "ticketId": detail.get("draft_id") or record.id,
-                    "revision": revision,
-                    "source": "rag",
-                },
-            )
-            draft_id = record.id
+        await session.commit()
+        DRAFT_COUNTS.clear()
+        detail, view = await load_detail(session, record)
+
+    envelope = build_event_envelope(
+        detail,
+        view=view,
+        message="RAG-generated draft ready for review.",
+        event_type="draft:updated",
+        event_payload={
+            "ticketId": detail.get("draft_id") or record.id,
+            "revision": compute_revision(detail),
+            "source": "rag",
+        },
+    )
+    await events.publish(encode_event(envelope))
+    return {"draft_id": record.id}
 
-        await events.publish(envelope)
-        return {"draft_id": draft_id}
 
-    except Exception as e:
+@app.post("/assistants/draft/rag/batch")
+async def create_rag_drafts(body: RagDraftBatch) -> Dict[str, Any]:
+    """Generate drafts for a backlog of messages in parallel.
+
+    Identical questions are answered once, generation runs concurrently
+    through the shared RAG client, and every successful draft is stored in
+    one transaction and announced in a single ``draft:batch`` event. Items
+    whose generation failed are reported with an ``error`` and not stored.
+    """
+    if len(body.items) > RAG_BATCH_MAX_ITEMS:
         raise HTTPException(
-            status_code=500, detail=f"RAG draft generation failed: {str(e)}"
+            status_code=413, detail=f"At most {RAG_BATCH_MAX_ITEMS} items per request"
         )
+    generated = await generate_rag_drafts([item.incoming_text for item in body.items])
+
+    results: List[Dict[str, Any]] = []
+    records: List[DraftModel] = []
+    for index, (item, rag_data) in enumerate(zip(body.items, generated)):
+        if isinstance(rag_data, BaseException):
+            results.append(
+                {"index": index, "error": str(rag_data) or type(rag_data).__name__}
+            )
+            continue
+        record = draft_record(merge_rag_draft(item, rag_data), default_model="rag-system")
+        records.append(record)
+        results.append({"index": index, "draft_id": record.id})
+
+    if records:
+        now = utc_now()
+        async with _session() as session:
+            session.add_all(records)
+            await session.flush()
+            await session.execute(
+                insert(DraftAuditEvent),
+                [
+                    {
+                        "draft_id": record.id,
+                        "ts": now,
+                        "actor": "rag-system",
+                        "action": "draft.created",
+                        "payload": {"channel": record.channel, "source": "rag"},
+                    }
+                    for record in records
+                ],
+            )
+            await session.commit()
+            DRAFT_COUNTS.clear()
+            views = await TICKET_VIEWS.refresh_many(
+                session, [record.id for record in records]
+            )
+            entries = [
+                (
+                    serialize_detail(
+                        record, list(views[record.id].audit), list(views[record.id].notes)
+                    ),
+                    views[record.id],
+                )
+                for record in records
+            ]
+
+        envelope = build_batch_envelope(
+            entries,
+            message=f"{len(records)} RAG-generated drafts ready for review.",
+            items=[
+                {
+                    "ticketId": detail["draft_id"],
+                    "action": "created",
+                    "status": map_status(detail.get("status")),
+                    "revision": compute_revision(detail),
+                }
+                for detail, _ in entries
+            ],
+        )
+        await events.publish(encode_event(envelope))
+
+    return {
+        "results": results,
+        "created": len(records),
+        "failed": len(results) - len(records),
+    }
 
 
 # Add cleanup on shutdown
 @app.on_event("shutdown")
 async def shutdown_with_rag() -> None:
     await cleanup_rag_resources()
-    await app.state.http.aclose()
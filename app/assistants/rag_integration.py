@@ -1,47 +1,235 @@
-"""RAG integration for assistants service."""
-
+"""RAG integration for assistants service.
+
+``RAGClient`` keeps one pooled keep-alive connection set to the RAG API,
+coalesces identical in-flight questions onto a single request, caps the
+number of concurrent calls and gives every call a deadline. Batches go
+through the RAG API's ``/query/batch`` endpoint in chunks.
+
+Env:
+  RAG_API_URL                 base URL (default http://localhost:8000)
+  RAG_CLIENT_CONCURRENCY      concurrent RAG API calls (default 8)
+  RAG_CLIENT_MAX_CONNECTIONS  pool size (default 16; keep-alive for all of them)
+  RAG_CLIENT_DEADLINE_SECONDS per-call deadline, queueing included (default 30)
+  RAG_CLIENT_BATCH_SIZE       questions per /query/batch call (default 16)
+"""
+
+import asyncio
+import os
 import sys
-from typing import Dict, Any
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 import httpx
 
 # Add the parent directory to the path to import rag_config
 sys.path.append("/home/justin/llama_rag")
 
+RAG_API_URL = os.getenv("RAG_API_URL", "http://localhost:8000")
+RAG_CLIENT_CONCURRENCY = int(os.getenv("RAG_CLIENT_CONCURRENCY", "8"))
+RAG_CLIENT_MAX_CONNECTIONS = int(os.getenv("RAG_CLIENT_MAX_CONNECTIONS", "16"))
+RAG_CLIENT_DEADLINE_SECONDS = float(os.getenv("RAG_CLIENT_DEADLINE_SECONDS", "30"))
+RAG_CLIENT_BATCH_SIZE = int(os.getenv("RAG_CLIENT_BATCH_SIZE", "16"))
+
+
+class RAGError(Exception):
+    """The RAG API failed or returned an unusable response."""
+
+
+class RAGTimeout(RAGError):
+    """The RAG API did not answer within the deadline."""
+
+
+def _question_key(question: str, top_k: int) -> Tuple[str, int]:
+    return (" ".join(question.lower().split()), top_k)
+
 
 class RAGClient:
     """Client for interacting with the RAG API."""
 
-    def __init__(self, base_url: str = "http://localhost:8000"):
-        self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+    def __init__(
+        self,
+        base_url: str = RAG_API_URL,
+        *,
+        concurrency: int = RAG_CLIENT_CONCURRENCY,
+        max_connections: int = RAG_CLIENT_MAX_CONNECTIONS,
+        deadline: float = RAG_CLIENT_DEADLINE_SECONDS,
+        batch_size: int = RAG_CLIENT_BATCH_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.deadline = deadline
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.coalesced = 0
+        self._concurrency = concurrency
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Tuple[str, int], "asyncio.Future[Dict[str, Any]]"] = {}
+        self._batch_supported = True
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool binds to the serving event loop.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.deadline, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._concurrency)
+        return self._slots
+
+    async def _post(self, path: str, **kwargs: Any) -> httpx.Response:
+        try:
+            async with asyncio.timeout(self.deadline):
+                async with self.slots:
+                    response = await self.client.post(path, **kwargs)
+        except TimeoutError as exc:
+            raise RAGTimeout(f"RAG API did not answer within {self.deadline:g}s") from exc
+        except httpx.HTTPError as exc:
+            raise RAGError(f"RAG API request failed: {exc}") from exc
+        return response
+
+    async def _query_uncached(self, question: str, top_k: int) -> Dict[str, Any]:
+        response = await self._post("/query", json={"question": question, "top_k": top_k})
+        if response.status_code >= 400:
+            raise RAGError(f"RAG API returned {response.status_code}")
+        return response.json()
 
     async def query(self, question: str, top_k: int = 5) -> Dict[str, Any]:
-        """Query the RAG system for information."""
+        """Query the RAG system; identical questions in flight share one call."""
+        key = _question_key(question, top_k)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            response = await self.client.post(
-                f"{self.base_url}/query", json={"question": question, "top_k": top_k}
+            result = await self._query_uncached(question, top_k)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise; don't warn when there are none
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _batch_result(row: Dict[str, Any]) -> Any:
+        """A ``/query/batch`` row's answer, or a RAGError for a failed row."""
+        result = row.get("result")
+        if row.get("error") or not isinstance(result, dict):
+            return RAGError(f"RAG query failed: {row.get('error') or 'no result'}")
+        if result.get("error"):
+            # Older RAG API versions reported failures inside ``result``.
+            return RAGError(str(result["error"]))
+        if not result.get("answer"):
+            return RAGError("RAG API returned no answer")
+        return result
+
+    async def _query_chunk(
+        self, questions: List[str], top_k: int
+    ) -> List[Any]:
+        """Results for ``questions`` in order; failed rows are RAGError instances."""
+        if self._batch_supported:
+            response = await self._post(
+                "/query/batch",
+                params={"stream": "false"},
+                json={"questions": questions, "top_k": top_k},
+            )
+            if response.status_code in (404, 405):
+                # Older RAG API without the batch endpoint.
+                self._batch_supported = False
+            elif response.status_code >= 400:
+                raise RAGError(f"RAG API returned {response.status_code}")
+            else:
+                return [self._batch_result(row) for row in response.json()["results"]]
+        return await asyncio.gather(
+            *(self._query_uncached(question, top_k) for question in questions)
+        )
+
+    async def query_many(
+        self, questions: Sequence[str], top_k: int = 5
+    ) -> List[Any]:
+        """Answer ``questions`` in input order; failures are returned as exceptions.
+
+        Duplicates and questions already in flight are coalesced; the rest are
+        sent as ``/query/batch`` chunks running concurrently (bounded by the
+        client's slots).
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[Tuple[str, int], "asyncio.Future[Dict[str, Any]]"] = {}
+        owned: Dict[Tuple[str, int], str] = {}
+        for question in questions:
+            key = _question_key(question, top_k)
+            if key in futures:
+                self.coalesced += 1
+            elif key in self._inflight:
+                self.coalesced += 1
+                futures[key] = self._inflight[key]
+            else:
+                futures[key] = self._inflight[key] = loop.create_future()
+                owned[key] = question
+
+        async def run_chunk(keys: List[Tuple[str, int]]) -> None:
+            try:
+                results = await self._query_chunk([owned[key] for key in keys], top_k)
+            except BaseException as exc:
+                for key in keys:
+                    futures[key].set_exception(exc)
+                    futures[key].exception()
+            else:
+                for key, result in zip(keys, results):
+                    if isinstance(result, BaseException):
+                        futures[key].set_exception(result)
+                        futures[key].exception()
+                    else:
+                        futures[key].set_result(result)
+            finally:
+                for key in keys:
+                    self._inflight.pop(key, None)
+
+        keys = list(owned)
+        await asyncio.gather(
+            *(
+                run_chunk(keys[start : start + self.batch_size])
+                for start in range(0, len(keys), self.batch_size)
             )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"RAG query failed: {e}")
-            return {
-                "answer": "I apologize, but I'm unable to retrieve specific information at the moment. Please contact our technical support team for assistance.",
-                "sources": [],
-                "mode": "error",
-            }
+        )
+        return list(
+            await asyncio.gather(
+                *(asyncio.shield(futures[_question_key(q, top_k)]) for q in questions),
+                return_exceptions=True,
+            )
+        )
 
     async def health_check(self) -> bool:
         """Check if the RAG API is healthy."""
         try:
-            response = await self.client.get(f"{self.base_url}/health")
+            response = await self.client.get("/health", timeout=5.0)
             return response.status_code == 200
         except Exception:
             return False
 
     async def close(self):
         """Close the HTTP client."""
-        await self.client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 class RAGDraftGenerator:
@@ -125,17 +313,10 @@ class RAGDraftGenerator:
 
         return reply
 
-    async def generate_draft(
-        self, incoming_text: str, customer_display: str = None
+    def build_draft(
+        self, customer_question: str, rag_response: Dict[str, Any], latency_ms: int
     ) -> Dict[str, Any]:
-        """Generate a CS reply draft using RAG."""
-        # Extract the customer's question
-        customer_question = self.extract_customer_question(incoming_text)
-
-        # Query the RAG system
-        rag_response = await self.rag.query(customer_question)
-
-        # Format the response as a professional CS reply
+        """Turn one RAG answer into the draft fields stored by the service."""
         draft_text = self.format_rag_response(rag_response, customer_question)
 
         # Extract source snippets for the draft
@@ -157,11 +338,34 @@ class RAGDraftGenerator:
             "estimated_tokens_in": len(customer_question),
             "estimated_tokens_out": len(draft_text),
             "usd_cost": 0.0,  # RAG system has no cost
-            "model_latency_ms": 100,  # Estimated latency
+            "model_latency_ms": latency_ms,
             "tags": ["rag-generated", "technical-support"],
             "conversation_summary": [customer_question],
         }
 
+    async def generate_draft(
+        self, incoming_text: str, customer_display: str = None
+    ) -> Dict[str, Any]:
+        """Generate a CS reply draft using RAG."""
+        customer_question = self.extract_customer_question(incoming_text)
+        started = time.perf_counter()
+        rag_response = await self.rag.query(customer_question)
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        return self.build_draft(customer_question, rag_response, latency_ms)
+
+    async def generate_drafts(self, incoming_texts: Sequence[str]) -> List[Any]:
+        """Generate drafts for many messages; failed items are returned as exceptions."""
+        questions = [self.extract_customer_question(text) for text in incoming_texts]
+        started = time.perf_counter()
+        responses = await self.rag.query_many(questions)
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        return [
+            response
+            if isinstance(response, BaseException)
+            else self.build_draft(question, response, latency_ms)
+            for question, response in zip(questions, responses)
+        ]
+
 
 # Global instances
 rag_client = RAGClient()
@@ -175,6 +379,11 @@ async def generate_rag_draft(
     return await rag_generator.generate_draft(incoming_text, customer_display)
 
 
+async def generate_rag_drafts(incoming_texts: Sequence[str]) -> List[Any]:
+    """Generate drafts for a batch of messages (coalesced and run in parallel)."""
+    return await rag_generator.generate_drafts(incoming_texts)
+
+
 async def cleanup_rag_resources():
     """Clean up RAG resources."""
     await rag_client.close()
@@ -7,12 +7,24 @@ from typing import Dict, List
 import httpx
 import pytest
 
+from app.assistants.event_bus import (
+    LOCAL_ID_PREFIX,
+    MemoryEventBus,
+    RedisEventBus,
+    SlowConsumerError,
+)
 from app.assistants.main import (
     DEFAULT_REFRESH_SECONDS,
+    DraftModel,
+    _backfill_history,
+    _session,
+    deliveries,
+    ENGINE,
     events,
     registry,
     reset_state_for_tests,
     app,
+    to_inbox_ticket,
 )
 
 
@@ -26,9 +38,9 @@ async def client() -> httpx.AsyncClient:
         transport=transport, base_url="http://testserver"
     ) as http_client:
         registry.clear()
-        reset_state_for_tests()
+        await reset_state_for_tests()
         yield http_client
-        reset_state_for_tests()
+        await reset_state_for_tests()
         registry.clear()
 
 
@@ -100,11 +112,11 @@ async def test_list_drafts_supports_pagination(client: httpx.AsyncClient) -> Non
     assert first_page.status_code == 200
     payload = first_page.json()
     assert payload["total"] == 3
-    assert payload["next_cursor"] == "2"
+    assert isinstance(payload["next_cursor"], str)
     assert len(payload["drafts"]) == 2
 
     second_page = await client.get(
-        "/assistants/drafts", params={"limit": 2, "cursor": 2}
+        "/assistants/drafts", params={"limit": 2, "cursor": payload["next_cursor"]}
     )
     assert second_page.status_code == 200
     payload2 = second_page.json()
@@ -112,6 +124,59 @@ async def test_list_drafts_supports_pagination(client: httpx.AsyncClient) -> Non
     assert payload2["next_cursor"] is None
     assert len(payload2["drafts"]) == 1
 
+    seen = [d["conversation_id"] for d in payload["drafts"] + payload2["drafts"]]
+    assert sorted(seen) == ["conv-0", "conv-1", "conv-2"]
+
+    legacy = await client.get("/assistants/drafts", params={"limit": 2, "cursor": 2})
+    assert legacy.status_code == 200
+    assert [d["id"] for d in legacy.json()["drafts"]] == [
+        d["id"] for d in payload2["drafts"]
+    ]
+
+
+async def test_list_drafts_keyset_follows_sla_order(client: httpx.AsyncClient) -> None:
+    deadlines = ["2030-01-03T00:00:00Z", "2030-01-01T00:00:00Z", "2030-01-02T00:00:00Z"]
+    for index, deadline in enumerate(deadlines):
+        await client.post(
+            "/assistants/draft",
+            json=_draft_payload(conversation_id=f"conv-sla-{index}", sla_deadline=deadline),
+        )
+
+    collected: List[str] = []
+    cursor = None
+    while True:
+        params: Dict[str, object] = {"limit": 1, "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/assistants/drafts", params=params)
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["total"] is None
+        collected.extend(d["conversation_id"] for d in payload["drafts"])
+        cursor = payload["next_cursor"]
+        if not cursor:
+            break
+
+    assert collected == ["conv-sla-1", "conv-sla-2", "conv-sla-0"]
+
+    bad = await client.get("/assistants/drafts", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+async def test_list_drafts_total_refreshes_after_writes(
+    client: httpx.AsyncClient,
+) -> None:
+    await client.post("/assistants/draft", json=_draft_payload())
+    first = await client.get("/assistants/drafts")
+    assert first.json()["total"] == 1
+
+    await client.post("/assistants/draft", json=_draft_payload(conversation_id="conv-9"))
+    second = await client.get("/assistants/drafts")
+    assert second.json()["total"] == 2
+
+    exact = await client.get("/assistants/drafts", params={"count": "exact"})
+    assert exact.json()["total"] == 2
+
 
 async def test_get_draft_detail_includes_sources(client: httpx.AsyncClient) -> None:
     create = await client.post(
@@ -163,9 +228,16 @@ async def test_approve_dispatches_via_adapter(client: httpx.AsyncClient) -> None
         json={"draft_id": draft_id, "approver_user_id": "operator-1"},
     )
     assert approve.status_code == 200
-    assert approve.json()["sent_msg_id"] == "external-123"
+    delivery_id = approve.json()["delivery_id"]
+    assert approve.json()["delivery_status"] == "pending"
+    assert not sent_payloads
 
+    assert await deliveries.drain() == 1
     assert sent_payloads and sent_payloads[0]["draft_id"] == draft_id
+    assert sent_payloads[0]["idempotency_key"].startswith(f"{draft_id}:")
+    delivery = (await client.get(f"/assistants/deliveries/{delivery_id}")).json()
+    assert delivery["status"] == "sent"
+    assert delivery["sent_msg_id"] == "external-123"
 
     detail = await client.get(f"/assistants/drafts/{draft_id}")
     assert detail.status_code == 200
@@ -201,9 +273,14 @@ async def test_edit_supports_async_adapter(client: httpx.AsyncClient) -> None:
         },
     )
     assert edit.status_code == 200
-    assert edit.json()["sent_msg_id"] == "external-async-456"
+    await deliveries.drain()
+    delivery = (
+        await client.get(f"/assistants/deliveries/{edit.json()['delivery_id']}")
+    ).json()
+    assert delivery["sent_msg_id"] == "external-async-456"
 
     assert sent_payloads and sent_payloads[0]["draft_id"] == draft_id
+    assert sent_payloads[0]["draft_text"] == "Updated draft text for async adapter."
 
     detail = await client.get(f"/assistants/drafts/{draft_id}")
     assert detail.status_code == 200
@@ -342,13 +419,13 @@ async def test_list_drafts_filters_by_assigned(client: httpx.AsyncClient) -> Non
 
 
 async def test_draft_creation_emits_event_payload(client: httpx.AsyncClient) -> None:
-    queue = await events.subscribe()
+    subscription = await events.subscribe()
     try:
         create = await client.post("/assistants/draft", json=_draft_payload())
         assert create.status_code == 200
-        raw = await asyncio.wait_for(queue.get(), timeout=2)
+        raw = (await subscription.get(timeout=2)).data
     finally:
-        await events.unsubscribe(queue)
+        await events.unsubscribe(subscription)
 
     payload = json.loads(raw)
     assert payload["event"]["type"] == "draft:updated"
@@ -363,16 +440,16 @@ async def test_approve_emits_event_with_adapter_payload(
 
     registry.register("email", lambda payload: "external-evt-123")
 
-    queue = await events.subscribe()
+    subscription = await events.subscribe()
     try:
         approve = await client.post(
             "/assistants/approve",
             json={"draft_id": draft_id, "approver_user_id": "approver"},
         )
         assert approve.status_code == 200
-        raw = await asyncio.wait_for(queue.get(), timeout=2)
+        raw = (await subscription.get(timeout=2)).data
     finally:
-        await events.unsubscribe(queue)
+        await events.unsubscribe(subscription)
 
     payload = json.loads(raw)
     assert payload["event"]["type"] == "draft:approved"
@@ -388,7 +465,7 @@ async def test_feedback_note_emits_feedback_event(client: httpx.AsyncClient) ->
         {"type": "feedback", "vote": "up", "comment": "Great draft"}
     )
 
-    queue = await events.subscribe()
+    subscription = await events.subscribe()
     try:
         response = await client.post(
             "/assistants/notes",
@@ -399,11 +476,437 @@ async def test_feedback_note_emits_feedback_event(client: httpx.AsyncClient) ->
             },
         )
         assert response.status_code == 200
-        raw = await asyncio.wait_for(queue.get(), timeout=2)
+        raw = (await subscription.get(timeout=2)).data
     finally:
-        await events.unsubscribe(queue)
+        await events.unsubscribe(subscription)
 
     payload = json.loads(raw)
     assert payload["event"]["type"] == "draft:feedback"
     assert payload["feedback"]["vote"] == "up"
     assert payload["feedback"]["comment"] == "Great draft"
+
+
+async def test_concurrent_approvals_do_not_block_each_other(
+    client: httpx.AsyncClient,
+) -> None:
+    draft_ids = []
+    for index in range(5):
+        create = await client.post(
+            "/assistants/draft",
+            json=_draft_payload(conversation_id=f"conv-burst-{index}"),
+        )
+        draft_ids.append(create.json()["draft_id"])
+
+    registry.register("email", lambda payload: f"external-{payload['draft_id']}")
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/assistants/approve",
+                json={"draft_id": draft_id, "approver_user_id": "approver"},
+            )
+            for draft_id in draft_ids
+        ),
+        client.get("/health"),
+    )
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[-1].json()["db"] is True
+
+    listing = await client.get("/assistants/drafts", params={"status": "sent"})
+    assert listing.json()["total"] == 5
+
+
+async def test_list_projection_matches_detail_fields(client: httpx.AsyncClient) -> None:
+    create = await client.post(
+        "/assistants/draft",
+        json=_draft_payload(sla_deadline="2030-01-01T00:00:00Z", assigned_to="Ops"),
+    )
+    draft_id = create.json()["draft_id"]
+
+    listing = await client.get("/assistants/drafts")
+    row = listing.json()["drafts"][0]
+    detail = (await client.get(f"/assistants/drafts/{draft_id}")).json()
+
+    assert "incoming_text" not in row and "audit_log" not in row
+    for key, value in row.items():
+        if key != "time_remaining_seconds":
+            assert detail[key] == value, key
+
+
+async def test_concurrent_notes_are_all_kept(client: httpx.AsyncClient) -> None:
+    create = await client.post("/assistants/draft", json=_draft_payload())
+    draft_id = create.json()["draft_id"]
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/assistants/notes",
+                json={"draft_id": draft_id, "author_user_id": f"agent-{index}", "text": f"note {index}"},
+            )
+            for index in range(8)
+        )
+    )
+    assert all(response.status_code == 200 for response in responses)
+
+    detail = (await client.get(f"/assistants/drafts/{draft_id}")).json()
+    assert sorted(note["text"] for note in detail["notes"]) == [f"note {i}" for i in range(8)]
+    assert len({note["note_id"] for note in detail["notes"]}) == 8
+    actions = [entry["action"] for entry in detail["audit_log"]]
+    assert actions[0] == "draft.created"
+    assert actions.count("draft.note_added") == 8
+
+
+async def test_legacy_json_history_is_backfilled(client: httpx.AsyncClient) -> None:
+    create = await client.post("/assistants/draft", json=_draft_payload())
+    draft_id = create.json()["draft_id"]
+    async with _session() as session:
+        record = await session.get(DraftModel, draft_id)
+        record.audit_log = [
+            {"timestamp": "2024-01-01T00:00:00Z", "actor": "ops", "action": "legacy.event", "payload": {}}
+        ]
+        record.notes = [
+            {"note_id": "n1", "author_user_id": "ops", "text": "old note", "created_at": "2024-01-01T00:00:00Z"}
+        ]
+        await session.commit()
+
+    async with ENGINE.begin() as conn:
+        await conn.run_sync(_backfill_history)
+
+    detail = (await client.get(f"/assistants/drafts/{draft_id}")).json()
+    assert detail["audit_log"][0]["action"] == "legacy.event"
+    assert [note["text"] for note in detail["notes"]] == ["old note"]
+    async with _session() as session:
+        record = await session.get(DraftModel, draft_id)
+        assert record.audit_log == [] and record.notes == []
+
+
+async def test_incremental_ticket_matches_full_rebuild(client: httpx.AsyncClient) -> None:
+    create = await client.post("/assistants/draft", json=_draft_payload())
+    draft_id = create.json()["draft_id"]
+    await client.post(
+        "/assistants/notes",
+        json={"draft_id": draft_id, "author_user_id": "agent", "text": "Check stock"},
+    )
+
+    subscription = await events.subscribe()
+    try:
+        await client.post(
+            "/assistants/notes",
+            json={
+                "draft_id": draft_id,
+                "author_user_id": "agent",
+                "text": json.dumps({"type": "feedback", "vote": "down"}),
+            },
+        )
+        await client.post(
+            "/assistants/edit",
+            json={
+                "draft_id": draft_id,
+                "editor_user_id": "editor",
+                "final_text": "Edited reply",
+                "learning_notes": "Mention restock date",
+            },
+        )
+        await subscription.get(timeout=2)
+        raw = (await subscription.get(timeout=2)).data
+    finally:
+        await events.unsubscribe(subscription)
+
+    assert isinstance(raw, bytes)
+    envelope = json.loads(raw)
+    detail = (await client.get(f"/assistants/drafts/{draft_id}")).json()
+    expected = to_inbox_ticket(detail)
+    assert envelope["ticket"]["timeline"] == expected["timeline"]
+    assert envelope["ticket"]["aiDraft"] == expected["aiDraft"]
+    assert envelope["draft"] == expected["aiDraft"]
+    assert envelope["draft"]["revision"] == 5
+
+
+async def test_event_bus_replays_after_last_event_id() -> None:
+    bus = MemoryEventBus(queue_size=10, replay_size=3)
+    ids = [await bus.publish(f'{{"n": {n}}}'.encode()) for n in range(5)]
+
+    resumed = await bus.subscribe(last_event_id=ids[2])
+    replayed = [await resumed.get(timeout=1) for _ in range(2)]
+    assert [event.id for event in replayed] == ids[3:]
+    assert replayed[0].frame == f"id: {ids[3]}\ndata: {{\"n\": 3}}\n\n".encode()
+    assert resumed.gap is False
+
+    stale = await bus.subscribe(last_event_id=ids[0])
+    assert stale.gap is True
+    assert stale.backlog == 3
+
+
+async def test_redis_bus_resets_clients_resuming_across_local_fallback() -> None:
+    class UnavailableRedis:
+        async def xadd(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+        async def xrevrange(self, *args, **kwargs):
+            return []
+
+        async def xread(self, *args, **kwargs):
+            await asyncio.sleep(3600)
+
+        async def xrange(self, *args, **kwargs):
+            return []
+
+        async def aclose(self) -> None:
+            return None
+
+    bus = RedisEventBus("redis://unused", "test:events", queue_size=10, replay_size=10)
+    bus._redis = UnavailableRedis()
+    try:
+        stream_id = f"{bus._next_id().split('-')[0]}-0"
+        local_id = await bus.publish(b"{}")
+        await bus.publish(b"{}")
+        assert local_id.startswith(LOCAL_ID_PREFIX)
+
+        # a fallback id cannot be ordered against stream ids: reset, no replay
+        from_local = await bus.subscribe(last_event_id=local_id)
+        assert from_local.gap is True
+        assert from_local.backlog == 0
+        # nor can a stream id once local-only events were delivered after it
+        from_stream = await bus.subscribe(last_event_id=stream_id)
+        assert from_stream.gap is True
+    finally:
+        await bus.close()
+
+
+async def test_event_bus_disconnects_slow_consumer() -> None:
+    bus = MemoryEventBus(queue_size=2, replay_size=10)
+    slow = await bus.subscribe()
+    fast = await bus.subscribe()
+    for n in range(3):
+        await bus.publish(b"{}")
+        await fast.get(timeout=1)
+
+    with pytest.raises(SlowConsumerError):
+        await slow.get(timeout=1)
+    stats = bus.stats()
+    assert stats["slow_consumer_disconnects"] == 1
+    assert [sub["delivered"] for sub in stats["subscribers"]] == [3]
+
+
+async def test_bulk_actions_apply_in_one_batch(client: httpx.AsyncClient) -> None:
+    draft_ids = []
+    for index in range(4):
+        create = await client.post(
+            "/assistants/draft",
+            json=_draft_payload(conversation_id=f"conv-bulk-{index}"),
+        )
+        draft_ids.append(create.json()["draft_id"])
+
+    sent: List[str] = []
+
+    async def adapter(payload: Dict[str, object]) -> str:
+        sent.append(str(payload["draft_id"]))
+        if payload["draft_id"] == draft_ids[1]:
+            raise RuntimeError("channel down")
+        return f"external-{payload['draft_id']}"
+
+    registry.register("email", adapter)
+
+    subscription = await events.subscribe()
+    try:
+        response = await client.post(
+            "/assistants/bulk",
+            json={
+                "actor_user_id": "lead",
+                "items": [
+                    {"draft_id": draft_ids[0], "action": "approve"},
+                    {"draft_id": draft_ids[1], "action": "approve"},
+                    {"draft_id": draft_ids[2], "action": "escalate", "reason": "VIP", "assign_to": "Tier2"},
+                    {"draft_id": draft_ids[3], "action": "assign", "assign_to": "Ops"},
+                    {"draft_id": draft_ids[3], "action": "approve"},
+                    {"draft_id": "missing", "action": "approve"},
+                ],
+            },
+        )
+        raw = (await subscription.get(timeout=2)).data
+    finally:
+        await events.unsubscribe(subscription)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["applied"] == 4 and body["failed"] == 2
+    results = body["results"]
+    assert await deliveries.drain() == 2
+    first = (await client.get(f"/assistants/deliveries/{results[0]['delivery_id']}")).json()
+    assert first["sent_msg_id"] == f"external-{draft_ids[0]}"
+    second = (await client.get(f"/assistants/deliveries/{results[1]['delivery_id']}")).json()
+    assert second["status"] == "pending" and second["last_error"] == "channel down"
+    assert results[2]["status"] == "escalated"
+    assert results[3]["status"] == "open" and results[3]["revision"] == 3
+    assert results[4]["error"] == "duplicate"
+    assert results[5]["error"] == "not_found"
+    assert sorted(sent) == sorted(draft_ids[:2])
+
+    envelope = json.loads(raw)
+    assert envelope["event"]["type"] == "draft:batch"
+    assert {ticket["id"] for ticket in envelope["tickets"]} == set(draft_ids)
+    assert subscription.backlog == 0
+
+    detail = (await client.get(f"/assistants/drafts/{draft_ids[3]}")).json()
+    assert detail["assigned_to"] == "Ops"
+    assert detail["audit_log"][-1]["action"] == "draft.assigned"
+
+
+async def test_outbox_retries_then_gives_up(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.assistants import main as assistants_main
+
+    monkeypatch.setattr(assistants_main, "DELIVERY_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(assistants_main, "delivery_backoff", lambda attempts: 0.0)
+    attempts: List[str] = []
+
+    def flaky(payload: Dict[str, object]) -> str:
+        attempts.append(str(payload["idempotency_key"]))
+        raise RuntimeError("smtp timeout")
+
+    registry.register("email", flaky, concurrency=1)
+    create = await client.post("/assistants/draft", json=_draft_payload())
+    approve = await client.post(
+        "/assistants/approve",
+        json={"draft_id": create.json()["draft_id"], "approver_user_id": "ops"},
+    )
+    delivery_id = approve.json()["delivery_id"]
+
+    assert await deliveries.drain() == 2
+    delivery = (await client.get(f"/assistants/deliveries/{delivery_id}")).json()
+    assert delivery["status"] == "failed"
+    assert delivery["attempts"] == 2
+    assert delivery["last_error"] == "smtp timeout"
+    assert len(attempts) == 2 and len(set(attempts)) == 1
+
+
+async def test_rag_batch_coalesces_and_reports_failures(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.assistants import rag_integration
+
+    calls: List[List[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        questions = json.loads(request.content)["questions"]
+        calls.append(questions)
+        if any("broken" in question for question in questions):
+            return httpx.Response(500)
+        return httpx.Response(
+            200,
+            json={
+                "results": [
+                    {"index": i, "question": q, "error": "RAG query failed: no index"}
+                    if "warranty" in q
+                    else {"index": i, "question": q, "result": {"answer": f"A: {q}", "sources": ["https://example.com/a"]}}
+                    for i, q in enumerate(questions)
+                ]
+            },
+        )
+
+    rag_client = rag_integration.RAGClient(
+        "http://rag", batch_size=1, transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(rag_integration.rag_generator, "rag", rag_client)
+
+    items = [
+        _draft_payload(conversation_id="c1", incoming_text="Do you ship to Canada?"),
+        _draft_payload(conversation_id="c2", incoming_text="do you ship to  canada?"),
+        _draft_payload(conversation_id="c3", incoming_text="Is the broken pump covered?"),
+        _draft_payload(conversation_id="c4", incoming_text="How long is the warranty?"),
+    ]
+    subscription = await events.subscribe()
+    try:
+        response = await client.post("/assistants/draft/rag/batch", json={"items": items})
+        raw = (await subscription.get(timeout=2)).data
+    finally:
+        await events.unsubscribe(subscription)
+        await rag_client.close()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2 and body["failed"] == 2
+    assert "500" in body["results"][2]["error"]
+    # a per-row error answered with HTTP 200 is a failure, not an empty draft
+    assert "no index" in body["results"][3]["error"]
+    assert sorted(len(batch) for batch in calls) == [1, 1, 1]
+    assert rag_client.coalesced == 1
+
+    draft_id = body["results"][1]["draft_id"]
+    detail = (await client.get(f"/assistants/drafts/{draft_id}")).json()
+    assert detail["conversation_id"] == "c2"
+    assert "A: Do you ship to Canada?" in detail["draft_text"]
+    assert detail["llm_model"] == "rag-system"
+    assert len(json.loads(raw)["tickets"]) == 2
+
+
+async def test_rag_single_draft_maps_timeouts_to_504(
+    client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.assistants import rag_integration
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"answer": "late"})
+
+    rag_client = rag_integration.RAGClient(
+        "http://rag", deadline=0.05, transport=httpx.MockTransport(slow)
+    )
+    monkeypatch.setattr(rag_integration.rag_generator, "rag", rag_client)
+    try:
+        response = await client.post("/assistants/draft/rag", json=_draft_payload())
+    finally:
+        await rag_client.close()
+    assert response.status_code == 504
+
+
+async def test_search_ranks_highlights_and_tracks_edits(
+    client: httpx.AsyncClient,
+) -> None:
+    ids = []
+    for index in range(3):
+        created = await client.post(
+            "/assistants/draft",
+            json=_draft_payload(
+                conversation_id=f"conv-search-{index}",
+                subject="Refund request" if index == 0 else f"Question {index}",
+                incoming_text=f"Where is my refund for order {index}? <b>asap</b>",
+                draft_text="We are looking into it.",
+            ),
+        )
+        ids.append(created.json()["draft_id"])
+    await client.post(
+        "/assistants/draft",
+        json=_draft_payload(conversation_id="conv-other", incoming_text="Sizing help"),
+    )
+
+    first = await client.get("/assistants/search", params={"q": "refun", "limit": 2})
+    assert first.status_code == 200
+    body = first.json()
+    assert [d["id"] for d in body["drafts"]][0] == ids[0]
+    assert len(body["drafts"]) == 2
+    snippet = body["drafts"][0]["snippet"]
+    assert "<mark>" in snippet and "<b>" not in snippet
+    second = await client.get(
+        "/assistants/search", params={"q": "refun", "cursor": body["next_cursor"]}
+    )
+    found = [d["id"] for d in body["drafts"]] + [d["id"] for d in second.json()["drafts"]]
+    assert sorted(found) == sorted(ids)
+    assert second.json()["next_cursor"] is None
+
+    await client.post(
+        "/assistants/edit",
+        json={
+            "draft_id": ids[1],
+            "final_text": "Your replacement parcel ships today.",
+            "editor_user_id": "agent-1",
+        },
+    )
+    edited = await client.get("/assistants/search", params={"q": "replacement parcel"})
+    assert [d["id"] for d in edited.json()["drafts"]] == [ids[1]]
+    pending_only = await client.get(
+        "/assistants/search", params={"q": "parcel", "status": "pending"}
+    )
+    assert pending_only.json()["drafts"] == []
+    assert (await client.get("/assistants/search", params={"q": "!!"})).status_code == 400
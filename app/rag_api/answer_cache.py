@@ -0,0 +1,138 @@
+"""In-process answer caches for the RAG API.
+
+- TTLCache: small LRU with per-entry expiry that sits in front of Redis (L1).
+- SemanticCache: nearest-neighbour lookup over embedded, normalized questions
+  so reworded duplicates reuse a prior answer.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_UNIT_SPLIT = re.compile(r"(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)")
+_NON_WORD = re.compile(r"[^\w\s.-]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and split glued units ("600hp" -> "600 hp")."""
+    text = question.lower().strip()
+    text = _NON_WORD.sub(" ", text)
+    text = _UNIT_SPLIT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip(" .-")
+
+
+class TTLCache:
+    """Bounded LRU mapping with a time-to-live per entry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0) -> None:
+        self.maxsize = max(maxsize, 0)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if not self.maxsize:
+            return
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> int:
+        n = len(self._data)
+        self._data.clear()
+        return n
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SemanticCache:
+    """Cosine-similarity cache over question embeddings.
+
+    Vectors live in a preallocated ring buffer so lookups are a single
+    matrix-vector product. Entries are partitioned by ``scope`` (e.g. top_k
+    and mode) so answers never cross request shapes.
+    """
+
+    def __init__(self, capacity: int = 2048, threshold: float = 0.92, ttl: float = 600.0) -> None:
+        self.capacity = max(capacity, 1)
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes: List[Optional[Hashable]] = [None] * self.capacity
+        self._values: List[Any] = [None] * self.capacity
+        self._expires = np.zeros(self.capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm else arr
+
+    def lookup(self, scope: Hashable, vector: Sequence[float]) -> Tuple[Optional[Any], float]:
+        """Return (value, similarity) of the best live match in ``scope``.
+
+        ``value`` is None when nothing clears the threshold; the best
+        similarity is still returned for metrics.
+        """
+        if self._vectors is None or not self._size:
+            return None, 0.0
+        query = self._unit(vector)
+        if query.shape[0] != self._vectors.shape[1]:
+            return None, 0.0
+        sims = self._vectors[: self._size] @ query
+        now = time.monotonic()
+        live = self._expires[: self._size] >= now
+        in_scope = np.fromiter(
+            (s == scope for s in self._scopes[: self._size]), dtype=bool, count=self._size
+        )
+        sims = np.where(live & in_scope, sims, -1.0)
+        best = int(np.argmax(sims))
+        score = float(sims[best])
+        if score >= self.threshold:
+            return self._values[best], score
+        return None, max(score, 0.0)
+
+    def add(self, scope: Hashable, vector: Sequence[float], value: Any) -> None:
+        unit = self._unit(vector)
+        if self._vectors is None or self._vectors.shape[1] != unit.shape[0]:
+            self._vectors = np.zeros((self.capacity, unit.shape[0]), dtype=np.float32)
+            self._size = 0
+            self._next = 0
+        slot = self._next
+        self._vectors[slot] = unit
+        self._scopes[slot] = scope
+        self._values[slot] = value
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self) -> int:
+        n = self._size
+        self._vectors = None
+        self._scopes = [None] * self.capacity
+        self._values = [None] * self.capacity
+        self._expires[:] = 0
+        self._next = 0
+        self._size = 0
+        return n
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,203 @@
+"""Compiled matcher for the human-authored corrections layer.
+
+All patterns from ``corrections.yaml`` are folded into two regexes:
+
+- a plain alternation used to reject non-matching questions in one pass
+  (the common case), and
+- a chain of optional lookaheads, one named group per pattern, that reports
+  every matching pattern in a single match so the highest-priority item can
+  be chosen.
+
+Patterns that cannot be combined (e.g. they carry their own named groups or
+inline global flags) fall back to being searched individually. The YAML file
+is watched by mtime and the matcher is rebuilt off the request path.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompiledCorrections:
+    items: List[Dict[str, Any]]
+    mtime: float
+    any_rx: Optional["re.Pattern[str]"] = None
+    all_rx: Optional["re.Pattern[str]"] = None
+    group_item: Dict[str, int] = field(default_factory=dict)
+    fallback: List[Tuple["re.Pattern[str]", int]] = field(default_factory=list)
+    pattern_count: int = 0
+    build_ms: float = 0.0
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        best: Optional[int] = None
+        if self.any_rx is not None and self.any_rx.search(question):
+            m = self.all_rx.match(question)
+            if m:
+                for name, value in m.groupdict().items():
+                    if value is not None:
+                        idx = self.group_item[name]
+                        if best is None or idx < best:
+                            best = idx
+        for rx, idx in self.fallback:
+            if best is not None and idx >= best:
+                continue
+            if rx.search(question):
+                best = idx
+        return self.items[best] if best is not None else None
+
+
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+_NUMBERED_BACKREF = re.compile(r"\\[1-9]")
+
+
+def _combinable(rx: "re.Pattern[str]") -> bool:
+    """Named groups, inline global flags and numbered backreferences break in a union."""
+    pat = rx.pattern
+    return not (rx.groupindex or _GLOBAL_FLAGS.search(pat) or _NUMBERED_BACKREF.search(pat))
+
+
+def _rank(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order by ``priority`` (higher first), then file order."""
+    indexed = list(enumerate(items))
+    indexed.sort(key=lambda pair: (-int(pair[1].get("priority", 0) or 0), pair[0]))
+    return [item for _, item in indexed]
+
+
+def compile_corrections(items: List[Dict[str, Any]], mtime: float = 0.0) -> CompiledCorrections:
+    started = time.perf_counter()
+    ranked = _rank([item for item in items if isinstance(item, dict)])
+    combined: List[Tuple[str, str, int]] = []
+    fallback: List[Tuple["re.Pattern[str]", int]] = []
+    for idx, item in enumerate(ranked):
+        compiled = []
+        for pat in item.get("patterns", []) or []:
+            try:
+                rx = re.compile(pat, re.I)
+            except re.error as exc:
+                logger.warning("Skipping invalid correction pattern %r (%s): %s", pat, item.get("id"), exc)
+                continue
+            compiled.append(rx)
+            if _combinable(rx):
+                combined.append((f"c{len(combined)}", pat, idx))
+            else:
+                fallback.append((rx, idx))
+        item["_compiled"] = compiled
+
+    out = CompiledCorrections(items=ranked, mtime=mtime, fallback=fallback)
+    out.pattern_count = len(combined) + len(fallback)
+    if combined:
+        try:
+            out.any_rx = re.compile("|".join(f"(?:{pat})" for _, pat, _ in combined), re.I | re.S)
+            out.all_rx = re.compile(
+                "".join(f"(?=.*?(?P<{name}>{pat}))?" for name, pat, _ in combined), re.I | re.S
+            )
+            out.group_item = {name: idx for name, _, idx in combined}
+        except re.error:
+            # Fall back to per-pattern search if the union does not compile
+            logger.warning("Could not combine correction patterns; using per-pattern search")
+            out.any_rx = out.all_rx = None
+            out.group_item = {}
+            out.fallback = sorted(
+                fallback + [(re.compile(pat, re.I), idx) for _, pat, idx in combined],
+                key=lambda pair: pair[1],
+            )
+    out.build_ms = round((time.perf_counter() - started) * 1000, 3)
+    return out
+
+
+class CorrectionsMatcher:
+    """Owns the compiled corrections and swaps them when the YAML changes."""
+
+    def __init__(self, path: str, *, reload_interval: float = 10.0) -> None:
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self._compiled = CompiledCorrections(items=[], mtime=-1.0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _mtime(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def reload(self, force: bool = False) -> bool:
+        mtime = self._mtime()
+        if not force and mtime == self._compiled.mtime:
+            return False
+        with self._lock:
+            if not force and mtime == self._compiled.mtime:
+                return False
+            items: List[Dict[str, Any]] = []
+            if mtime:
+                try:
+                    import yaml
+
+                    items = yaml.safe_load(self.path.read_text()) or []
+                except Exception:
+                    logger.exception("Failed to read %s; keeping previous corrections", self.path)
+                    return False
+            self._compiled = compile_corrections(items, mtime)
+            self.reloads += 1
+        logger.info(
+            "Loaded %d correction patterns from %s in %.2fms",
+            self._compiled.pattern_count,
+            self.path,
+            self._compiled.build_ms,
+        )
+        return True
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        if self._compiled.mtime < 0:
+            self.reload()
+        return self._compiled.items
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        if self._compiled.mtime < 0:
+            self.reload()
+        return self._compiled.match(question)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception:  # pragma: no cover - reload already logs
+                logger.exception("Corrections watcher iteration failed")
+
+    def start(self) -> None:
+        self.reload()
+        if self.reload_interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="corrections-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=1.0)
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        compiled = self._compiled
+        return {
+            "path": str(self.path),
+            "items": len(compiled.items),
+            "patterns": compiled.pattern_count,
+            "combined": len(compiled.group_item),
+            "fallback": len(compiled.fallback),
+            "mtime": compiled.mtime if compiled.mtime >= 0 else None,
+            "build_ms": compiled.build_ms,
+            "reloads": self.reloads,
+        }
+
@@ -0,0 +1,208 @@
+"""Process-lifetime index manager for the RAG API.
+
+The index is loaded once per worker, retrievers and query engines are pooled
+per ``top_k`` and a background watcher hot-swaps to a freshly persisted index
+whenever the ingest scripts rewrite ``PERSIST_DIR``. Each snapshot also
+carries the BM25 sparse index used by hybrid retrieval.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import chromadb
+from llama_index.core import StorageContext, load_index_from_storage
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from sparse_index import SparseIndex
+
+logger = logging.getLogger(__name__)
+
+
+def storage_version(persist_dir: str) -> float:
+    """Return the newest mtime of the persisted JSON stores (0.0 if absent)."""
+    latest = 0.0
+    try:
+        with os.scandir(persist_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    latest = max(latest, entry.stat().st_mtime)
+    except FileNotFoundError:
+        return 0.0
+    return latest
+
+
+@dataclass
+class IndexSnapshot:
+    """A loaded index plus the retrievers/query engines built on top of it."""
+
+    index: Any
+    collection: Any
+    version: float
+    sparse: Optional[SparseIndex] = None
+    loaded_at: float = field(default_factory=time.time)
+    retrievers: "OrderedDict[int, Any]" = field(default_factory=OrderedDict)
+    engines: "OrderedDict[int, Any]" = field(default_factory=OrderedDict)
+
+
+class IndexManager:
+    """Owns the warm index for one worker process.
+
+    Readers grab the current snapshot reference once per request, so a swap
+    never changes the index underneath an in-flight query.
+    """
+
+    def __init__(
+        self,
+        chroma_path: str,
+        persist_dir: str,
+        collection: str,
+        index_id: str,
+        *,
+        reload_interval: float = 30.0,
+        pool_size: int = 8,
+    ) -> None:
+        self.chroma_path = chroma_path
+        self.persist_dir = persist_dir
+        self.collection_name = collection
+        self.index_id = index_id
+        self.reload_interval = reload_interval
+        self.pool_size = max(pool_size, 1)
+        self.reloads = 0
+        self.reload_failures = 0
+        self._client = None
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    # ----- loading -----
+    def _get_client(self):
+        if self._client is None:
+            self._client = chromadb.PersistentClient(path=self.chroma_path)
+        return self._client
+
+    def _load(self) -> IndexSnapshot:
+        version = storage_version(self.persist_dir)
+        collection = self._get_client().get_or_create_collection(
+            self.collection_name, metadata={"hnsw:space": "cosine"}
+        )
+        vector_store = ChromaVectorStore(chroma_collection=collection)
+        storage = StorageContext.from_defaults(
+            vector_store=vector_store, persist_dir=self.persist_dir
+        )
+        index = load_index_from_storage(storage, index_id=self.index_id)
+        try:
+            sparse = SparseIndex.load_or_build(self.persist_dir, collection)
+        except Exception:
+            logger.exception("Sparse index unavailable; hybrid mode falls back to dense ranking")
+            sparse = None
+        return IndexSnapshot(index=index, collection=collection, version=version, sparse=sparse)
+
+    def snapshot(self) -> IndexSnapshot:
+        snap = self._snapshot
+        if snap is not None:
+            return snap
+        with self._load_lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+                logger.info("Loaded index %s (version %.0f)", self.index_id, self._snapshot.version)
+            return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """Swap in a freshly loaded index if the persisted stores changed.
+
+        Loading happens outside the request path; on failure (e.g. ingest
+        still mid-write) the current snapshot keeps serving and the next
+        poll retries.
+        """
+        current = self._snapshot
+        version = storage_version(self.persist_dir)
+        if not force and current is not None and version <= current.version:
+            return False
+        with self._load_lock:
+            if not force and self._snapshot is not None and version <= self._snapshot.version:
+                return False
+            try:
+                fresh = self._load()
+            except Exception:
+                self.reload_failures += 1
+                logger.exception("Index reload failed; keeping current snapshot")
+                return False
+            self._snapshot = fresh
+            self.reloads += 1
+        logger.info("Hot-swapped index %s to version %.0f", self.index_id, fresh.version)
+        return True
+
+    # ----- pooled accessors -----
+    def _pooled(self, pool: "OrderedDict[int, Any]", top_k: int, factory) -> Any:
+        with self._pool_lock:
+            item = pool.get(top_k)
+            if item is not None:
+                pool.move_to_end(top_k)
+                return item
+        item = factory()
+        with self._pool_lock:
+            pool[top_k] = item
+            pool.move_to_end(top_k)
+            while len(pool) > self.pool_size:
+                pool.popitem(last=False)
+        return item
+
+    def retriever(self, top_k: int, snap: Optional[IndexSnapshot] = None):
+        snap = snap or self.snapshot()
+        return self._pooled(
+            snap.retrievers, top_k, lambda: snap.index.as_retriever(similarity_top_k=top_k)
+        )
+
+    def query_engine(self, top_k: int, snap: Optional[IndexSnapshot] = None):
+        snap = snap or self.snapshot()
+        return self._pooled(
+            snap.engines,
+            top_k,
+            lambda: snap.index.as_query_engine(response_mode="compact", similarity_top_k=top_k),
+        )
+
+    # ----- background watcher -----
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception:  # pragma: no cover - defensive, reload already logs
+                logger.exception("Index watcher iteration failed")
+
+    def start(self) -> None:
+        """Warm the index and start the reload watcher (idempotent)."""
+        try:
+            self.snapshot()
+        except Exception:
+            logger.exception("Initial index load failed; will retry on first query")
+        if self.reload_interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=1.0)
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "loaded": snap is not None,
+            "version": snap.version if snap else None,
+            "loaded_at": snap.loaded_at if snap else None,
+            "pooled_retrievers": len(snap.retrievers) if snap else 0,
+            "pooled_engines": len(snap.engines) if snap else 0,
+            "sparse": snap.sparse.stats() if snap and snap.sparse else None,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+        }
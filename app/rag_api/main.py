@@ -10,26 +10,30 @@ from dotenv import load_dotenv
 from textwrap import shorten
 from dotenv import load_dotenv
 from hashlib import sha1
+import asyncio
 import json
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Add the parent directory to the path to import rag_config
 sys.path.append("/home/justin/llama_rag")
 
-import chromadb
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from llama_index.core import StorageContext, load_index_from_storage
-from llama_index.vector_stores.chroma import ChromaVectorStore
-
 # Monitoring helpers
 from monitor import track_performance, get_metrics, save_metrics
-from prometheus_client import Counter, generate_latest
-import redis
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
+from index_manager import IndexManager
+from answer_cache import SemanticCache, TTLCache, normalize_question
+from corrections import CorrectionsMatcher
+from sparse_index import reciprocal_rank_fusion
+import redis.asyncio as aioredis
 
 # OpenTelemetry (optional)
 from opentelemetry import trace
@@ -52,6 +56,21 @@ RAG_REQUIRE_AUTH = os.getenv("RAG_REQUIRE_AUTH", "false").lower() == "true"
 RAG_API_TOKEN = os.getenv("RAG_API_TOKEN", "")
 CORS_ALLOW_ORIGINS = os.getenv("CORS_ALLOW_ORIGINS", "*")
 AB_VARIANTS = [v.strip() for v in os.getenv("AB_VARIANTS", "A,B").split(",") if v.strip()]
+RAG_INDEX_RELOAD_SECONDS = float(os.getenv("RAG_INDEX_RELOAD_SECONDS", "30"))
+RAG_RETRIEVER_POOL_SIZE = int(os.getenv("RAG_RETRIEVER_POOL_SIZE", "8"))
+RAG_EXECUTOR_WORKERS = int(os.getenv("RAG_EXECUTOR_WORKERS", "8"))
+RAG_MAX_INFLIGHT = int(os.getenv("RAG_MAX_INFLIGHT", "16"))
+RAG_L1_CACHE_SIZE = int(os.getenv("RAG_L1_CACHE_SIZE", "1024"))
+RAG_L1_CACHE_TTL = int(os.getenv("RAG_L1_CACHE_TTL", str(RAG_CACHE_TTL)))
+RAG_SEMANTIC_CACHE = os.getenv("RAG_SEMANTIC_CACHE", "false").lower() == "true"
+RAG_SEMANTIC_THRESHOLD = float(os.getenv("RAG_SEMANTIC_THRESHOLD", "0.92"))
+RAG_SEMANTIC_CACHE_SIZE = int(os.getenv("RAG_SEMANTIC_CACHE_SIZE", "2048"))
+RAG_BATCH_MAX = int(os.getenv("RAG_BATCH_MAX", "64"))
+RAG_BATCH_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", "4"))
+RAG_HYBRID_SPARSE_K = int(os.getenv("RAG_HYBRID_SPARSE_K", "20"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+RAG_CORRECTIONS_PATH = os.getenv("RAG_CORRECTIONS_PATH", "/workspace/corrections/corrections.yaml")
+RAG_CORRECTIONS_RELOAD_SECONDS = float(os.getenv("RAG_CORRECTIONS_RELOAD_SECONDS", "10"))
 
 # Load environment variables from .env file
 load_dotenv()
@@ -60,7 +79,9 @@ GENERATION_MODE = os.getenv("RAG_GENERATION_MODE", "openai")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Configure LlamaIndex models
-from llama_index.core import Settings as LISettings
+from llama_index.core import QueryBundle, Settings as LISettings, get_response_synthesizer
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
 
 if OPENAI_API_KEY and GENERATION_MODE == "openai":
     try:
@@ -108,6 +129,86 @@ if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
 
 REQUESTS = Counter("rag_requests_total", "Total RAG requests", ["route"])
 RATE_LIMITED = Counter("rag_rate_limited_total", "Requests rejected due to rate limiting")
+INDEX_VERSION = Gauge("rag_index_version", "mtime of the persisted index currently served")
+INDEX_RELOADS = Gauge("rag_index_reloads", "Index hot-swaps performed by this worker")
+SATURATED = Counter("rag_saturated_total", "Requests rejected because all generation slots were busy")
+INFLIGHT = Gauge("rag_inflight_generations", "Retrieval/generation calls currently in flight")
+
+# Embedding + Chroma search are CPU/IO-bound sync calls; keep them off the event loop
+_EXECUTOR = ThreadPoolExecutor(max_workers=RAG_EXECUTOR_WORKERS, thread_name_prefix="rag")
+_GENERATION_SLOTS = asyncio.Semaphore(RAG_MAX_INFLIGHT)
+
+CACHE_HITS = Counter("rag_cache_hits_total", "Answer cache hits", ["tier"])
+CACHE_MISSES = Counter("rag_cache_misses_total", "Questions that missed every cache tier")
+SEMANTIC_SIMILARITY = Histogram(
+    "rag_semantic_cache_similarity",
+    "Best cosine similarity seen on semantic cache lookups",
+    buckets=(0.5, 0.7, 0.8, 0.85, 0.9, 0.92, 0.95, 0.98, 1.0),
+)
+HYBRID_SECONDS = Histogram(
+    "rag_hybrid_fusion_seconds",
+    "Time spent on BM25 scoring + rank fusion in hybrid mode",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+# L1 in front of Redis; the semantic tier is optional and per worker
+L1_CACHE = TTLCache(maxsize=RAG_L1_CACHE_SIZE, ttl=RAG_L1_CACHE_TTL)
+SEMANTIC_CACHE = (
+    SemanticCache(
+        capacity=RAG_SEMANTIC_CACHE_SIZE,
+        threshold=RAG_SEMANTIC_THRESHOLD,
+        ttl=RAG_CACHE_TTL,
+    )
+    if RAG_SEMANTIC_CACHE
+    else None
+)
+
+# Process-lifetime index: loaded once, hot-swapped when ingest persists a new version
+INDEX = IndexManager(
+    CHROMA_PATH,
+    PERSIST_DIR,
+    COLLECTION,
+    INDEX_ID,
+    reload_interval=RAG_INDEX_RELOAD_SECONDS,
+    pool_size=RAG_RETRIEVER_POOL_SIZE,
+)
+
+
+@app.on_event("startup")
+def _warm_index():
+    INDEX.start()
+    CORRECTIONS.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    INDEX.stop()
+    CORRECTIONS.stop()
+    _EXECUTOR.shutdown(wait=False)
+    if _redis_client is not None:
+        await _redis_client.aclose()
+
+
+async def run_blocking(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, fn, *args)
+
+
+@asynccontextmanager
+async def generation_slot():
+    """Bound in-flight retrieval/LLM work per process; shed load instead of queueing."""
+    if _GENERATION_SLOTS.locked():
+        SATURATED.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="RAG API saturated, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    async with _GENERATION_SLOTS:
+        INFLIGHT.inc()
+        try:
+            yield
+        finally:
+            INFLIGHT.dec()
 
 class QueryIn(BaseModel):
     question: str
@@ -122,47 +223,96 @@ def get_redis():
     global _redis_client
     if _redis_client is None:
         try:
-            _redis_client = redis.from_url(REDIS_URL)
+            _redis_client = aioredis.from_url(REDIS_URL)
         except Exception:
             _redis_client = None
     return _redis_client
 
 
+def cache_scope(q: QueryIn) -> tuple:
+    return (q.top_k, (q.mode or "").lower())
+
+
 def cache_key_for(q: QueryIn) -> str:
-    raw = f"{q.question}\n{q.top_k}".encode()
+    top_k, mode = cache_scope(q)
+    raw = f"{normalize_question(q.question)}\n{top_k}\n{mode}".encode()
     return "rq:" + sha1(raw).hexdigest()
 
 
-def cache_get(k: str):
+def embed_question(text: str):
+    return LISettings.embed_model.get_query_embedding(text)
+
+
+async def lookup_cached_answer(q: QueryIn, ck: str, semantic: bool = True):
+    """Check L1, then Redis, then (optionally) the semantic tier.
+
+    Returns (answer or None, question embedding or None). The raw question
+    is embedded so the same vector keys the semantic tier and is handed to
+    retrieval on a miss; the question is embedded only once.
+    """
+    cached = L1_CACHE.get(ck)
+    if cached is not None:
+        CACHE_HITS.labels(tier="l1").inc()
+        return cached, None
+    cached = await cache_get(ck)
+    if cached:
+        CACHE_HITS.labels(tier="redis").inc()
+        L1_CACHE.set(ck, cached)
+        return cached, None
+    embedding = None
+    if SEMANTIC_CACHE is not None and semantic:
+        try:
+            embedding = await run_blocking(embed_question, q.question)
+        except Exception:
+            embedding = None
+        if embedding is not None:
+            cached, similarity = SEMANTIC_CACHE.lookup(cache_scope(q), embedding)
+            SEMANTIC_SIMILARITY.observe(similarity)
+            if cached is not None:
+                CACHE_HITS.labels(tier="semantic").inc()
+                L1_CACHE.set(ck, cached)
+                return cached, embedding
+    CACHE_MISSES.inc()
+    return None, embedding
+
+
+async def store_cached_answer(q: QueryIn, ck: str, result: dict, embedding=None):
+    L1_CACHE.set(ck, result)
+    await cache_set(ck, result)
+    if SEMANTIC_CACHE is not None and embedding is not None:
+        SEMANTIC_CACHE.add(cache_scope(q), embedding, result)
+
+
+async def cache_get(k: str):
     r = get_redis()
     if not r:
         return None
     try:
-        v = r.get(k)
+        v = await r.get(k)
         return json.loads(v) if v else None
     except Exception:
         return None
 
 
-def cache_set(k: str, value: dict, ttl: int = RAG_CACHE_TTL):
+async def cache_set(k: str, value: dict, ttl: int = RAG_CACHE_TTL):
     r = get_redis()
     if not r:
         return
     try:
-        r.setex(k, ttl, json.dumps(value))
+        await r.setex(k, ttl, json.dumps(value))
     except Exception:
         pass
 
 
-def ip_rate_limited(ip: str) -> bool:
+async def ip_rate_limited(ip: str) -> bool:
     r = get_redis()
     if not r:
         return False
     try:
         key = f"rl:{ip}:{int(time.time()//60)}"
-        n = r.incr(key)
+        n = await r.incr(key)
         if n == 1:
-            r.expire(key, 65)
+            await r.expire(key, 65)
         return n > RAG_RATE_LIMIT_PER_MIN
     except Exception:
         return False
@@ -175,7 +325,7 @@ def assign_variant(identifier: str) -> str:
     return AB_VARIANTS[h % len(AB_VARIANTS)]
 
 # ----- Analytics helpers -----
-def record_query(q: QueryIn, variant: str, ip: str):
+async def record_query(q: QueryIn, variant: str, ip: str):
     r = get_redis()
     if not r:
         return
@@ -187,8 +337,10 @@ def record_query(q: QueryIn, variant: str, ip: str):
             "variant": variant,
             "ip": ip,
         }
-        r.lpush("rag:queries", json.dumps(rec))
-        r.ltrim("rag:queries", 0, 999)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.lpush("rag:queries", json.dumps(rec))
+            pipe.ltrim("rag:queries", 0, 999)
+            await pipe.execute()
     except Exception:
         pass
 
@@ -202,33 +354,26 @@ class MetricsResponse(BaseModel):
     recent_response_times_ms: list
 
 # ---- Corrections layer ----
-import re
-from pathlib import Path
-from typing import List, Dict, Any
-
-_CORRECTIONS: List[Dict[str, Any]] | None = None
+from typing import Dict, Any
+
+# Single compiled matcher, rebuilt in the background when the YAML changes
+CORRECTIONS = CorrectionsMatcher(RAG_CORRECTIONS_PATH, reload_interval=RAG_CORRECTIONS_RELOAD_SECONDS)
+CORRECTIONS_MATCH_SECONDS = Histogram(
+    "rag_corrections_match_seconds",
+    "Time spent matching a question against corrections.yaml",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01),
+)
+CORRECTIONS_HITS = Counter("rag_corrections_hits_total", "Questions answered by the corrections layer", ["id"])
 
 def load_corrections():
-    global _CORRECTIONS
-    if _CORRECTIONS is not None:
-        return _CORRECTIONS
-    p = Path("/workspace/corrections/corrections.yaml")
-    if not p.exists():
-        _CORRECTIONS = []
-        return _CORRECTIONS
-    import yaml
-    data = yaml.safe_load(p.read_text()) or []
-    for item in data:
-        item["_compiled"] = [re.compile(pat, re.I) for pat in item.get("patterns", [])]
-    _CORRECTIONS = data
-    return _CORRECTIONS
-
-def corrections_hit(question: str):
-    for item in load_corrections():
-        for rx in item.get("_compiled", []):
-            if rx.search(question):
-                return item
-    return None
+    return CORRECTIONS.items
+
+def corrections_hit(question: str) -> Dict[str, Any] | None:
+    with CORRECTIONS_MATCH_SECONDS.time():
+        hit = CORRECTIONS.match(question)
+    if hit:
+        CORRECTIONS_HITS.labels(id=str(hit.get("id", "unknown"))).inc()
+    return hit
 
 
 class MetricsResponse(BaseModel):
@@ -241,10 +386,119 @@ class MetricsResponse(BaseModel):
     recent_response_times_ms: list
 
 
-@app.post("/query")
-@track_performance
-def query(req: Request, q: QueryIn):
-    # Optional bearer auth
+def _retrieve_nodes(q: QueryIn, snap, embedding=None):
+    """Embed the question and search Chroma (blocking; runs on the executor)."""
+    retriever = INDEX.retriever(q.top_k, snap)
+    if embedding is not None:
+        nodes = retriever.retrieve(QueryBundle(query_str=q.question, embedding=embedding))
+    else:
+        nodes = retriever.retrieve(q.question)
+
+    return _hybrid_rerank(q, nodes, snap)
+
+
+def _is_hybrid(q: QueryIn) -> bool:
+    return (q.mode or "").lower() == "hybrid"
+
+
+def _chroma_node(text, meta):
+    try:
+        return metadata_dict_to_node(meta or {}, text=text)
+    except Exception:
+        return TextNode(text=text or "", metadata=meta or {})
+
+
+def _hybrid_rerank(q: QueryIn, nodes, snap):
+    """Fuse dense hits with the prebuilt BM25 index via reciprocal-rank fusion.
+
+    Sparse-only hits (e.g. exact part numbers the embedding missed) are
+    fetched from Chroma by id. Returned nodes carry the fused score.
+    """
+    if not _is_hybrid(q) or snap.sparse is None:
+        return nodes
+    started = time.perf_counter()
+    dense = {}
+    for nws in nodes:
+        node = getattr(nws, "node", nws)
+        dense.setdefault(node.node_id, node)
+    sparse_hits = snap.sparse.top(q.question, max(q.top_k, RAG_HYBRID_SPARSE_K))
+    fused = reciprocal_rank_fusion(list(dense), [node_id for node_id, _ in sparse_hits], k=RAG_RRF_K)[: q.top_k]
+    missing = [node_id for node_id, _ in fused if node_id not in dense]
+    if missing:
+        got = snap.collection.get(ids=missing, include=["documents", "metadatas"])
+        for node_id, text, meta in zip(got["ids"], got["documents"], got["metadatas"]):
+            dense[node_id] = _chroma_node(text, meta)
+    HYBRID_SECONDS.observe(time.perf_counter() - started)
+    return [NodeWithScore(node=dense[node_id], score=score) for node_id, score in fused if node_id in dense]
+
+
+def _summarize(nodes, with_scores: bool = False):
+    """Build the retrieval-only answer; returns (result, cacheable).
+
+    ``with_scores`` adds the ranked hits with their retrieval scores.
+    """
+    summaries = []
+    source_urls = []
+    hits = []
+    for node_with_score in nodes:
+        node = getattr(node_with_score, "node", None) or node_with_score
+        text = getattr(node, "text", None)
+        if text is None and hasattr(node, "get_content"):
+            text = node.get_content()
+        if not text:
+            continue
+        summaries.append(shorten(text.replace("\n", " "), width=400, placeholder="…"))
+        src = node.metadata.get("source_url", "unknown")
+        if src not in source_urls:
+            source_urls.append(src)
+        score = getattr(node_with_score, "score", None)
+        hits.append({"source_url": src, "score": round(score, 6) if score is not None else None})
+
+    if not summaries:
+        return {
+            "answer": "No relevant documents retrieved. Configure OPENAI_API_KEY for full responses.",
+            "sources": [],
+            "mode": "retrieval-only",
+        }, False
+
+    answer = "\n\n".join(f"• {s}" for s in summaries[:3])
+    result = {
+        "answer": answer + "\n\n[LLM disabled: configure OPENAI_API_KEY for full narratives]",
+        "sources": source_urls[:10],
+        "mode": "retrieval-only",
+    }
+    if with_scores:
+        result["hits"] = hits
+    return result, True
+
+
+def _retrieval_only_answer(q: QueryIn, snap, embedding=None):
+    return _summarize(_retrieve_nodes(q, snap, embedding), with_scores=_is_hybrid(q))
+
+
+async def answer_question(q: QueryIn, embedding=None):
+    """Run retrieval (+ generation in openai mode) without blocking the loop.
+
+    ``embedding`` is an already computed question vector (semantic cache) that
+    retrieval-only mode reuses. Returns (result, cacheable).
+    """
+    snap = await run_blocking(INDEX.snapshot)
+    if GENERATION_MODE == "openai" and OPENAI_API_KEY and _is_hybrid(q):
+        nodes = await run_blocking(_retrieve_nodes, q, snap)
+        return await _synthesize_answer(q, nodes)
+    if GENERATION_MODE == "openai" and OPENAI_API_KEY:
+        qe = INDEX.query_engine(q.top_k, snap)
+        resp = await qe.aquery(_SYSTEM_HINT + "\n\nQuestion: " + q.question)
+        sources = [
+            n.metadata.get("source_url", "unknown")
+            for n in getattr(resp, "source_nodes", [])
+        ]
+        return {"answer": str(resp), "sources": sources, "mode": "openai"}, True
+    return await run_blocking(_retrieval_only_answer, q, snap, embedding)
+
+
+async def guard_request(req: Request) -> str:
+    """Optional bearer auth + per-IP rate limiting; returns the client IP."""
     if RAG_REQUIRE_AUTH:
         auth = req.headers.get("authorization", "")
         if not (auth.startswith("Bearer ") and auth.split(" ",1)[1] == RAG_API_TOKEN):
@@ -252,15 +506,22 @@ def query(req: Request, q: QueryIn):
 
     # Rate limiting by client IP
     ip = req.client.host if req.client else "unknown"
-    if ip_rate_limited(ip):
+    if await ip_rate_limited(ip):
         RATE_LIMITED.inc()
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
+    return ip
+
+
+@app.post("/query")
+@track_performance
+async def query(req: Request, q: QueryIn):
+    ip = await guard_request(req)
 
     REQUESTS.labels(route="query").inc()
 
     # Assign variant and record analytics
     variant = (q.ab or assign_variant(ip))
-    record_query(q, variant, ip)
+    await record_query(q, variant, ip)
 
     # Offline corrections layer (no retrieval/LLM)
     hit = corrections_hit(q.question)
@@ -270,91 +531,186 @@ def query(req: Request, q: QueryIn):
 
     # Cache layer
     ck = cache_key_for(q)
-    cached = cache_get(ck)
+    cached, embedding = await lookup_cached_answer(q, ck)
     if cached:
         return cached
     REQUESTS.labels(route="query").inc()
-    try:
-        client = chromadb.PersistentClient(path=CHROMA_PATH)
-        collection = client.get_or_create_collection(
-            COLLECTION, metadata={"hnsw:space": "cosine"}
-        )
-        vector_store = ChromaVectorStore(chroma_collection=collection)
-        storage = StorageContext.from_defaults(
-            vector_store=vector_store, persist_dir=PERSIST_DIR
-        )
-        index = load_index_from_storage(storage, index_id=INDEX_ID)
+    async with generation_slot():
+        try:
+            result, cacheable = await answer_question(q, embedding)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"RAG query failed: {str(e)}")
+    if cacheable:
+        await store_cached_answer(q, ck, result, embedding)
+    return result
+
+class BatchQueryIn(BaseModel):
+    questions: list[str]
+    top_k: int = 10
+    mode: str | None = None
+
+
+def _batch_retrieve(questions: list[str], top_k: int, snap):
+    """Query embeddings for all questions + one multi-vector Chroma query.
+
+    Questions go through ``embed_question`` (the query embedding, not the
+    passage one) and distances become scores as LlamaIndex's Chroma store
+    reports them, so hits match the single /query path.
+    """
+    embeddings = [embed_question(question) for question in questions]
+    res = snap.collection.query(
+        query_embeddings=embeddings,
+        n_results=top_k,
+        include=["documents", "metadatas", "distances"],
+    )
+    per_question = []
+    for docs, metas, dists in zip(res["documents"], res["metadatas"], res["distances"]):
+        nodes = []
+        for text, meta, dist in zip(docs, metas, dists):
+            nodes.append(NodeWithScore(node=_chroma_node(text, meta), score=math.exp(-float(dist))))
+        per_question.append(nodes)
+    return per_question
+
+
+async def _batch_answer(q: QueryIn, nodes, snap):
+    if _is_hybrid(q):
+        nodes = await run_blocking(_hybrid_rerank, q, nodes, snap)
+    return await _synthesize_answer(q, nodes)
+
+
+async def _synthesize_answer(q: QueryIn, nodes):
+    """Answer from already retrieved nodes (LLM in openai mode, summary otherwise)."""
+    if GENERATION_MODE == "openai" and OPENAI_API_KEY:
+        synth = get_response_synthesizer(response_mode="compact")
+        resp = await synth.asynthesize(_SYSTEM_HINT + "\n\nQuestion: " + q.question, nodes)
+        sources = [
+            n.node.metadata.get("source_url", "unknown")
+            for n in getattr(resp, "source_nodes", [])
+        ]
+        return {"answer": str(resp), "sources": sources, "mode": "openai"}, True
+    return _summarize(nodes, with_scores=_is_hybrid(q))
+
+
+async def _run_batch(body: BatchQueryIn):
+    """Yield (indexes, result, error) as each unique question resolves.
+
+    Identical (normalized) questions are answered once; corrections and
+    cache hits are emitted first, the rest share one Chroma query over
+    their query embeddings. Exactly one of result/error is set; a retrieval
+    failure yields an error for every question still pending.
+    """
+    groups: Dict[str, list[int]] = {}
+    items: Dict[str, QueryIn] = {}
+    for i, question in enumerate(body.questions):
+        item = QueryIn(question=question, top_k=body.top_k, mode=body.mode)
+        ck = cache_key_for(item)
+        groups.setdefault(ck, []).append(i)
+        items.setdefault(ck, item)
+
+    pending: list[str] = []
+    for ck, item in items.items():
+        hit = corrections_hit(item.question)
+        if hit:
+            yield groups[ck], {"answer": hit.get("answer",""), "sources": hit.get("sources", []), "mode": "corrections"}, None
+            continue
+        cached, _ = await lookup_cached_answer(item, ck, semantic=False)
+        if cached:
+            yield groups[ck], cached, None
+            continue
+        pending.append(ck)
+    if not pending:
+        return
 
-        retriever = index.as_retriever(similarity_top_k=q.top_k)
-        nodes = retriever.retrieve(q.question)
+    # Retrieval and synthesis run in a producer that holds the generation
+    # slot; results are yielded from a queue, so a slow reader of the stream
+    # never keeps a slot busy.
+    done: asyncio.Queue = asyncio.Queue()
+    emitted: set = set()
 
-        # Hybrid rerank: use BM25 across retrieved snippets to refine ordering if requested
-        if (q.mode or "").lower() == "hybrid":
+    def _emit(ck, result, error):
+        emitted.add(ck)
+        done.put_nowait((ck, result, error))
+
+    async def _one(ck, nodes, snap, limiter):
+        async with limiter:
             try:
-                from rank_bm25 import BM25Okapi
-                corpus = []
-                node_list = []
-                for nws in nodes:
-                    node = getattr(nws, "node", nws)
-                    text = getattr(node, "text", None)
-                    if text is None and hasattr(node, "get_content"):
-                        text = node.get_content()
-                    if text:
-                        corpus.append(text.split())
-                        node_list.append(node)
-                if corpus:
-                    bm = BM25Okapi(corpus)
-                    scores = bm.get_scores(q.question.split())
-                    # attach score to node order
-                    paired = list(zip(scores, node_list))
-                    paired.sort(key=lambda x: x[0], reverse=True)
-                    # rebuild nodes list respecting top_k
-                    nodes = [type("NS", (), {"node": nl}) for _, nl in paired[:q.top_k]]
-            except Exception:
-                pass
-
-        if GENERATION_MODE == "openai" and OPENAI_API_KEY:
-            qe = index.as_query_engine(response_mode="compact", similarity_top_k=q.top_k)
-            resp = qe.query(_SYSTEM_HINT + "\n\nQuestion: " + q.question)
-            sources = [
-                n.metadata.get("source_url", "unknown")
-                for n in getattr(resp, "source_nodes", [])
-            ]
-            result = {"answer": str(resp), "sources": sources, "mode": "openai"}
-            cache_set(ck, result)
-            return result
-
-        summaries = []
-        source_urls = []
-        for node_with_score in nodes:
-            node = getattr(node_with_score, "node", None) or node_with_score
-            text = getattr(node, "text", None)
-            if text is None and hasattr(node, "get_content"):
-                text = node.get_content()
-            if not text:
-                continue
-            summaries.append(shorten(text.replace("\n", " "), width=400, placeholder="…"))
-            src = node.metadata.get("source_url", "unknown")
-            if src not in source_urls:
-                source_urls.append(src)
-
-        if not summaries:
-            return {
-                "answer": "No relevant documents retrieved. Configure OPENAI_API_KEY for full responses.",
-                "sources": [],
-                "mode": "retrieval-only",
-            }
-
-        answer = "\n\n".join(f"• {s}" for s in summaries[:3])
-        result = {
-            "answer": answer + "\n\n[LLM disabled: configure OPENAI_API_KEY for full narratives]",
-            "sources": source_urls[:10],
-            "mode": "retrieval-only",
-        }
-        cache_set(ck, result)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"RAG query failed: {str(e)}")
+                result, cacheable = await _batch_answer(items[ck], nodes, snap)
+            except Exception as e:
+                _emit(ck, None, f"RAG query failed: {str(e)}")
+                return
+        _emit(ck, result, None)
+        if cacheable:
+            await store_cached_answer(items[ck], ck, result)
+
+    async def _produce():
+        async with _GENERATION_SLOTS:
+            INFLIGHT.inc()
+            try:
+                snap = await run_blocking(INDEX.snapshot)
+                node_lists = await run_blocking(
+                    _batch_retrieve, [items[ck].question for ck in pending], body.top_k, snap
+                )
+                limiter = asyncio.Semaphore(RAG_BATCH_CONCURRENCY)
+                await asyncio.gather(
+                    *(_one(ck, nodes, snap, limiter) for ck, nodes in zip(pending, node_lists)),
+                    return_exceptions=True,
+                )
+            except Exception as e:
+                for ck in pending:
+                    if ck not in emitted:
+                        _emit(ck, None, f"RAG query failed: {str(e)}")
+            finally:
+                INFLIGHT.dec()
+
+    producer = asyncio.create_task(_produce())
+    try:
+        for _ in pending:
+            ck, result, error = await done.get()
+            yield groups[ck], result, error
+    finally:
+        producer.cancel()
+
+
+def _batch_row(index: int, question: str, result, error):
+    row = {"index": index, "question": question}
+    if error is not None:
+        row["error"] = error
+    else:
+        row["result"] = result
+    return row
+
+
+@app.post("/query/batch")
+async def query_batch(req: Request, body: BatchQueryIn, stream: bool = True):
+    """Answer many questions at once.
+
+    Streams NDJSON lines ({"index", "question", "result"}, or "error" in
+    place of "result" when that question failed) as each question completes;
+    pass stream=false to receive one JSON array in input order.
+    """
+    await guard_request(req)
+    if not body.questions:
+        raise HTTPException(status_code=400, detail="questions must be a non-empty array")
+    if len(body.questions) > RAG_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {RAG_BATCH_MAX} questions per batch")
+    if _GENERATION_SLOTS.locked():
+        SATURATED.inc()
+        raise HTTPException(status_code=503, detail="RAG API saturated, retry shortly", headers={"Retry-After": "1"})
+    REQUESTS.labels(route="query_batch").inc()
+
+    if not stream:
+        results: list = [None] * len(body.questions)
+        async for indexes, result, error in _run_batch(body):
+            for i in indexes:
+                results[i] = _batch_row(i, body.questions[i], result, error)
+        return {"results": results}
+
+    async def _ndjson():
+        async for indexes, result, error in _run_batch(body):
+            for i in indexes:
+                yield json.dumps(_batch_row(i, body.questions[i], result, error)) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
 
 @app.get("/health")
 def health():
@@ -367,13 +723,11 @@ def health():
 @app.get("/ready")
 def ready():
     try:
-        client = chromadb.PersistentClient(path=CHROMA_PATH)
-        collection = client.get_or_create_collection(COLLECTION, metadata={"hnsw:space": "cosine"})
-        _ = collection.count()
+        _ = INDEX.snapshot().collection.count()
         ok = True
     except Exception:
         ok = False
-    return {"ready": ok}
+    return {"ready": ok, "index": INDEX.stats()}
 
 @app.get("/metrics", response_model=MetricsResponse)
 def metrics():
@@ -381,36 +735,99 @@ def metrics():
 
 @app.get("/prometheus")
 def prometheus_metrics():
+    stats = INDEX.stats()
+    INDEX_VERSION.set(stats["version"] or 0)
+    INDEX_RELOADS.set(stats["reloads"])
     return PlainTextResponse(generate_latest().decode("utf-8"))
 
-# Streaming endpoint (SSE-like)
-from fastapi import Response
-from starlette.responses import StreamingResponse
+# Streaming endpoint (SSE)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-def _stream_chunks(answer: str, sources: list[str]):
-    # simple chunking by lines
+
+def _line_tokens(answer: str):
     for line in answer.split("\n"):
-        if not line:
-            continue
-        yield f"data: {line}\n\n"
-    yield f"data: SOURCES: {', '.join(sources[:5])}\n\n"
+        if line:
+            yield line + "\n"
+
+
+async def _stream_answer(q: QueryIn):
+    """Yield SSE frames: sources first, then answer tokens, then done.
+
+    Corrections and cache hits replay the stored answer; otherwise the LLM
+    output is streamed as it is generated and the assembled answer is cached
+    once the stream completes.
+    """
+    hit = corrections_hit(q.question)
+    if hit:
+        result = {"answer": hit.get("answer",""), "sources": hit.get("sources", []), "mode": "corrections"}
+        yield _sse("sources", {"sources": result["sources"], "mode": result["mode"]})
+        for token in _line_tokens(result["answer"]):
+            yield _sse("token", {"text": token})
+        yield _sse("done", {**result, "cached": False})
+        return
+
+    ck = cache_key_for(q)
+    cached, embedding = await lookup_cached_answer(q, ck)
+    if cached:
+        yield _sse("sources", {"sources": cached.get("sources", []), "mode": cached.get("mode")})
+        for token in _line_tokens(cached.get("answer", "")):
+            yield _sse("token", {"text": token})
+        yield _sse("done", {**cached, "cached": True})
+        return
+
+    async with _GENERATION_SLOTS:
+        INFLIGHT.inc()
+        try:
+            snap = await run_blocking(INDEX.snapshot)
+            if GENERATION_MODE == "openai" and OPENAI_API_KEY:
+                nodes = await run_blocking(_retrieve_nodes, q, snap, embedding)
+                sources = []
+                for nws in nodes:
+                    src = getattr(nws, "node", nws).metadata.get("source_url", "unknown")
+                    if src not in sources:
+                        sources.append(src)
+                yield _sse("sources", {"sources": sources, "mode": "openai"})
+                synth = get_response_synthesizer(response_mode="compact", streaming=True)
+                resp = await synth.asynthesize(_SYSTEM_HINT + "\n\nQuestion: " + q.question, nodes)
+                parts = []
+                async for token in resp.async_response_gen():
+                    parts.append(token)
+                    yield _sse("token", {"text": token})
+                result, cacheable = {"answer": "".join(parts), "sources": sources, "mode": "openai"}, bool(parts)
+            else:
+                result, cacheable = await run_blocking(_retrieval_only_answer, q, snap, embedding)
+                yield _sse("sources", {"sources": result["sources"], "mode": result["mode"]})
+                for token in _line_tokens(result["answer"]):
+                    yield _sse("token", {"text": token})
+        except Exception as e:
+            yield _sse("error", {"detail": f"RAG query failed: {str(e)}"})
+            return
+        finally:
+            INFLIGHT.dec()
+    if cacheable:
+        await store_cached_answer(q, ck, result, embedding)
+    yield _sse("done", {**result, "cached": False})
+
 
 @app.get("/query/stream")
-def query_stream(q: str, top_k: int = 10, mode: str | None = None):
-    # Reuse JSON endpoint internally for consistent logic
+async def query_stream(req: Request, q: str, top_k: int = 10, mode: str | None = None):
+    """Server-Sent Events: `sources`, then `token` frames, then `done` (or `error`)."""
+    ip = await guard_request(req)
     payload = QueryIn(question=q, top_k=top_k, mode=mode)
-    # Fake a Request object: bypass auth/rate limit for streaming in this minimal implementation
-    class _R: client=None
-    res = query(_R(), payload)
-    answer = res.get("answer", "")
-    sources = res.get("sources", [])
-    return StreamingResponse(_stream_chunks(answer, sources), media_type="text/event-stream")
+    REQUESTS.labels(route="query_stream").inc()
+    await record_query(payload, assign_variant(ip), ip)
+    if _GENERATION_SLOTS.locked():
+        SATURATED.inc()
+        raise HTTPException(status_code=503, detail="RAG API saturated, retry shortly", headers={"Retry-After": "1"})
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_stream_answer(payload), media_type="text/event-stream", headers=headers)
 
 @app.post("/query/hybrid")
 @track_performance
-def query_hybrid(req: Request, q: QueryIn):
+async def query_hybrid(req: Request, q: QueryIn):
     q.mode = "hybrid"
-    return query(req, q)
+    return await query(req, q)
 
 @app.get("/ab/assign")
 def ab_assign(req: Request):
@@ -418,19 +835,22 @@ def ab_assign(req: Request):
     return {"variant": assign_variant(ip)}
 
 @app.get("/analytics/queries")
-def analytics_queries(limit: int = 50):
+async def analytics_queries(limit: int = 50):
     r = get_redis()
     out = []
     if r:
         try:
-            rows = r.lrange("rag:queries", 0, max(0, limit - 1))
+            rows = await r.lrange("rag:queries", 0, max(0, limit - 1))
             out = [json.loads(x) for x in rows]
         except Exception:
             out = []
     return {"queries": out}
 
 @app.post("/admin/clear-cache")
-def admin_clear_cache():
+async def admin_clear_cache():
+    L1_CACHE.clear()
+    if SEMANTIC_CACHE is not None:
+        SEMANTIC_CACHE.clear()
     r = get_redis()
     if not r:
         return {"cleared": 0}
@@ -438,9 +858,9 @@ def admin_clear_cache():
         total = 0
         cursor = 0
         while True:
-            cursor, keys = r.scan(cursor=cursor, match="rq:*", count=500)
+            cursor, keys = await r.scan(cursor=cursor, match="rq:*", count=500)
             if keys:
-                r.delete(*keys)
+                await r.delete(*keys)
                 total += len(keys)
             if cursor == 0:
                 break
@@ -448,6 +868,19 @@ def admin_clear_cache():
     except Exception:
         return {"cleared": 0}
 
+@app.get("/admin/corrections")
+def admin_corrections():
+    return CORRECTIONS.stats()
+
+@app.post("/admin/reload-corrections")
+def admin_reload_corrections():
+    return {"reloaded": CORRECTIONS.reload(force=True), "corrections": CORRECTIONS.stats()}
+
+@app.post("/admin/reload-index")
+def admin_reload_index(force: bool = False):
+    swapped = INDEX.reload(force=force)
+    return {"reloaded": swapped, "index": INDEX.stats()}
+
 @app.post("/metrics/save")
 def save_metrics_endpoint():
     save_metrics()
@@ -1,5 +1,6 @@
 """Basic performance monitoring for RAG API."""
 
+import inspect
 import time
 import json
 import os
@@ -19,39 +20,52 @@ metrics = {
 }
 
 
+def _record_success(response_time: float) -> None:
+    metrics["query_count"] += 1
+    metrics["total_response_time"] += response_time
+    metrics["avg_response_time"] = (
+        metrics["total_response_time"] / metrics["query_count"]
+    )
+    metrics["last_query_time"] = datetime.now().isoformat()
+    metrics["response_times"].append(response_time)
+
+    # Keep only last 100 response times
+    if len(metrics["response_times"]) > 100:
+        metrics["response_times"] = metrics["response_times"][-100:]
+
+    # Track queries by hour
+    hour = datetime.now().strftime("%Y-%m-%d %H:00")
+    metrics["queries_by_hour"][hour] = metrics["queries_by_hour"].get(hour, 0) + 1
+
+
 def track_performance(func):
-    """Decorator to track API performance metrics."""
+    """Decorator to track API performance metrics (sync or async handlers)."""
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.time()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                metrics["error_count"] += 1
+                raise
+            _record_success(time.time() - start_time)
+            return result
+
+        return async_wrapper
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
         try:
             result = func(*args, **kwargs)
-            response_time = time.time() - start_time
-
-            # Update metrics
-            metrics["query_count"] += 1
-            metrics["total_response_time"] += response_time
-            metrics["avg_response_time"] = (
-                metrics["total_response_time"] / metrics["query_count"]
-            )
-            metrics["last_query_time"] = datetime.now().isoformat()
-            metrics["response_times"].append(response_time)
-
-            # Keep only last 100 response times
-            if len(metrics["response_times"]) > 100:
-                metrics["response_times"] = metrics["response_times"][-100:]
-
-            # Track queries by hour
-            hour = datetime.now().strftime("%Y-%m-%d %H:00")
-            metrics["queries_by_hour"][hour] = (
-                metrics["queries_by_hour"].get(hour, 0) + 1
-            )
-
-            return result
         except Exception:
             metrics["error_count"] += 1
             raise
+        _record_success(time.time() - start_time)
+        return result
 
     return wrapper
 
@@ -0,0 +1,258 @@
+"""Persistent BM25 index over the whole Chroma collection.
+
+Built by the ingest scripts (and rebuilt by the RAG API when missing or out of
+date) and stored next to the LlamaIndex stores as ``sparse_index.npz``.
+Postings are kept in CSR form per term so scoring a query is a handful of
+array slices and one ``np.bincount``.
+
+The tokenizer keeps part numbers and fitting sizes intact ("an-8", "10an",
+"-6an") and also emits their pieces plus a glued form, so "AN8", "AN-8" and
+"an 8" all meet on the same terms.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FILENAME = "sparse_index.npz"
+FORMAT_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+_PARTS = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_STOPWORDS = frozenset(
+    "a and are as at be by do does for from how i in is it my of on or the to what which with you".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for tok in _TOKEN.findall((text or "").lower()):
+        parts = _PARTS.findall(tok)
+        if len(parts) > 1:
+            tokens.append(tok)
+            tokens.extend(parts)
+            glued = "".join(parts)
+            if glued != tok:
+                tokens.append(glued)
+        elif tok not in _STOPWORDS:
+            tokens.append(tok)
+    return tokens
+
+
+def fingerprint(ids: Iterable[str]) -> str:
+    """Order-independent digest of the collection's ids (chunk ids change on re-ingest)."""
+    digest = hashlib.sha1()
+    for node_id in sorted(ids):
+        digest.update(node_id.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def collection_ids(collection) -> List[str]:
+    return list(collection.get(include=[])["ids"])
+
+
+def reciprocal_rank_fusion(*rankings: Sequence[str], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists; ``score = sum(1 / (k + rank))`` with 1-based ranks."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, node_id in enumerate(ranking, start=1):
+            fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
+
+
+class SparseIndex:
+    """Okapi BM25 with postings stored as CSR arrays (term -> docs)."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        terms: List[str],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        *,
+        k1: float = 1.5,
+        b: float = 0.75,
+        digest: str = "",
+        built_at: float = 0.0,
+    ) -> None:
+        self.ids = ids
+        self.vocab = {term: col for col, term in enumerate(terms)}
+        self.indptr = indptr
+        self.postings = postings
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        self.digest = digest
+        self.built_at = built_at
+        n = len(ids)
+        df = np.diff(indptr).astype(np.float32)
+        self.idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0).astype(np.float32)
+        avgdl = float(doc_len.mean()) if n else 0.0
+        self._norm = (
+            k1 * (1.0 - b + b * doc_len / avgdl) if avgdl else np.full(n, k1, dtype=np.float32)
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ----- build -----
+    @classmethod
+    def build(cls, ids: Sequence[str], documents: Sequence[Optional[str]], **kwargs: Any) -> "SparseIndex":
+        vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        doc_len = np.zeros(len(ids), dtype=np.float32)
+        for doc, text in enumerate(documents):
+            tokens = tokenize(text or "")
+            doc_len[doc] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                rows.append(vocab.setdefault(term, len(vocab)))
+                cols.append(doc)
+                counts.append(tf)
+        term_ids = np.asarray(rows, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=indptr[1:])
+        return cls(
+            list(ids),
+            list(vocab),
+            indptr,
+            np.asarray(cols, dtype=np.int32)[order],
+            np.asarray(counts, dtype=np.float32)[order],
+            doc_len,
+            digest=fingerprint(ids),
+            built_at=time.time(),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 1000) -> "SparseIndex":
+        ids: List[str] = []
+        documents: List[str] = []
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            ids.extend(page["ids"])
+            documents.extend(page["documents"] or [""] * len(page["ids"]))
+            offset += len(page["ids"])
+        return cls.build(ids, documents)
+
+    # ----- persistence -----
+    def save(self, persist_dir: str) -> str:
+        os.makedirs(persist_dir, exist_ok=True)
+        path = os.path.join(persist_dir, FILENAME)
+        tmp = path + ".tmp"
+        terms = [""] * len(self.vocab)
+        for term, col in self.vocab.items():
+            terms[col] = term
+        meta = {
+            "format": FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "digest": self.digest,
+            "built_at": self.built_at,
+        }
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                ids=np.asarray(self.ids, dtype=str),
+                terms=np.asarray(terms, dtype=str),
+                indptr=self.indptr,
+                postings=self.postings,
+                tfs=self.tfs,
+                doc_len=self.doc_len,
+                meta=np.asarray(json.dumps(meta)),
+            )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, persist_dir: str) -> Optional["SparseIndex"]:
+        path = os.path.join(persist_dir, FILENAME)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != FORMAT_VERSION:
+                return None
+            return cls(
+                data["ids"].tolist(),
+                data["terms"].tolist(),
+                data["indptr"],
+                data["postings"],
+                data["tfs"],
+                data["doc_len"],
+                k1=meta["k1"],
+                b=meta["b"],
+                digest=meta.get("digest", ""),
+                built_at=meta.get("built_at", 0.0),
+            )
+
+    @classmethod
+    def load_or_build(cls, persist_dir: str, collection) -> "SparseIndex":
+        """Load the persisted index if it matches ``collection``; otherwise rebuild it.
+
+        A rebuilt index is written back best-effort (the storage dir may be
+        mounted read-only in the API container).
+        """
+        current = fingerprint(collection_ids(collection))
+        try:
+            existing = cls.load(persist_dir)
+        except Exception:
+            logger.exception("Could not read %s; rebuilding", os.path.join(persist_dir, FILENAME))
+            existing = None
+        if existing is not None and existing.digest == current:
+            return existing
+        fresh = cls.from_collection(collection)
+        try:
+            fresh.save(persist_dir)
+        except OSError as exc:
+            logger.warning("Could not persist sparse index to %s: %s", persist_dir, exc)
+        return fresh
+
+    # ----- scoring -----
+    def scores(self, query: str) -> np.ndarray:
+        n = len(self.ids)
+        cols = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not n or not cols:
+            return np.zeros(n, dtype=np.float32)
+        slices = [slice(self.indptr[c], self.indptr[c + 1]) for c in cols]
+        docs = np.concatenate([self.postings[s] for s in slices])
+        tf = np.concatenate([self.tfs[s] for s in slices])
+        idf = np.concatenate([np.full(s.stop - s.start, self.idf[c], dtype=np.float32) for s, c in zip(slices, cols)])
+        contrib = idf * tf * (self.k1 + 1.0) / (tf + self._norm[docs])
+        return np.bincount(docs, weights=contrib, minlength=n).astype(np.float32)
+
+    def top(self, query: str, n: int) -> List[Tuple[str, float]]:
+        """Return up to ``n`` (id, bm25) pairs with a positive score, best first."""
+        scores = self.scores(query)
+        if not scores.size or n <= 0:
+            return []
+        n = min(n, scores.size)
+        best = np.argpartition(-scores, n - 1)[:n]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in best if scores[i] > 0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "docs": len(self.ids),
+            "terms": len(self.vocab),
+            "postings": int(self.postings.size),
+            "built_at": self.built_at,
+        }
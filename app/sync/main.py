@@ -2,36 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hmac
 import json
+import logging
 import os
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse, PlainTextResponse
-from prometheus_client import generate_latest
+from prometheus_client import Counter, generate_latest
 from opentelemetry import trace
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from sqlalchemy import JSON, DateTime, Integer, String, Text, func, select
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    and_,
+    delete,
+    func,
+    inspect,
+    or_,
+    select,
+    case,
+    cast,
+    column,
+    literal,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from sync.orders_api import (
+    BREACH_AFTER,
+    COUNTED_FACTS,
     DEFAULT_PAGE_SIZE,
+    DELAYED_AFTER,
+    OVERDUE_AFTER,
+    SUMMARY_LIST_LIMIT,
+    TRACKING_PENDING_AFTER,
     build_orders_alerts_feed,
     build_orders_payload,
     build_stub_orders_response,
+    decode_keyset_cursor,
     decode_offset_cursor,
+    keyset_page_info,
+    order_facts,
+    order_priority,
+    order_status,
+    summarize_inventory_blocks,
+    summarize_metrics,
+    summarize_returns,
+    summarize_shipments,
 )
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Database setup
 # ---------------------------------------------------------------------------
@@ -47,6 +92,7 @@ def _database_url() -> str:
 
 
 DATABASE_URL = _database_url()
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
 ENGINE = create_async_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
 SESSION: async_sessionmaker[AsyncSession] = async_sessionmaker(
     ENGINE, expire_on_commit=False
@@ -73,8 +119,13 @@ class ZohoMessage(Base):
 
 class ShopifyEvent(Base):
     __tablename__ = "shopify_events"
+    __table_args__ = (
+        Index("ux_shopify_events_webhook_id", "webhook_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(40), primary_key=True)
+    # X-Shopify-Webhook-Id; Shopify reuses it on retries
+    webhook_id: Mapped[Optional[str]] = mapped_column(String(64))
     topic: Mapped[str] = mapped_column(String(255), nullable=False)
     shop_id: Mapped[Optional[str]] = mapped_column(String(255))
     payload: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
@@ -83,6 +134,34 @@ class ShopifyEvent(Base):
     )
 
 
+class ShopifyWebhookQueue(Base):
+    """Fast-ack inbox: raw webhook bodies waiting for the background appliers.
+
+    Rows are deleted in the same transaction that applies them, so a body is
+    either still queued or fully applied.
+    """
+
+    __tablename__ = "shopify_webhook_queue"
+    __table_args__ = (
+        Index("ix_shopify_webhook_queue_due", "locked_until", "id"),
+        Index("ux_shopify_webhook_queue_webhook_id", "webhook_id", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_id: Mapped[str] = mapped_column(String(40), nullable=False)
+    webhook_id: Mapped[Optional[str]] = mapped_column(String(64))
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    shop_id: Mapped[Optional[str]] = mapped_column(String(255))
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    claim_token: Mapped[Optional[str]] = mapped_column(String(32))
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+
+
 class ShopifyCustomer(Base):
     __tablename__ = "shopify_customers"
 
@@ -96,10 +175,18 @@ class ShopifyCustomer(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
+    # payload ``updated_at`` of the stored version; older webhooks are skipped
+    source_updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
 
 
 class ShopifyOrder(Base):
+    """Shopify order plus columns extracted from ``raw`` (see ``_order_columns``)
+    so the control tower can filter and page in SQL."""
+
     __tablename__ = "shopify_orders"
+    __table_args__ = (Index("ix_shopify_orders_ship_by", "ship_by"),)
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True)
     name: Mapped[Optional[str]] = mapped_column(String(64))
@@ -116,6 +203,44 @@ class ShopifyOrder(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
+    source_updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    order_status: Mapped[Optional[str]] = mapped_column(String(32))
+    priority: Mapped[Optional[str]] = mapped_column(String(16))
+    assigned_to: Mapped[Optional[str]] = mapped_column(String(255))
+    support_thread: Mapped[Optional[str]] = mapped_column(String(255))
+    ship_by: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    tags: Mapped[Optional[List[str]]] = mapped_column(JSON)
+
+
+# Listing indexes match ``_order_listing`` (newest first, undated last, id
+# descending) so pages are read straight off the index in either direction.
+# SQLite rejects NULLS LAST in index definitions, but already sorts NULLs
+# last in descending order.
+_created_desc = ShopifyOrder.order_created_at.desc()
+if not IS_SQLITE:
+    _created_desc = _created_desc.nullslast()
+for _name, _prefix in (
+    ("ix_shopify_orders_created_desc", ()),
+    ("ix_shopify_orders_status_created_desc", (ShopifyOrder.order_status,)),
+    ("ix_shopify_orders_priority_created_desc", (ShopifyOrder.priority,)),
+    ("ix_shopify_orders_assigned_created_desc", (ShopifyOrder.assigned_to,)),
+):
+    Index(
+        _name,
+        *_prefix,
+        _created_desc,
+        ShopifyOrder.id.desc(),
+    )
+
+# Ascending listing indexes from older releases, superseded by the above.
+_DROPPED_INDEXES = (
+    "ix_shopify_orders_created",
+    "ix_shopify_orders_status_created",
+    "ix_shopify_orders_priority_created",
+    "ix_shopify_orders_assigned_created",
+)
 
 
 class ShopifyInventoryLevel(Base):
@@ -131,6 +256,65 @@ class ShopifyInventoryLevel(Base):
     raw: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
 
 
+class ShopifyOrderFacts(Base):
+    """Narrow per-order metrics contribution (see ``orders_api.order_facts``).
+
+    Counters in ``shopify_order_metrics`` and ``shopify_sku_blocks`` move by
+    the difference between an order's previous and new facts; time-based
+    figures (overdue, delayed...) are indexed lookups on this table.
+    """
+
+    __tablename__ = "shopify_order_facts"
+    __table_args__ = (
+        Index("ix_shopify_order_facts_open_created", "open", "created_at"),
+        Index("ix_shopify_order_facts_untracked", "has_fulfillments", "created_at"),
+        Index("ix_shopify_order_facts_transit", "transit_since"),
+        Index("ix_shopify_order_facts_delivered", "last_delivered_at"),
+        Index("ix_shopify_order_facts_returns", "pending_return_count", "created_at"),
+    )
+
+    order_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    order_number: Mapped[Optional[str]] = mapped_column(String(64))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    assigned_to: Mapped[Optional[str]] = mapped_column(String(255))
+    open: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    awaiting_fulfillment: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    awaiting_tracking: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fulfilled_timed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fulfillment_hours: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    refunds_due: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refund_value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    pending_return_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_returns: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
+    blocked_skus: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
+    has_fulfillments: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    transit: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
+    transit_since: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    delivered: Mapped[List[str]] = mapped_column(JSON, default=list)
+    last_delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class ShopifyOrderMetric(Base):
+    """Running totals over all orders (``total_orders`` plus ``COUNTED_FACTS``)."""
+
+    __tablename__ = "shopify_order_metrics"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class ShopifySkuBlock(Base):
+    """Unfulfilled line items waiting per SKU."""
+
+    __tablename__ = "shopify_sku_blocks"
+    __table_args__ = (Index("ix_shopify_sku_blocks_waiting", "orders_waiting"),)
+
+    sku: Mapped[str] = mapped_column(String(255), primary_key=True)
+    name: Mapped[Optional[str]] = mapped_column(String(255))
+    on_hand: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    orders_waiting: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 # ---------------------------------------------------------------------------
 # FastAPI application
 # ---------------------------------------------------------------------------
@@ -142,6 +326,29 @@ ASSISTANTS_DRAFT_URL = os.getenv(
 )
 DEFAULT_CHANNEL = "email"
 SHOPIFY_WEBHOOK_SECRET = os.getenv("SHOPIFY_WEBHOOK_SECRET", "")
+# Fast-ack: webhooks are queued and acknowledged before they are applied.
+WEBHOOK_FAST_ACK = os.getenv("SYNC_WEBHOOK_FAST_ACK", "1").lower() in {"1", "true", "yes"}
+WEBHOOK_WORKER_ENABLED = os.getenv("SYNC_WEBHOOK_WORKER", "1").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+# SQLite has a single writer, so more than one applier only adds lock waits
+WEBHOOK_WORKERS = int(os.getenv("SYNC_WEBHOOK_WORKERS", "1" if IS_SQLITE else "4"))
+WEBHOOK_BATCH_SIZE = int(os.getenv("SYNC_WEBHOOK_BATCH_SIZE", "200"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("SYNC_WEBHOOK_MAX_ATTEMPTS", "5"))
+WEBHOOK_LEASE_SECONDS = float(os.getenv("SYNC_WEBHOOK_LEASE_SECONDS", "60"))
+WEBHOOK_RETRY_SECONDS = float(os.getenv("SYNC_WEBHOOK_RETRY_SECONDS", "5"))
+WEBHOOK_POLL_SECONDS = float(os.getenv("SYNC_WEBHOOK_POLL_SECONDS", "1"))
+WEBHOOK_SEEN_SIZE = int(os.getenv("SYNC_WEBHOOK_SEEN_SIZE", "10000"))
+# Orders per UPDATE (and transaction) in the bulk order actions
+ORDER_ACTION_CHUNK_SIZE = int(os.getenv("SYNC_ORDER_ACTION_CHUNK_SIZE", "500"))
+
+WEBHOOKS_TOTAL = Counter(
+    "sync_shopify_webhooks_total",
+    "Shopify webhooks by outcome (queued, duplicate, applied, retry, dead)",
+    ["outcome"],
+)
 
 
 def _maybe_setup_tracing(service_name: str) -> None:
@@ -215,15 +422,47 @@ def _normalize_zoho(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _migrate(conn: Any) -> None:
+    """Idempotent in-place upgrades for databases created by older releases.
+
+    ``create_all`` only creates missing tables, so new (nullable) columns and
+    indexes on existing tables are added here.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                )
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    for name in _DROPPED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
 @app.on_event("startup")
 async def startup() -> None:
     async with ENGINE.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate)
+    await backfill_order_columns()
+    async with SESSION() as session:
+        counted = await session.get(ShopifyOrderMetric, "total_orders")
+        stored = await session.scalar(select(func.count()).select_from(ShopifyOrder))
+    # A missing store, or orders removed behind its back, means it has drifted.
+    if counted is None or int(counted.value) != stored:
+        await rebuild_order_metrics()
     app.state.http = httpx.AsyncClient(timeout=httpx.Timeout(20.0, connect=5.0))
+    if WEBHOOK_WORKER_ENABLED:
+        await webhook_queue.start()
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
+    await webhook_queue.stop()
     await app.state.http.aclose()
     await ENGINE.dispose()
 
@@ -247,103 +486,451 @@ def _verify_shopify_hmac(raw_body: bytes, signature: Optional[str]) -> None:
         )
 
 
-async def _upsert_shopify_customer(
-    session: AsyncSession, payload: Dict[str, Any]
-) -> None:
+def _parse_shopify_datetime(value: Any) -> Optional[datetime]:
+    """Parse a Shopify timestamp, normalized to UTC.
+
+    SQLite drops the offset when storing, so a shop-local time would shift
+    across DST changes and break ordering and the stale-update guard.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed
+
+
+def _customer_row(payload: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
     customer_id = str(payload.get("id")) if payload.get("id") else None
     if not customer_id:
-        return
+        return None
     tags = payload.get("tags") or payload.get("tags_array") or []
     if isinstance(tags, str):
         tags = [t.strip() for t in tags.split(",") if t.strip()]
-    record = await session.get(ShopifyCustomer, customer_id)
-    now = datetime.utcnow()
-    if record is None:
-        record = ShopifyCustomer(id=customer_id)
-    record.email = payload.get("email")
-    record.first_name = payload.get("first_name")
-    record.last_name = payload.get("last_name")
-    record.phone = payload.get("phone")
-    record.tags = tags
-    record.raw = payload
-    record.updated_at = now
-    session.add(record)
-
-
-async def _upsert_shopify_order(session: AsyncSession, payload: Dict[str, Any]) -> None:
+    return {
+        "id": customer_id,
+        "email": payload.get("email"),
+        "first_name": payload.get("first_name"),
+        "last_name": payload.get("last_name"),
+        "phone": payload.get("phone"),
+        "tags": tags,
+        "raw": payload,
+        "updated_at": now,
+        "source_updated_at": _parse_shopify_datetime(payload.get("updated_at")),
+    }
+
+
+def _order_row(payload: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
     order_id = str(payload.get("id")) if payload.get("id") else None
     if not order_id:
-        return
-    record = await session.get(ShopifyOrder, order_id)
-    now = datetime.utcnow()
-    if record is None:
-        record = ShopifyOrder(id=order_id)
-    record.name = payload.get("name")
+        return None
     customer = payload.get("customer") or {}
-    record.email = payload.get("email") or customer.get("email")
-    record.customer_id = (
-        str(customer.get("id"))
-        if customer.get("id")
-        else (payload.get("customer_id") and str(payload.get("customer_id")))
-    )
-    record.total_price = payload.get("total_price")
-    record.currency = payload.get("currency")
-    record.financial_status = payload.get("financial_status")
-    record.fulfillment_status = payload.get("fulfillment_status")
-    created_at = payload.get("created_at") or payload.get("processed_at")
-    if isinstance(created_at, str):
-        try:
-            record.order_created_at = datetime.fromisoformat(
-                created_at.replace("Z", "+00:00")
-            )
-        except ValueError:
-            record.order_created_at = None
-    record.raw = payload
-    record.updated_at = now
-    session.add(record)
+    customer_id = customer.get("id") or payload.get("customer_id")
+    return {
+        "id": order_id,
+        "name": payload.get("name"),
+        "email": payload.get("email") or customer.get("email"),
+        "customer_id": str(customer_id) if customer_id else None,
+        "total_price": payload.get("total_price"),
+        "currency": payload.get("currency"),
+        "financial_status": payload.get("financial_status"),
+        "fulfillment_status": payload.get("fulfillment_status"),
+        "order_created_at": _parse_shopify_datetime(
+            payload.get("created_at") or payload.get("processed_at")
+        ),
+        "raw": payload,
+        "updated_at": now,
+        "source_updated_at": _parse_shopify_datetime(payload.get("updated_at")),
+        **_order_columns(payload, payload.get("fulfillment_status")),
+    }
 
 
-async def _upsert_inventory_level(
-    session: AsyncSession, payload: Dict[str, Any]
-) -> None:
+def _order_columns(raw: Dict[str, Any], fulfillment_status: Optional[str]) -> Dict[str, Any]:
+    """Values of the extracted ShopifyOrder columns for an order's ``raw``."""
+    tags = _extract_tags(raw)
+    return {
+        "order_status": order_status(fulfillment_status),
+        "priority": order_priority(tags),
+        "assigned_to": _extract_assignee(raw),
+        "support_thread": _extract_support_thread(raw),
+        "ship_by": _extract_ship_by(raw),
+        "tags": tags,
+    }
+
+
+def _inventory_row(payload: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
     item_id = payload.get("inventory_item_id")
     location_id = payload.get("location_id")
     if item_id is None or location_id is None:
+        return None
+    return {
+        "id": f"{item_id}:{location_id}",
+        "inventory_item_id": str(item_id),
+        "location_id": str(location_id),
+        "available": payload.get("available"),
+        "updated_at": _parse_shopify_datetime(payload.get("updated_at")) or now,
+        "raw": payload,
+    }
+
+
+# topic prefix -> (model, row builder, version column, columns kept when the
+# payload omits them)
+SHOPIFY_TOPICS = (
+    ("customers/", ShopifyCustomer, _customer_row, "source_updated_at", ()),
+    ("orders/", ShopifyOrder, _order_row, "source_updated_at", ("order_created_at",)),
+    ("inventory_levels/", ShopifyInventoryLevel, _inventory_row, "updated_at", ()),
+)
+
+
+def _is_newer(row: Dict[str, Any], other: Dict[str, Any], version: str) -> bool:
+    """True unless both versions are known and ``row`` is older."""
+    if row[version] is None or other[version] is None:
+        return True
+    return row[version] >= other[version]
+
+
+def _insert_for(model: Any) -> Any:
+    insert = pg_insert if ENGINE.dialect.name == "postgresql" else sqlite_insert
+    return insert(model)
+
+
+async def _upsert_rows(
+    session: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    version: str,
+    keep: Iterable[str] = (),
+) -> List[Any]:
+    """``INSERT ... ON CONFLICT (id) DO UPDATE`` for a whole batch of rows.
+
+    The update only happens when the incoming ``version`` is newer than the
+    stored one (or either is unknown), so stale and replayed webhooks leave
+    the row untouched instead of rewriting it. Returns the rows actually
+    written.
+
+    Rows are written in primary-key order, so concurrent batches take their
+    row locks in the same order and cannot deadlock each other.
+    """
+    if not rows:
+        return []
+    rows = sorted(rows, key=lambda row: row["id"])
+    stmt = _insert_for(model)
+    table = model.__table__
+    values = {name: stmt.excluded[name] for name in rows[0] if name != "id"}
+    for name in keep:
+        values[name] = func.coalesce(stmt.excluded[name], table.c[name])
+    incoming, stored = stmt.excluded[version], table.c[version]
+    result = await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_=values,
+            where=or_(incoming.is_(None), stored.is_(None), incoming > stored),
+        ).returning(*table.c),
+        rows,
+    )
+    return list(result.all())
+
+
+async def _apply_shopify_updates(
+    session: AsyncSession, updates: Iterable[Tuple[str, Dict[str, Any]]]
+) -> None:
+    """Apply (topic, payload) pairs in arrival order as one upsert per table.
+
+    Rows are keyed by primary key so a record touched several times in the
+    batch is written once, with its newest payload.
+    """
+    now = _utcnow()
+    pending: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+    deleted_orders: Dict[str, None] = {}
+    for topic, payload in updates:
+        topic = (topic or "").lower()
+        if topic == "orders/delete":
+            if payload.get("id"):
+                order_id = str(payload["id"])
+                pending.get(ShopifyOrder, {}).pop(order_id, None)
+                deleted_orders[order_id] = None
+            continue
+        for prefix, model, build, version, keep in SHOPIFY_TOPICS:
+            if topic.startswith(prefix):
+                row = build(payload, now)
+                if row is None:
+                    break
+                if model is ShopifyOrder:
+                    deleted_orders.pop(row["id"], None)
+                rows = pending.setdefault(model, {})
+                previous = rows.get(row["id"])
+                if previous is not None:
+                    if not _is_newer(row, previous, version):
+                        break
+                    for name in keep:
+                        if row[name] is None:
+                            row[name] = previous[name]
+                rows[row["id"]] = row
+                break
+    for _prefix, model, _build, version, keep in SHOPIFY_TOPICS:
+        rows = pending.get(model)
+        if rows:
+            written = await _upsert_rows(session, model, list(rows.values()), version, keep)
+            if model is ShopifyOrder:
+                await _refresh_order_facts(session, written)
+    if deleted_orders:
+        await delete_orders(session, list(deleted_orders))
+
+
+async def delete_orders(session: AsyncSession, order_ids: List[str]) -> None:
+    """Delete orders and take their facts out of the metrics store.
+
+    Orders must only be removed through here (or be followed by
+    ``rebuild_order_metrics``), otherwise the counters drift.
+    """
+    await session.execute(delete(ShopifyOrder).where(ShopifyOrder.id.in_(order_ids)))
+    await _apply_order_facts(session, {order_id: None for order_id in order_ids})
+
+
+def _metric_deltas(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> Dict[str, float]:
+    deltas = {"total_orders": (after is not None) - (before is not None)}
+    for name in COUNTED_FACTS:
+        deltas[name] = (after or {}).get(name, 0) - (before or {}).get(name, 0)
+    return deltas
+
+
+async def _refresh_order_facts(session: AsyncSession, orders: Iterable[Any]) -> None:
+    """Bring the metrics store in line with ``orders`` (ShopifyOrder rows).
+
+    Must run in the transaction that wrote the orders: their row locks
+    serialize concurrent writers of the same order, so the facts read here
+    are the ones this delta is computed against.
+    """
+    new_facts: Dict[str, Optional[Dict[str, Any]]] = {}
+    for order in orders:
+        facts = order_facts(_normalize_order_record(order))
+        new_facts[facts["order_id"]] = facts
+    await _apply_order_facts(session, new_facts)
+
+
+async def _apply_order_facts(
+    session: AsyncSession, new_facts: Dict[str, Optional[Dict[str, Any]]]
+) -> None:
+    """Store ``new_facts`` (None for a deleted order) and move the counters by
+    the difference from the facts stored before."""
+    if not new_facts:
         return
-    record_id = f"{item_id}:{location_id}"
-    record = await session.get(ShopifyInventoryLevel, record_id)
-    now = datetime.utcnow()
-    if record is None:
-        record = ShopifyInventoryLevel(
-            id=record_id,
-            inventory_item_id=str(item_id),
-            location_id=str(location_id),
+    fact_columns = ShopifyOrderFacts.__table__.c
+    previous = {
+        row.order_id: dict(row._mapping)
+        for row in await session.execute(
+            select(ShopifyOrderFacts.__table__).where(
+                fact_columns.order_id.in_(list(new_facts))
+            )
         )
-    record.available = payload.get("available")
-    updated_at = payload.get("updated_at")
-    if isinstance(updated_at, str):
-        try:
-            record.updated_at = datetime.fromisoformat(
-                updated_at.replace("Z", "+00:00")
+    }
+
+    totals: Dict[str, float] = {}
+    skus: Dict[str, Dict[str, Any]] = {}
+    for order_id, after in new_facts.items():
+        before = previous.get(order_id)
+        for name, delta in _metric_deltas(before, after).items():
+            totals[name] = totals.get(name, 0) + delta
+        changes = [(line, -1) for line in (before or {}).get("blocked_skus") or []]
+        changes += [(line, 1) for line in (after or {}).get("blocked_skus") or []]
+        for line, step in changes:
+            entry = skus.setdefault(
+                line["sku"],
+                {
+                    "sku": line["sku"],
+                    "name": line["name"],
+                    "on_hand": line["on_hand"],
+                    "orders_waiting": 0,
+                },
             )
-        except ValueError:
-            record.updated_at = now
-    else:
-        record.updated_at = now
-    record.raw = payload
-    session.add(record)
+            entry["orders_waiting"] += step
+
+    # Every multi-row upsert below goes in key order (see ``_upsert_rows``).
+    stored = sorted(
+        (facts for facts in new_facts.values() if facts is not None),
+        key=lambda facts: facts["order_id"],
+    )
+    if stored:
+        stmt = _insert_for(ShopifyOrderFacts)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[fact_columns.order_id],
+                set_={c.name: stmt.excluded[c.name] for c in fact_columns if c.name != "order_id"},
+            ),
+            stored,
+        )
+    removed = [order_id for order_id, facts in new_facts.items() if facts is None]
+    if removed:
+        await session.execute(delete(ShopifyOrderFacts).where(fact_columns.order_id.in_(removed)))
+    await _add_to_counters(session, totals, skus.values())
+
+
+async def _add_to_counters(
+    session: AsyncSession, totals: Dict[str, float], skus: Iterable[Dict[str, Any]]
+) -> None:
+    changed = [
+        {"name": name, "value": value} for name, value in sorted(totals.items()) if value
+    ]
+    if changed:
+        stmt = _insert_for(ShopifyOrderMetric)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ShopifyOrderMetric.name],
+                set_={"value": ShopifyOrderMetric.value + stmt.excluded.value},
+            ),
+            changed,
+        )
+    changed_skus = sorted(
+        (entry for entry in skus if entry["orders_waiting"]), key=lambda entry: entry["sku"]
+    )
+    if changed_skus:
+        stmt = _insert_for(ShopifySkuBlock)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ShopifySkuBlock.sku],
+                set_={
+                    "orders_waiting": ShopifySkuBlock.orders_waiting
+                    + stmt.excluded.orders_waiting
+                },
+            ),
+            changed_skus,
+        )
+        await session.execute(
+            delete(ShopifySkuBlock).where(
+                ShopifySkuBlock.sku.in_([entry["sku"] for entry in changed_skus]),
+                ShopifySkuBlock.orders_waiting <= 0,
+            )
+        )
+
+
+async def rebuild_order_metrics(batch_size: int = 500) -> None:
+    """Recompute the metrics store from ``shopify_orders``.
+
+    Runs at startup when the store is missing (new deployments) or its
+    order count no longer matches ``shopify_orders``; orders are read in
+    keyset batches.
+    """
+    async with SESSION() as session:
+        await session.execute(delete(ShopifyOrderFacts))
+        await session.execute(delete(ShopifyOrderMetric))
+        await session.execute(delete(ShopifySkuBlock))
+        session.add(ShopifyOrderMetric(name="total_orders", value=0))
+        await session.flush()
+        last_id: Optional[str] = None
+        while True:
+            stmt = select(ShopifyOrder).order_by(ShopifyOrder.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(ShopifyOrder.id > last_id)
+            orders = list(await session.scalars(stmt))
+            if not orders:
+                break
+            await _refresh_order_facts(session, orders)
+            last_id = orders[-1].id
+            session.expunge_all()
+        await session.commit()
+
+
+async def backfill_order_columns(batch_size: int = 500) -> int:
+    """Fill the extracted columns of orders stored before they existed.
+
+    Rows still missing ``order_status`` are walked in keyset batches, one
+    commit per batch, so a large backfill never holds a long transaction.
+    """
+    updated = 0
+    last_id = ""
+    while True:
+        async with SESSION() as session:
+            rows = (
+                await session.execute(
+                    select(ShopifyOrder.id, ShopifyOrder.raw, ShopifyOrder.fulfillment_status)
+                    .where(ShopifyOrder.order_status.is_(None), ShopifyOrder.id > last_id)
+                    .order_by(ShopifyOrder.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                return updated
+            await session.execute(
+                update(ShopifyOrder),
+                [
+                    {"id": order_id, **_order_columns(raw or {}, fulfillment_status)}
+                    for order_id, raw, fulfillment_status in rows
+                ],
+            )
+            await session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+async def _load_orders_summary(session: AsyncSession) -> Tuple[int, Dict[str, Any]]:
+    """Total order count and the dashboard sections, from the metrics store."""
+    counters = {
+        name: value
+        for name, value in await session.execute(
+            select(ShopifyOrderMetric.name, ShopifyOrderMetric.value)
+        )
+    }
+    total_orders = int(counters.get("total_orders", 0))
+    if not total_orders:
+        return 0, {}
+    now = datetime.now(timezone.utc)
+    facts = ShopifyOrderFacts
+
+    async def open_older_than(age: timedelta) -> int:
+        return await session.scalar(
+            select(func.count()).where(facts.open.is_(True), facts.created_at < now - age)
+        ) or 0
+
+    untracked = await session.execute(
+        select(facts.order_number, facts.created_at, facts.assigned_to)
+        .where(
+            facts.has_fulfillments.is_(False),
+            facts.created_at < now - TRACKING_PENDING_AFTER,
+        )
+        .order_by(facts.created_at.desc())
+        .limit(SUMMARY_LIST_LIMIT)
+    )
+    in_transit = await session.execute(
+        select(facts.order_number, facts.transit)
+        .where(facts.transit_since < now - DELAYED_AFTER)
+        .order_by(facts.transit_since)
+        .limit(SUMMARY_LIST_LIMIT)
+    )
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    delivered = await session.execute(
+        select(facts.delivered).where(facts.last_delivered_at >= today)
+    )
+    with_returns = await session.execute(
+        select(facts.order_number, facts.pending_returns)
+        .where(facts.pending_return_count > 0)
+        .order_by(facts.created_at.desc())
+        .limit(SUMMARY_LIST_LIMIT)
+    )
+    sku_rows = await session.execute(
+        select(ShopifySkuBlock)
+        .order_by(ShopifySkuBlock.orders_waiting.desc(), ShopifySkuBlock.sku)
+        .limit(SUMMARY_LIST_LIMIT)
+    )
+    summary = {
+        "metrics": summarize_metrics(
+            counters, await open_older_than(OVERDUE_AFTER), await open_older_than(BREACH_AFTER)
+        ),
+        "shipments": summarize_shipments(untracked.all(), in_transit.all(), delivered.all()),
+        "returns": summarize_returns(counters, with_returns.all()),
+        "inventory_blocks": summarize_inventory_blocks(sku_rows.scalars().all()),
+    }
+    return total_orders, summary
 
 
 async def _process_shopify_topic(
     session: AsyncSession, topic: str, payload: Dict[str, Any]
 ) -> None:
-    topic = (topic or "").lower()
-    if topic.startswith("customers/"):
-        await _upsert_shopify_customer(session, payload)
-    elif topic.startswith("orders/"):
-        await _upsert_shopify_order(session, payload)
-    elif topic.startswith("inventory_levels/"):
-        await _upsert_inventory_level(session, payload)
+    await _apply_shopify_updates(session, [(topic, payload)])
 
 
 def _utcnow() -> datetime:
@@ -392,42 +979,169 @@ def _prepare_order_ids(values: Iterable[Any]) -> tuple[list[str], Dict[str, str]
     return normalized, lookup
 
 
-def _set_note_attribute(raw: Dict[str, Any], key: str, value: str) -> None:
-    note_attributes = raw.get("note_attributes") or []
-    if not isinstance(note_attributes, list):
-        note_attributes = []
-    normalized_key = key.lower()
-    filtered = []
-    for attr in note_attributes:
-        name = str(attr.get("name") or attr.get("key") or "").lower()
-        if name and name == normalized_key:
-            continue
-        filtered.append(attr)
-    filtered.append({"name": key, "value": str(value)})
-    raw["note_attributes"] = filtered
-
-
 def _orders_action_response(
     *,
     success: bool,
     message: Optional[str] = None,
     updated: Optional[List[Dict[str, Any]]] = None,
+    count: Optional[int] = None,
 ) -> Dict[str, Any]:
     response: Dict[str, Any] = {"success": success}
     if message is not None:
         response["message"] = message
     response["updatedOrders"] = updated or []
+    if count is not None:
+        response["updatedCount"] = count
     return response
 
 
-async def _load_orders(
-    session: AsyncSession, order_ids: List[str]
-) -> List[ShopifyOrder]:
-    if not order_ids:
-        return []
-    stmt = select(ShopifyOrder).where(ShopifyOrder.id.in_(order_ids))
-    result = await session.execute(stmt)
-    return result.scalars().all()
+async def _update_orders(
+    order_ids: List[str],
+    values: Dict[str, Any],
+    facts: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Apply ``values`` to the given orders as set-based UPDATEs.
+
+    Runs one ``UPDATE ... WHERE id IN (...) RETURNING`` per chunk of
+    ``ORDER_ACTION_CHUNK_SIZE`` ids, each in its own short transaction together
+    with the metrics store update for the rows it touched. When the change
+    only touches stored facts columns, pass them as ``facts``: they are
+    written with one UPDATE and only ids come back; otherwise the facts are
+    recomputed from the updated rows. Returns the updated ids; ids that
+    match no order are ignored.
+    """
+    unique_ids = list(dict.fromkeys(order_ids))
+    updated: List[str] = []
+    for start in range(0, len(unique_ids), ORDER_ACTION_CHUNK_SIZE):
+        chunk = unique_ids[start : start + ORDER_ACTION_CHUNK_SIZE]
+        statement = (
+            update(ShopifyOrder)
+            .where(ShopifyOrder.id.in_(chunk))
+            .values(updated_at=_utcnow(), **values)
+        )
+        async with SESSION() as session:
+            if facts is None:
+                orders = list(
+                    await session.scalars(
+                        statement.returning(ShopifyOrder),
+                        execution_options={"synchronize_session": False},
+                    )
+                )
+                await _refresh_order_facts(session, orders)
+                ids = [order.id for order in orders]
+            else:
+                ids = list(
+                    await session.scalars(
+                        statement.returning(ShopifyOrder.id),
+                        execution_options={"synchronize_session": False},
+                    )
+                )
+                if ids and facts:
+                    await session.execute(
+                        update(ShopifyOrderFacts)
+                        .where(ShopifyOrderFacts.order_id.in_(ids))
+                        .values(**facts),
+                        execution_options={"synchronize_session": False},
+                    )
+            await session.commit()
+        updated.extend(ids)
+    return updated
+
+
+def _patched_raw(
+    *,
+    set_: Optional[Dict[str, Any]] = None,
+    append: Optional[Dict[str, Any]] = None,
+    note_attribute: Optional[Tuple[str, str]] = None,
+) -> Any:
+    """SQL expression for ``shopify_orders.raw`` with the action's changes.
+
+    ``set_`` replaces top-level keys, ``append`` adds one item to top-level
+    arrays (a missing or non-array value starts a new list) and
+    ``note_attribute`` replaces any note attribute with the same
+    (case-insensitive) name. The document is patched by the database, so
+    ``raw`` is only read back when the metrics facts depend on the change.
+    """
+    changes: Dict[str, Any] = {}
+    if IS_SQLITE:
+        raw = case(
+            (func.json_type(ShopifyOrder.raw) == "object", func.json(ShopifyOrder.raw)),
+            else_=func.json(literal("{}")),
+        )
+
+        def sqlite_array(key: str) -> Any:
+            return case(
+                (func.json_type(raw, f"$.{key}") == "array", func.json_extract(raw, f"$.{key}")),
+                else_=literal("[]"),
+            )
+
+        for key, value in (set_ or {}).items():
+            changes[key] = func.json(json.dumps(value))
+        for key, item in (append or {}).items():
+            changes[key] = func.json_insert(sqlite_array(key), "$[#]", func.json(json.dumps(item)))
+        if note_attribute is not None:
+            name, value = note_attribute
+            attr = func.json_each(sqlite_array("note_attributes")).table_valued("value")
+            kept = (
+                select(func.json_group_array(func.json(attr.c.value)))
+                .where(
+                    func.lower(
+                        func.coalesce(
+                            func.json_extract(attr.c.value, "$.name"),
+                            func.json_extract(attr.c.value, "$.key"),
+                            "",
+                        )
+                    )
+                    != name.lower()
+                )
+                .scalar_subquery()
+            )
+            changes["note_attributes"] = func.json_insert(
+                kept, "$[#]", func.json(json.dumps({"name": name, "value": value}))
+            )
+        paths = [part for key, expr in changes.items() for part in (f"$.{key}", expr)]
+        return func.json_set(raw, *paths)
+
+    raw = case(
+        (func.json_typeof(ShopifyOrder.raw) == "object", cast(ShopifyOrder.raw, JSONB)),
+        else_=literal({}, JSONB),
+    )
+
+    def pg_array(key: str) -> Any:
+        value = raw.op("->", return_type=JSONB)(key)
+        return case((func.jsonb_typeof(value) == "array", value), else_=literal([], JSONB))
+
+    def pg_item(item: Any) -> Any:
+        return func.jsonb_build_array(literal(item, JSONB))
+
+    for key, value in (set_ or {}).items():
+        changes[key] = literal(value, JSONB)
+    for key, item in (append or {}).items():
+        changes[key] = pg_array(key).op("||", return_type=JSONB)(pg_item(item))
+    if note_attribute is not None:
+        name, value = note_attribute
+        attr = func.jsonb_array_elements(pg_array("note_attributes")).table_valued(
+            column("value", JSONB)
+        )
+        kept = (
+            select(func.jsonb_agg(attr.c.value))
+            .where(
+                func.lower(
+                    func.coalesce(
+                        attr.c.value.op("->>")("name"), attr.c.value.op("->>")("key"), ""
+                    )
+                )
+                != name.lower()
+            )
+            .scalar_subquery()
+        )
+        changes["note_attributes"] = func.coalesce(kept, literal([], JSONB)).op(
+            "||", return_type=JSONB
+        )(pg_item({"name": name, "value": value}))
+    patch = func.jsonb_build_object(
+        *[part for key, expr in changes.items() for part in (literal(key), expr)]
+    )
+    return cast(raw.op("||", return_type=JSONB)(patch), JSON)
 
 
 @app.post("/zoho/incoming")
@@ -476,18 +1190,276 @@ async def shopify_webhook(req: Request) -> Dict[str, Any]:
 
     topic = req.headers.get("X-Shopify-Topic") or payload.get("topic") or "unknown"
     shop_id = req.headers.get("X-Shopify-Shop-Domain") or payload.get("shop_id")
-    event = ShopifyEvent(
-        id=f"shopify-{uuid4().hex[:10]}",
+    webhook_id = req.headers.get("X-Shopify-Webhook-Id") or None
+    duplicate = {"ok": True, "topic": topic, "duplicate": True}
+    if webhook_id and webhook_id in seen_webhooks:
+        WEBHOOKS_TOTAL.labels("duplicate").inc()
+        return duplicate
+
+    event_id = f"shopify-{uuid4().hex[:10]}"
+    if WEBHOOK_FAST_ACK:
+        stmt = _insert_for(ShopifyWebhookQueue).values(
+            event_id=event_id,
+            webhook_id=webhook_id,
+            topic=topic,
+            shop_id=shop_id,
+            body=raw_body.decode("utf-8"),
+            received_at=datetime.utcnow(),
+        )
+        async with SESSION() as session:
+            result = await session.execute(
+                stmt.on_conflict_do_nothing(index_elements=["webhook_id"])
+            )
+            await session.commit()
+        if webhook_id:
+            seen_webhooks.add(webhook_id)
+        if not result.rowcount:
+            WEBHOOKS_TOTAL.labels("duplicate").inc()
+            return duplicate
+        WEBHOOKS_TOTAL.labels("queued").inc()
+        webhook_queue.wake()
+        return {"ok": True, "topic": topic, "event_id": event_id, "queued": True}
+
+    stmt = _insert_for(ShopifyEvent).values(
+        id=event_id,
+        webhook_id=webhook_id,
         topic=topic,
         shop_id=shop_id,
         payload=payload,
         received_at=datetime.utcnow(),
     )
     async with SESSION() as session:
-        session.add(event)
-        await _process_shopify_topic(session, topic, payload)
+        result = await session.execute(
+            stmt.on_conflict_do_nothing(index_elements=["webhook_id"])
+        )
+        if result.rowcount:
+            await _process_shopify_topic(session, topic, payload)
         await session.commit()
-    return {"ok": True, "topic": topic, "event_id": event.id}
+    if webhook_id:
+        seen_webhooks.add(webhook_id)
+    if not result.rowcount:
+        WEBHOOKS_TOTAL.labels("duplicate").inc()
+        return duplicate
+    return {"ok": True, "topic": topic, "event_id": event_id}
+
+
+class SeenWebhooks:
+    """Bounded LRU of recently accepted webhook ids.
+
+    Answers Shopify retries without touching the database; the unique
+    ``webhook_id`` indexes stay authoritative once an id has been evicted.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._ids: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, webhook_id: str) -> bool:
+        if webhook_id in self._ids:
+            self._ids.move_to_end(webhook_id)
+            return True
+        return False
+
+    def add(self, webhook_id: str) -> None:
+        self._ids[webhook_id] = None
+        self._ids.move_to_end(webhook_id)
+        while len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+
+seen_webhooks = SeenWebhooks(WEBHOOK_SEEN_SIZE)
+
+
+def _webhook_claimable(now: datetime) -> Any:
+    return and_(
+        ShopifyWebhookQueue.attempts < WEBHOOK_MAX_ATTEMPTS,
+        or_(
+            ShopifyWebhookQueue.locked_until.is_(None),
+            ShopifyWebhookQueue.locked_until < now,
+        ),
+    )
+
+
+class WebhookQueueWorker:
+    """Applies queued webhooks in batches.
+
+    Each batch is claimed with a per-batch token (``FOR UPDATE SKIP LOCKED``
+    where supported) so several workers and replicas can drain one table.
+    A batch is applied in one transaction; if that fails its rows are
+    retried one by one, and rows that keep failing are left in the queue
+    with ``last_error`` once ``SYNC_WEBHOOK_MAX_ATTEMPTS`` is reached.
+    """
+
+    def __init__(self) -> None:
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._stopping = False
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        if not self._tasks:
+            # created here so it belongs to the loop the workers run on
+            self._wake = asyncio.Event()
+        self._stopping = False
+        while len(self._tasks) < max(WEBHOOK_WORKERS, 1):
+            self._tasks.append(
+                asyncio.create_task(self._run(), name=f"sync-webhooks-{len(self._tasks)}")
+            )
+
+    async def stop(self) -> None:
+        """Let in-flight batches finish, then stop the workers.
+
+        Workers are signalled rather than cancelled: cancelling mid-batch
+        would abandon an open transaction (and, on SQLite, its lock).
+        """
+        self._stopping = True
+        self.wake()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Webhook queue drain failed")
+                processed = 0
+            if processed or self._stopping:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=WEBHOOK_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> int:
+        """Apply everything currently claimable; returns the number of rows handled."""
+        total = 0
+        while processed := await self.drain_once():
+            total += processed
+        return total
+
+    async def _claim(self, token: str) -> List[ShopifyWebhookQueue]:
+        now = _utcnow()
+        async with SESSION() as session:
+            due = (
+                select(ShopifyWebhookQueue.id)
+                .where(_webhook_claimable(now))
+                .order_by(ShopifyWebhookQueue.id)
+                .limit(WEBHOOK_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            ids = list(await session.scalars(due))
+            if not ids:
+                return []
+            await session.execute(
+                update(ShopifyWebhookQueue)
+                .where(ShopifyWebhookQueue.id.in_(ids), _webhook_claimable(now))
+                .values(
+                    claim_token=token,
+                    locked_until=now + timedelta(seconds=WEBHOOK_LEASE_SECONDS),
+                    attempts=ShopifyWebhookQueue.attempts + 1,
+                )
+            )
+            await session.commit()
+            rows = await session.scalars(
+                select(ShopifyWebhookQueue)
+                .where(ShopifyWebhookQueue.claim_token == token)
+                .order_by(ShopifyWebhookQueue.id)
+            )
+            return list(rows)
+
+    async def _apply(self, rows: List[ShopifyWebhookQueue], token: str) -> None:
+        async with SESSION() as session:
+            # retries that arrived after the original was applied (and left
+            # the queue) are dropped here
+            webhook_ids = [row.webhook_id for row in rows if row.webhook_id]
+            applied = set()
+            if webhook_ids:
+                applied = set(
+                    await session.scalars(
+                        select(ShopifyEvent.webhook_id).where(
+                            ShopifyEvent.webhook_id.in_(webhook_ids)
+                        )
+                    )
+                )
+            events = []
+            updates = []
+            for row in rows:
+                if row.webhook_id in applied:
+                    continue
+                payload = json.loads(row.body) if row.body else {}
+                events.append(
+                    {
+                        "id": row.event_id,
+                        "webhook_id": row.webhook_id,
+                        "topic": row.topic,
+                        "shop_id": row.shop_id,
+                        "payload": payload,
+                        "received_at": row.received_at,
+                    }
+                )
+                updates.append((row.topic, payload))
+            if applied:
+                WEBHOOKS_TOTAL.labels("duplicate").inc(len(rows) - len(events))
+            if events:
+                await session.execute(ShopifyEvent.__table__.insert(), events)
+                await _apply_shopify_updates(session, updates)
+            # the token guard skips rows whose lease expired and were reclaimed
+            await session.execute(
+                delete(ShopifyWebhookQueue).where(
+                    ShopifyWebhookQueue.id.in_([row.id for row in rows]),
+                    ShopifyWebhookQueue.claim_token == token,
+                )
+            )
+            await session.commit()
+
+    async def drain_once(self) -> int:
+        token = uuid4().hex
+        rows = await self._claim(token)
+        if not rows:
+            return 0
+        try:
+            await self._apply(rows, token)
+            WEBHOOKS_TOTAL.labels("applied").inc(len(rows))
+            return len(rows)
+        except Exception:
+            logger.exception("Webhook batch of %d failed; retrying rows singly", len(rows))
+        for row in rows:
+            try:
+                await self._apply([row], token)
+                WEBHOOKS_TOTAL.labels("applied").inc()
+            except Exception as exc:
+                dead = row.attempts >= WEBHOOK_MAX_ATTEMPTS
+                WEBHOOKS_TOTAL.labels("dead" if dead else "retry").inc()
+                async with SESSION() as session:
+                    await session.execute(
+                        update(ShopifyWebhookQueue)
+                        .where(
+                            ShopifyWebhookQueue.id == row.id,
+                            ShopifyWebhookQueue.claim_token == token,
+                        )
+                        .values(
+                            claim_token=None,
+                            locked_until=_utcnow()
+                            + timedelta(seconds=WEBHOOK_RETRY_SECONDS),
+                            last_error=str(exc) or exc.__class__.__name__,
+                        )
+                    )
+                    await session.commit()
+        return len(rows)
+
+
+webhook_queue = WebhookQueueWorker()
 
 
 @app.post("/sync/orders/assign")
@@ -506,30 +1478,30 @@ async def sync_orders_assign(request: Request) -> Dict[str, Any]:
         )
 
     normalized_ids, id_lookup = _prepare_order_ids(order_ids_raw)
-    async with SESSION() as session:
-        orders = await _load_orders(session, normalized_ids)
-        updated: List[Dict[str, Any]] = []
-        now = _utcnow()
-        for order in orders:
-            raw = dict(order.raw or {})
-            _set_note_attribute(raw, "orders_control_tower.assignee", assignee)
-            raw["assigned_to"] = assignee
-            order.raw = raw
-            order.updated_at = now
-            updated.append(
-                {
-                    "id": id_lookup.get(order.id, order.id),
-                    "assignedTo": assignee,
-                }
-            )
-        await session.commit()
+    order_ids = await _update_orders(
+        normalized_ids,
+        {
+            "assigned_to": assignee,
+            "raw": _patched_raw(
+                set_={"assigned_to": assignee},
+                note_attribute=("orders_control_tower.assignee", assignee),
+            ),
+        },
+        facts={"assigned_to": assignee},
+    )
+    updated = [
+        {"id": id_lookup.get(order_id, order_id), "assignedTo": assignee}
+        for order_id in order_ids
+    ]
 
     message = (
         f"Assigned {len(updated)} order(s) to {assignee}."
         if updated
         else "No matching orders found for assignment."
     )
-    return _orders_action_response(success=True, message=message, updated=updated)
+    return _orders_action_response(
+        success=True, message=message, updated=updated, count=len(updated)
+    )
 
 
 @app.post("/sync/orders/fulfill")
@@ -551,26 +1523,25 @@ async def sync_orders_fulfill(request: Request) -> Dict[str, Any]:
             tracking = {"number": number, "carrier": carrier}
 
     normalized_ids, id_lookup = _prepare_order_ids(order_ids_raw)
-    async with SESSION() as session:
-        orders = await _load_orders(session, normalized_ids)
-        updated: List[Dict[str, Any]] = []
-        now = _utcnow()
-        for order in orders:
-            raw = dict(order.raw or {})
-            raw["fulfillment_status"] = "fulfilled"
-            if tracking:
-                raw["latest_tracking"] = tracking
-            order.raw = raw
-            order.fulfillment_status = "fulfilled"
-            order.updated_at = now
-            updated.append(
-                {
-                    "id": id_lookup.get(order.id, order.id),
-                    "fulfillmentStatus": "fulfilled",
-                    "tracking": tracking,
-                }
-            )
-        await session.commit()
+    raw_changes: Dict[str, Any] = {"fulfillment_status": "fulfilled"}
+    if tracking:
+        raw_changes["latest_tracking"] = tracking
+    order_ids = await _update_orders(
+        normalized_ids,
+        {
+            "fulfillment_status": "fulfilled",
+            "order_status": order_status("fulfilled"),
+            "raw": _patched_raw(set_=raw_changes),
+        },
+    )
+    updated = [
+        {
+            "id": id_lookup.get(order_id, order_id),
+            "fulfillmentStatus": "fulfilled",
+            "tracking": tracking,
+        }
+        for order_id in order_ids
+    ]
 
     message_base = (
         f"Marked {len(updated)} order(s) fulfilled"
@@ -580,7 +1551,9 @@ async def sync_orders_fulfill(request: Request) -> Dict[str, Any]:
     if tracking and updated:
         message_base = f"{message_base} with tracking {tracking['number']}"
     message = f"{message_base}."
-    return _orders_action_response(success=True, message=message, updated=updated)
+    return _orders_action_response(
+        success=True, message=message, updated=updated, count=len(updated)
+    )
 
 
 @app.post("/sync/orders/support")
@@ -600,38 +1573,33 @@ async def sync_orders_support(request: Request) -> Dict[str, Any]:
     conversation_id = str(payload.get("conversationId") or f"support-{uuid4().hex[:8]}")
     note = str(payload.get("note") or "").strip()
 
-    async with SESSION() as session:
-        order = await session.get(ShopifyOrder, normalized_id)
-        if not order:
-            return _orders_action_response(
-                success=False,
-                message=f"Order {order_id_raw} not found.",
-                updated=[],
-            )
-        raw = dict(order.raw or {})
-        _set_note_attribute(raw, "support_thread", conversation_id)
-        thread_notes = raw.get("support_notes") or []
-        if not isinstance(thread_notes, list):
-            thread_notes = []
-        now = _utcnow()
-        if note:
-            thread_notes.append(
-                {
-                    "note": note,
-                    "created_at": now.isoformat(),
-                }
-            )
-        raw["support_notes"] = thread_notes
-        raw["support_thread"] = conversation_id
-        order.raw = raw
-        order.updated_at = now
-        await session.commit()
+    thread_note = {"note": note, "created_at": _utcnow().isoformat()} if note else None
+    order_ids = await _update_orders(
+        [normalized_id],
+        {
+            "support_thread": conversation_id,
+            "raw": _patched_raw(
+                set_={"support_thread": conversation_id},
+                append={"support_notes": thread_note} if thread_note else None,
+                note_attribute=("support_thread", conversation_id),
+            ),
+        },
+        facts={},
+    )
+    if not order_ids:
+        return _orders_action_response(
+            success=False,
+            message=f"Order {order_id_raw} not found.",
+            updated=[],
+            count=0,
+        )
 
     message = f"Support requested for {order_id_raw}."
     return _orders_action_response(
         success=True,
         message=message,
         updated=[{"id": order_id_raw, "supportThread": conversation_id}],
+        count=1,
     )
 
 
@@ -657,33 +1625,20 @@ async def sync_orders_returns(request: Request) -> Dict[str, Any]:
         )
     note = str(payload.get("note") or "").strip()
 
-    async with SESSION() as session:
-        order = await session.get(ShopifyOrder, normalized_id)
-        if not order:
-            return _orders_action_response(
-                success=False,
-                message=f"Order {order_id_raw} not found.",
-                updated=[],
-            )
-        raw = dict(order.raw or {})
-        returns_log = raw.get("returns") or []
-        if not isinstance(returns_log, list):
-            returns_log = []
-        now = _utcnow()
-        returns_log.append(
-            {
-                "action": action,
-                "note": note or None,
-                "recorded_at": now.isoformat(),
-            }
+    entry = {"action": action, "note": note or None, "recorded_at": _utcnow().isoformat()}
+    order_ids = await _update_orders(
+        [normalized_id], {"raw": _patched_raw(append={"returns": entry})}
+    )
+    if not order_ids:
+        return _orders_action_response(
+            success=False,
+            message=f"Order {order_id_raw} not found.",
+            updated=[],
+            count=0,
         )
-        raw["returns"] = returns_log
-        order.raw = raw
-        order.updated_at = now
-        await session.commit()
 
     message = f"Return updated ({action}) for {order_id_raw}."
-    return _orders_action_response(success=True, message=message, updated=[])
+    return _orders_action_response(success=True, message=message, updated=[], count=1)
 
 
 @app.get("/sync/orders")
@@ -711,26 +1666,115 @@ async def sync_orders(
     }
 
     limit = int(page_size or DEFAULT_PAGE_SIZE)
-    offset = decode_offset_cursor(cursor)
+    filters = _order_filters(status_filter, priority, assigned_to, date_start, date_end)
+    keyset = decode_keyset_cursor(cursor)
+    backward = keyset is not None and direction in {"before", "prev", "previous"}
 
     async with SESSION() as session:
-        total_orders = await session.scalar(select(func.count(ShopifyOrder.id)))
+        total_orders, summary = await _load_orders_summary(session)
         if not total_orders:
             return build_stub_orders_response(params)
+        matching = total_orders
+        if filters:
+            matching = await session.scalar(
+                select(func.count()).select_from(ShopifyOrder).where(*filters)
+            ) or 0
+
+        page_stmt = select(ShopifyOrder).where(*filters)
+        if keyset is not None:
+            created_at, order_id, cursor_page = keyset
+            page_stmt = page_stmt.where(_order_keyset(created_at, order_id, backward))
+            page = max(cursor_page - 1, 1) if backward else cursor_page + 1
+        else:
+            # "ofs:" cursors from older clients still resolve, by offset.
+            offset = decode_offset_cursor(cursor)
+            page_stmt = page_stmt.offset(offset)
+            page = offset // limit + 1
+        page_stmt = page_stmt.order_by(*_order_listing(backward)).limit(limit + 1)
+        page_rows = list((await session.execute(page_stmt)).scalars().all())
+
+    has_more = len(page_rows) > limit
+    page_rows = page_rows[:limit]
+    if backward:
+        page_rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, page > 1
 
-        ordering = (
-            ShopifyOrder.order_created_at.desc().nullslast(),
-            ShopifyOrder.updated_at.desc(),
+    page_orders = [_normalize_order_record(order) for order in page_rows]
+    page_info = keyset_page_info(
+        page_orders,
+        page=page,
+        page_size=limit,
+        total=matching,
+        has_next=has_next,
+        has_previous=has_previous,
+    )
+    return build_orders_payload(params, page_orders, total_orders, summary, page_info)
+
+
+def _order_filters(
+    status_filter: Optional[str],
+    priority: Optional[str],
+    assigned_to: Optional[str],
+    date_start: Optional[str],
+    date_end: Optional[str],
+) -> List[Any]:
+    """WHERE clauses for the /sync/orders filters, on the extracted columns."""
+    filters: List[Any] = []
+    statuses = [part.strip() for part in (status_filter or "").split(",") if part.strip()]
+    if statuses and "all" not in statuses:
+        filters.append(ShopifyOrder.order_status.in_(statuses))
+    if priority and priority != "all":
+        filters.append(ShopifyOrder.priority == priority)
+    if assigned_to == "unassigned":
+        filters.append(ShopifyOrder.assigned_to.is_(None))
+    elif assigned_to and assigned_to != "all":
+        filters.append(ShopifyOrder.assigned_to == assigned_to)
+    start = _parse_filter_date(date_start, "date_start")
+    if start is not None:
+        filters.append(ShopifyOrder.order_created_at >= start)
+    end = _parse_filter_date(date_end, "date_end")
+    if end is not None:
+        if len(date_end or "") == 10:
+            # A bare date includes the whole day.
+            end += timedelta(days=1)
+        filters.append(ShopifyOrder.order_created_at < end)
+    return filters
+
+
+def _parse_filter_date(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = _parse_order_datetime(value)
+    if parsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be an ISO-8601 date",
         )
-        page_stmt = select(ShopifyOrder).order_by(*ordering).offset(offset).limit(limit)
-        metrics_stmt = select(ShopifyOrder).order_by(*ordering).limit(200)
+    return parsed
 
-        page_rows = (await session.execute(page_stmt)).scalars().all()
-        metrics_rows = (await session.execute(metrics_stmt)).scalars().all()
 
-    page_orders = [_normalize_order_record(order) for order in page_rows]
-    metrics_orders = [_normalize_order_record(order) for order in metrics_rows]
-    return build_orders_payload(params, page_orders, total_orders, metrics_orders)
+def _order_listing(backward: bool = False) -> Tuple[Any, ...]:
+    """Newest first, undated orders last, id as the tie-breaker."""
+    if backward:
+        return (ShopifyOrder.order_created_at.asc().nullsfirst(), ShopifyOrder.id.asc())
+    return (ShopifyOrder.order_created_at.desc().nullslast(), ShopifyOrder.id.desc())
+
+
+def _order_keyset(created_at: Optional[datetime], order_id: str, backward: bool) -> Any:
+    """Orders strictly after (or, ``backward``, before) the cursor position in
+    ``_order_listing`` order."""
+    created = ShopifyOrder.order_created_at
+    if created_at is None:
+        if backward:
+            return or_(created.is_not(None), ShopifyOrder.id > order_id)
+        return and_(created.is_(None), ShopifyOrder.id < order_id)
+    position = tuple_(created, ShopifyOrder.id)
+    cursor = tuple_(created_at, order_id)
+    if backward:
+        return position > cursor
+    return or_(position < cursor, created.is_(None))
 
 
 @app.get("/sync/orders/alerts")
@@ -750,12 +1794,22 @@ async def sync_orders_alerts(
 
 def _normalize_order_record(order: "ShopifyOrder") -> Dict[str, Any]:
     raw = order.raw or {}
-    tags = _extract_tags(raw)
+    if order.order_status is None:
+        # Not backfilled yet: derive from raw instead of the extracted columns.
+        columns = _order_columns(raw, order.fulfillment_status)
+    else:
+        columns = {
+            "tags": order.tags or [],
+            "ship_by": order.ship_by,
+            "assigned_to": order.assigned_to,
+            "support_thread": order.support_thread,
+        }
+    tags = columns["tags"]
     created_at = order.order_created_at or _parse_order_datetime(raw.get("created_at"))
-    ship_by = _extract_ship_by(raw)
+    ship_by = columns["ship_by"]
     total_price = _to_float(order.total_price or raw.get("total_price"))
-    assigned_to = _extract_assignee(raw)
-    support_thread = _extract_support_thread(raw)
+    assigned_to = columns["assigned_to"]
+    support_thread = columns["support_thread"]
 
     return {
         "id": order.id,
@@ -827,9 +1881,12 @@ def _parse_order_datetime(value: Optional[str]) -> Optional[datetime]:
     try:
         if value.endswith("Z"):
             value = value.replace("Z", "+00:00")
-        return datetime.fromisoformat(value)
+        parsed = datetime.fromisoformat(value)
     except Exception:
         return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed
 
 
 def _to_float(value: Any) -> float:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 import os
 
@@ -13,6 +13,7 @@ try:  # Guard test import so suite can skip gracefully when FastAPI is unavailab
     from fastapi.testclient import TestClient
     from sqlalchemy import delete
 
+    import app.sync.main as sync_main
     from app.sync.main import SESSION, ShopifyOrder, app
 except (
     ModuleNotFoundError
@@ -47,6 +48,19 @@ async def _seed_order(order_id: str, raw: Dict[str, Any] | None = None) -> None:
         await session.commit()
 
 
+async def _seed_facts(order_id: str) -> None:
+    async with SESSION() as session:  # type: ignore[misc]
+        order = await session.get(ShopifyOrder, order_id)
+        await sync_main._refresh_order_facts(session, [order])
+        await session.commit()
+
+
+async def _load_facts_assignee(order_id: str) -> str | None:
+    async with SESSION() as session:  # type: ignore[misc]
+        facts = await session.get(sync_main.ShopifyOrderFacts, order_id)
+        return facts.assigned_to if facts is not None else None
+
+
 async def _load_order(order_id: str) -> ShopifyOrder | None:
     if SESSION is None or ShopifyOrder is None:
         return None
@@ -59,6 +73,9 @@ async def _reset_orders() -> None:
         return
     async with SESSION() as session:  # type: ignore[misc]
         await session.execute(delete(ShopifyOrder))
+        await session.execute(delete(sync_main.ShopifyOrderFacts))
+        await session.execute(delete(sync_main.ShopifyOrderMetric))
+        await session.execute(delete(sync_main.ShopifySkuBlock))
         await session.commit()
 
 
@@ -139,6 +156,43 @@ class OrdersEndpointTests(unittest.TestCase):
             )
         )
 
+    def test_assign_updates_orders_in_chunks(self) -> None:
+        for order_id in ("1101", "1102", "1103"):
+            asyncio.run(
+                _seed_order(
+                    order_id,
+                    {
+                        "note_attributes": [
+                            {"name": "Orders_Control_Tower.Assignee", "value": "old"}
+                        ]
+                    },
+                )
+            )
+            asyncio.run(_seed_facts(order_id))
+        original_chunk_size = sync_main.ORDER_ACTION_CHUNK_SIZE
+        sync_main.ORDER_ACTION_CHUNK_SIZE = 2
+        try:
+            response = self.client.post(
+                "/sync/orders/assign",
+                json={"orderIds": ["1101", "1102", "1103", "1101", "9999"], "assignee": "ops"},
+            )
+        finally:
+            sync_main.ORDER_ACTION_CHUNK_SIZE = original_chunk_size
+        payload = response.json()
+        self.assertEqual(payload["updatedCount"], 3)
+        self.assertEqual(
+            sorted(order["id"] for order in payload["updatedOrders"]), ["1101", "1102", "1103"]
+        )
+
+        stored = asyncio.run(_load_order("1103"))
+        self.assertIsNotNone(stored)
+        self.assertEqual(stored.assigned_to, "ops")
+        self.assertEqual(
+            stored.raw["note_attributes"],
+            [{"name": "orders_control_tower.assignee", "value": "ops"}],
+        )
+        self.assertEqual(asyncio.run(_load_facts_assignee("1103")), "ops")
+
     def test_fulfill_endpoint_marks_orders(self) -> None:
         asyncio.run(_seed_order("2002"))
 
@@ -226,6 +280,136 @@ class OrdersEndpointTests(unittest.TestCase):
             any(entry.get("action") == "approve_refund" for entry in returns_log)
         )
 
+    def test_metrics_are_maintained_incrementally(self) -> None:
+        self.client.portal.call(_reset_orders)
+        now = datetime.now(timezone.utc)
+
+        async def apply(*updates) -> None:
+            async with SESSION() as session:  # type: ignore[misc]
+                await sync_main._apply_shopify_updates(session, list(updates))
+                await session.commit()
+
+        blocked_line = {"sku": "AN8-KIT", "name": "Kit", "fulfillable_quantity": 1}
+        self.client.portal.call(
+            apply,
+            (
+                "orders/create",
+                {
+                    "id": 5101,
+                    "created_at": (now - timedelta(hours=30)).isoformat(),
+                    "updated_at": (now - timedelta(hours=30)).isoformat(),
+                    "line_items": [blocked_line],
+                },
+            ),
+            (
+                "orders/create",
+                {
+                    "id": 5102,
+                    "created_at": now.isoformat(),
+                    "refunds": [{"status": "refunded", "amount": "12.50"}],
+                },
+            ),
+        )
+        metrics = self.client.get("/sync/orders").json()
+        self.assertEqual(metrics["metrics"]["total_orders"], 2)
+        self.assertEqual(metrics["metrics"]["awaiting_fulfillment"], 2)
+        self.assertEqual(metrics["metrics"]["overdue"], 1)
+        self.assertEqual(metrics["returns"]["refund_value_usd"], 12.5)
+        self.assertEqual(
+            [(b["sku"], b["orders_waiting"]) for b in metrics["inventory_blocks"]],
+            [("AN8-KIT", 1)],
+        )
+
+        self.client.portal.call(
+            apply,
+            (
+                "orders/fulfilled",
+                {
+                    "id": 5101,
+                    "fulfillment_status": "fulfilled",
+                    "updated_at": now.isoformat(),
+                    "line_items": [dict(blocked_line, fulfillment_status="fulfilled")],
+                },
+            ),
+        )
+        metrics = self.client.get("/sync/orders").json()
+        self.assertEqual(metrics["metrics"]["total_orders"], 2)
+        self.assertEqual(metrics["metrics"]["awaiting_fulfillment"], 1)
+        self.assertEqual(metrics["metrics"]["overdue"], 0)
+        self.assertEqual(metrics["inventory_blocks"], [])
+
+        self.client.portal.call(apply, ("orders/delete", {"id": 5102}))
+        metrics = self.client.get("/sync/orders").json()
+        self.assertEqual(metrics["metrics"]["total_orders"], 1)
+        self.assertEqual(metrics["returns"]["refund_value_usd"], 0)
+
+    def test_filters_and_keyset_pages_use_extracted_columns(self) -> None:
+        self.client.portal.call(_reset_orders)
+        now = datetime.now(timezone.utc)
+
+        async def seed() -> None:
+            async with SESSION() as session:  # type: ignore[misc]
+                await sync_main._apply_shopify_updates(
+                    session,
+                    [
+                        (
+                            "orders/create",
+                            {
+                                "id": 6100 + index,
+                                "created_at": (now - timedelta(hours=index)).isoformat(),
+                                "tags": "vip" if index % 2 else "",
+                                "fulfillment_status": "fulfilled" if index == 4 else None,
+                            },
+                        )
+                        for index in range(5)
+                    ],
+                )
+                await session.commit()
+
+        self.client.portal.call(seed)
+        # Rows written before the extracted columns existed are backfilled.
+        self.client.portal.call(
+            _seed_order,
+            "6200",
+            {"note_attributes": [{"name": "assignee", "value": "Ana"}]},
+        )
+        self.assertEqual(self.client.portal.call(sync_main.backfill_order_columns), 1)
+
+        def ids(payload: Dict[str, Any]) -> list:
+            return [item["id"] for item in payload["orders"]["items"]]
+
+        vip = self.client.get("/sync/orders", params={"priority": "vip"}).json()
+        self.assertEqual(ids(vip), ["6101", "6103"])
+        assigned = self.client.get("/sync/orders", params={"assigned_to": "Ana"}).json()
+        self.assertEqual(ids(assigned), ["6200"])
+        open_orders = self.client.get(
+            "/sync/orders", params={"status": "awaiting_fulfillment"}
+        ).json()
+        self.assertNotIn("6104", ids(open_orders))
+        self.assertEqual(open_orders["orders"]["page_info"]["totalPages"], 1)
+
+        first = self.client.get("/sync/orders", params={"pageSize": 4}).json()
+        info = first["orders"]["page_info"]
+        self.assertEqual(ids(first), ["6200", "6100", "6101", "6102"])
+        self.assertEqual((info["page"], info["totalPages"], info["hasNextPage"]), (1, 2, True))
+
+        second = self.client.get(
+            "/sync/orders", params={"pageSize": 4, "cursor": info["nextCursor"]}
+        ).json()
+        info = second["orders"]["page_info"]
+        self.assertEqual(ids(second), ["6103", "6104"])
+        self.assertEqual((info["page"], info["hasNextPage"], info["hasPreviousPage"]), (2, False, True))
+
+        back = self.client.get(
+            "/sync/orders",
+            params={"pageSize": 4, "cursor": info["previousCursor"], "direction": "before"},
+        ).json()
+        self.assertEqual(ids(back), ids(first))
+        self.assertEqual(back["orders"]["page_info"]["page"], 1)
+
+        bad = self.client.get("/sync/orders", params={"date_start": "yesterday"})
+        self.assertEqual(bad.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main()
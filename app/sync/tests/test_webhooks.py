@@ -5,9 +5,12 @@ import hmac
 import json
 import os
 import unittest
+import uuid
+from datetime import datetime
 
 try:  # Guarded import for environments without FastAPI
     from fastapi.testclient import TestClient
+    from sqlalchemy import delete, func, select
 
     os.environ.setdefault("POSTGRES_URL", "sqlite+aiosqlite:///./test_sync.db")
     os.environ.setdefault("SHOPIFY_WEBHOOK_SECRET", "shpss_test")
@@ -28,6 +31,19 @@ else:
     _IMPORT_ERROR = None
 
 
+async def _reset_webhook_state() -> None:
+    """Drop queued webhooks and everything they wrote, so nothing a test
+    leaves behind is applied while later tests (or runs) are going."""
+    async with sync_main.SESSION() as session:
+        await session.execute(delete(sync_main.ShopifyWebhookQueue))
+        await session.execute(delete(sync_main.ShopifyOrder))
+        await session.execute(delete(sync_main.ShopifyInventoryLevel))
+        await session.execute(delete(sync_main.ShopifyOrderFacts))
+        await session.execute(delete(sync_main.ShopifyOrderMetric))
+        await session.execute(delete(sync_main.ShopifySkuBlock))
+        await session.commit()
+
+
 class ShopifyWebhookSecurityTests(unittest.TestCase):
     def setUp(self) -> None:
         if _IMPORT_ERROR is not None:
@@ -36,6 +52,8 @@ class ShopifyWebhookSecurityTests(unittest.TestCase):
         self.client = self._client_ctx.__enter__()
 
     def tearDown(self) -> None:
+        self.client.portal.call(sync_main.webhook_queue.stop)
+        self.client.portal.call(_reset_webhook_state)
         self._client_ctx.__exit__(None, None, None)
 
     def test_missing_hmac_header_returns_401(self) -> None:
@@ -53,6 +71,7 @@ class ShopifyWebhookSecurityTests(unittest.TestCase):
         self.assertEqual(response.json()["detail"], "Invalid Shopify HMAC signature")
 
     def test_valid_hmac_accepts_payload(self) -> None:
+        self.client.portal.call(sync_main.webhook_queue.stop)
         payload = {"id": 99, "topic": "orders/create"}
         body = json.dumps(payload).encode()
         digest = hmac.new(SHOPIFY_WEBHOOK_SECRET.encode(), body, "sha256").digest()
@@ -70,6 +89,139 @@ class ShopifyWebhookSecurityTests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["topic"], "orders/create")
+        self.assertTrue(data["queued"])
+
+    def _post_webhook(self, topic: str, payload: dict, webhook_id: str = "") -> dict:
+        body = json.dumps(payload).encode()
+        digest = hmac.new(SHOPIFY_WEBHOOK_SECRET.encode(), body, "sha256").digest()
+        headers = {
+            "X-Shopify-Hmac-Sha256": base64.b64encode(digest).decode(),
+            "X-Shopify-Topic": topic,
+            "Content-Type": "application/json",
+        }
+        if webhook_id:
+            headers["X-Shopify-Webhook-Id"] = webhook_id
+        response = self.client.post("/shopify/webhook", content=body, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_queued_webhooks_are_applied_in_batches(self) -> None:
+        # drain deterministically on the app's loop instead of the background worker
+        self.client.portal.call(sync_main.webhook_queue.stop)
+        first = self._post_webhook(
+            "orders/create", {"id": 7001, "name": "#7001", "created_at": "2024-05-01T10:00:00Z"}
+        )
+        self.assertTrue(first["queued"])
+        second = self._post_webhook(
+            "orders/updated",
+            {"id": 7001, "name": "#7001", "fulfillment_status": "fulfilled"},
+        )
+        self._post_webhook(
+            "inventory_levels/update",
+            {"inventory_item_id": 11, "location_id": 22, "available": 3},
+        )
+
+        self.client.portal.call(sync_main.webhook_queue.drain)
+
+        async def load():
+            async with sync_main.SESSION() as session:
+                order = await session.get(sync_main.ShopifyOrder, "7001")
+                level = await session.get(sync_main.ShopifyInventoryLevel, "11:22")
+                queued = await session.scalar(
+                    select(func.count(sync_main.ShopifyWebhookQueue.id)).where(
+                        sync_main.ShopifyWebhookQueue.event_id.in_(
+                            [first["event_id"], second["event_id"]]
+                        )
+                    )
+                )
+                event = await session.get(sync_main.ShopifyEvent, first["event_id"])
+                await sync_main.delete_orders(session, ["7001"])
+                await session.execute(delete(sync_main.ShopifyInventoryLevel))
+                await session.commit()
+                return order, level, queued, event
+
+        order, level, queued, event = self.client.portal.call(load)
+        self.assertEqual(order.fulfillment_status, "fulfilled")
+        # created_at missing from the later payload keeps the stored value
+        self.assertEqual(order.order_created_at.year, 2024)
+        self.assertEqual(level.available, 3)
+        self.assertEqual(queued, 0)
+        self.assertEqual(event.topic, "orders/create")
+
+    def test_retries_and_stale_updates_are_skipped(self) -> None:
+        self.client.portal.call(sync_main.webhook_queue.stop)
+        suffix = uuid.uuid4().hex
+        newer = {
+            "id": 7101,
+            "fulfillment_status": "fulfilled",
+            "updated_at": "2024-05-02T10:00:00Z",
+        }
+        self._post_webhook("orders/updated", newer, webhook_id=f"a-{suffix}")
+        retry = self._post_webhook("orders/updated", newer, webhook_id=f"a-{suffix}")
+        self.assertTrue(retry["duplicate"])
+        self.client.portal.call(sync_main.webhook_queue.drain)
+
+        # once the seen-set has forgotten it, the events table still rejects it
+        sync_main.seen_webhooks.clear()
+        self._post_webhook(
+            "orders/updated",
+            dict(newer, fulfillment_status="restocked"),
+            webhook_id=f"a-{suffix}",
+        )
+        # an older version delivered late must not overwrite the newer one
+        self._post_webhook(
+            "orders/updated",
+            {"id": 7101, "fulfillment_status": None, "updated_at": "2024-05-01T10:00:00Z"},
+            webhook_id=f"b-{suffix}",
+        )
+        self.client.portal.call(sync_main.webhook_queue.drain)
+
+        async def load():
+            async with sync_main.SESSION() as session:
+                order = await session.get(sync_main.ShopifyOrder, "7101")
+                events = await session.scalar(
+                    select(func.count(sync_main.ShopifyEvent.id)).where(
+                        sync_main.ShopifyEvent.webhook_id.like(f"%-{suffix}")
+                    )
+                )
+                await sync_main.delete_orders(session, ["7101"])
+                await session.commit()
+                return order, events
+
+        order, events = self.client.portal.call(load)
+        self.assertEqual(order.fulfillment_status, "fulfilled")
+        self.assertEqual(events, 2)
+
+    def test_offset_timestamps_are_compared_in_utc(self) -> None:
+        self.client.portal.call(sync_main.webhook_queue.stop)
+        suffix = uuid.uuid4().hex
+        # across the DST fall-back the later update has the earlier wall time
+        self._post_webhook(
+            "orders/updated",
+            {"id": 7201, "fulfillment_status": None, "updated_at": "2024-11-03T01:30:00-04:00"},
+            webhook_id=f"a-{suffix}",
+        )
+        self._post_webhook(
+            "orders/updated",
+            {
+                "id": 7201,
+                "fulfillment_status": "fulfilled",
+                "updated_at": "2024-11-03T01:10:00-05:00",
+            },
+            webhook_id=f"b-{suffix}",
+        )
+        self.client.portal.call(sync_main.webhook_queue.drain)
+
+        async def load():
+            async with sync_main.SESSION() as session:
+                order = await session.get(sync_main.ShopifyOrder, "7201")
+                await sync_main.delete_orders(session, ["7201"])
+                await session.commit()
+                return order
+
+        order = self.client.portal.call(load)
+        self.assertEqual(order.fulfillment_status, "fulfilled")
+        self.assertEqual(order.source_updated_at.replace(tzinfo=None), datetime(2024, 11, 3, 6, 10))
 
 
 if __name__ == "__main__":
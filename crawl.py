@@ -0,0 +1,173 @@
+"""Shared fetch layer for discovery, ingest and staleness checks.
+
+- One pooled ``requests.Session`` per process (Shopify bot signature headers
+  included when configured).
+- Persistent on-disk HTTP cache: gzip-compressed bodies keyed by URL plus a
+  small JSON sidecar holding the validators (ETag / Last-Modified).
+- Conditional GETs: cached pages are revalidated with If-None-Match /
+  If-Modified-Since and a 304 reuses the stored body.
+
+Env:
+  CRAWL_CACHE_DIR      cache directory (default .http_cache)
+  CRAWL_CACHE_MAX_AGE  seconds a cached body is trusted without revalidating (default 0)
+  CRAWL_OFFLINE=1      never touch the network; serve from cache or fail
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+CACHE_DIR = os.getenv("CRAWL_CACHE_DIR", ".http_cache")
+CACHE_MAX_AGE = float(os.getenv("CRAWL_CACHE_MAX_AGE", "0"))
+OFFLINE = os.getenv("CRAWL_OFFLINE", "").lower() in {"1", "true", "yes"}
+POOL_SIZE = int(os.getenv("CRAWL_POOL_SIZE", "16"))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+stats = {"network": 0, "not_modified": 0, "cache": 0}
+
+
+def shopify_headers() -> Dict[str, str]:
+    si = os.getenv("SHOPIFY_SIGNATURE_INPUT")
+    s = os.getenv("SHOPIFY_SIGNATURE")
+    sa = os.getenv("SHOPIFY_SIGNATURE_AGENT")
+    headers = {"User-Agent": "HRAN-crawler/1.0"}
+    if si and s and sa:
+        headers.update({"Signature-Input": si, "Signature": s, "Signature-Agent": sa})
+    return headers
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(shopify_headers())
+                _session = session
+    return _session
+
+
+@dataclass
+class Page:
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(_charset(self.headers), errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            resp = requests.Response()
+            resp.status_code, resp.url = self.status_code, self.url
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}", response=resp)
+
+
+def _charset(headers: Dict[str, str]) -> str:
+    ctype = headers.get("Content-Type", "")
+    for part in ctype.split(";"):
+        k, _, v = part.strip().partition("=")
+        if k.lower() == "charset" and v:
+            return v.strip('"')
+    return "utf-8"
+
+
+def _paths(url: str):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    base = os.path.join(CACHE_DIR, key[:2], key)
+    return base + ".json", base + ".body.gz"
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def cached(url: str):
+    """Return (meta, body) for ``url`` from the disk cache, or (None, None)."""
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with gzip.open(body_path, "rb") as f:
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None, None
+
+
+def _store(url: str, meta: dict, body: Optional[bytes]) -> None:
+    meta_path, body_path = _paths(url)
+    if body is not None:
+        _atomic_write(body_path, gzip.compress(body, compresslevel=6))
+    _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+def fetch(url: str, timeout: float = 30, max_age: Optional[float] = None) -> Page:
+    """GET ``url`` through the disk cache; error statuses are returned, not cached."""
+    max_age = CACHE_MAX_AGE if max_age is None else max_age
+    meta, body = cached(url)
+    if meta is not None and (OFFLINE or time.time() - meta["fetched_at"] <= max_age):
+        stats["cache"] += 1
+        return Page(url, 200, body, meta.get("headers", {}), from_cache=True)
+    if OFFLINE:
+        raise requests.ConnectionError(f"offline and not cached: {url}")
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    r = get_session().get(url, headers=headers, timeout=timeout)
+    if r.status_code == 304 and meta is not None:
+        stats["not_modified"] += 1
+        meta["fetched_at"] = time.time()
+        _store(url, meta, None)
+        return Page(url, 200, body, meta.get("headers", {}), from_cache=True)
+    stats["network"] += 1
+    page = Page(url, r.status_code, r.content, {"Content-Type": r.headers.get("Content-Type", "")})
+    if r.status_code == 200:
+        _store(url, {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "headers": page.headers,
+            "fetched_at": time.time(),
+        }, r.content)
+    return page
+
+
+def html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.extract()
+    return soup.get_text(" ", strip=True)
+
+
+def fetch_text(url: str, timeout: float = 30) -> str:
+    page = fetch(url, timeout)
+    page.raise_for_status()
+    return html_to_text(page.text)
+
+
+def text_hash(text: str) -> str:
+    # whitespace-insensitive so re-rendered markup with the same copy hashes equal
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
@@ -1,8 +1,9 @@
 import re, sys
 from urllib.parse import urljoin
-import requests
 from xml.etree import ElementTree as ET
 
+import crawl
+
 BASE = "https://hotrodan.com"
 SITEMAP_CANDIDATES = [
     "/sitemap.xml",
@@ -28,7 +29,8 @@ BLOCK_PATTERNS = [
 ]
 
 def fetch(url, timeout=20):
-    r = requests.get(url, timeout=timeout, headers={"User-Agent":"HRAN-crawler/1.0"})
+    # conditional GET through the shared on-disk cache (unchanged sitemaps are 304s)
+    r = crawl.fetch(url, timeout)
     r.raise_for_status()
     return r
 
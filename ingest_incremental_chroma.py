@@ -1,11 +1,13 @@
-import os, json, time
+import os, sys, json, time, argparse, asyncio
+from contextlib import asynccontextmanager
 from typing import Dict, List, Tuple
+from urllib.parse import urlparse
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from bs4 import BeautifulSoup
 import requests
 
-from llama_index.core import StorageContext, VectorStoreIndex, Document, load_index_from_storage
+from llama_index.core import Settings, StorageContext, VectorStoreIndex, Document, load_index_from_storage
+from llama_index.core.schema import NodeRelationship
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from rag_config import (
     CHROMA_PATH,
@@ -14,8 +16,21 @@ from rag_config import (
     PERSIST_DIR,
     configure_settings,
 )
+import crawl
+from crawl import fetch_text, text_hash
+
+# BM25 sparse index lives with the RAG API that serves it
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "rag_api"))
+from sparse_index import SparseIndex
 
 STATE_FILE = "ingest_state.json"
+PROGRESS_FILE = "ingest_progress.json"
+
+FETCH_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+PER_HOST_CONCURRENCY = int(os.getenv("INGEST_PER_HOST", "2"))
+HOST_DELAY = float(os.getenv("INGEST_HOST_DELAY", "0.25"))
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "16"))
+FETCH_RETRIES = int(os.getenv("INGEST_FETCH_RETRIES", "3"))
 
 def read_urls_with_lastmod(path="urls_with_lastmod.tsv") -> List[Tuple[str,str]]:
     pairs = []
@@ -26,32 +41,168 @@ def read_urls_with_lastmod(path="urls_with_lastmod.tsv") -> List[Tuple[str,str]]
                 pairs.append((u, m))
     return pairs
 
-def load_state() -> Dict[str,str]:
-    if os.path.exists(STATE_FILE):
-        return json.load(open(STATE_FILE))
-    return {}
+def load_json(path: str, default):
+    if os.path.exists(path):
+        return json.load(open(path))
+    return default
 
-def save_state(d: Dict[str,str]):
-    with open(STATE_FILE,"w") as f:
+def write_json(path: str, d):
+    # write-then-rename so a crash mid-write never truncates the checkpoint
+    tmp = path + ".tmp"
+    with open(tmp,"w") as f:
         json.dump(d, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+# State: {url: {"lastmod", "content_hash", "chunks": {node_id: chunk_hash}}}.
+# Older files mapped url -> lastmod; those entries have no hashes, so the
+# next change to such a page replaces all of its vectors once.
+def load_state() -> Dict[str,dict]:
+    return {u: (e if isinstance(e, dict) else {"lastmod": e}) for u, e in load_json(STATE_FILE, {}).items()}
+
+def save_state(d: Dict[str,dict]):
+    write_json(STATE_FILE, d)
+
+class HostLimiter:
+    """Global fetch bound plus per-host concurrency and minimum spacing."""
+
+    def __init__(self, total: int, per_host: int, delay: float):
+        self.total = asyncio.Semaphore(total)
+        self.per_host = per_host
+        self.delay = delay
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc
+        sem = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        # per-host slot first: a slow host must not sit on global slots while
+        # it waits for its own, starving fetches to other hosts
+        async with sem, self.total:
+            async with lock:
+                loop = asyncio.get_running_loop()
+                wait = self._next.get(host, 0.0) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next[host] = loop.time() + self.delay
+            yield
 
-def shopify_headers():
-    si = os.getenv("SHOPIFY_SIGNATURE_INPUT")
-    s = os.getenv("SHOPIFY_SIGNATURE")
-    sa = os.getenv("SHOPIFY_SIGNATURE_AGENT")
-    headers = {"User-Agent": "HRAN-crawler/1.0"}
-    if si and s and sa:
-        headers.update({"Signature-Input": si, "Signature": s, "Signature-Agent": sa})
-    return headers
-
-def fetch_text(url: str) -> str:
-    r = requests.get(url, headers=shopify_headers(), timeout=30)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    for tag in soup(["script","style","noscript"]): tag.extract()
-    return soup.get_text(" ", strip=True)
+async def fetch_one(limiter: HostLimiter, url: str):
+    """Return (url, text, error); retries 429/5xx/connection errors with backoff."""
+    if crawl.OFFLINE:
+        try:
+            return url, await asyncio.to_thread(fetch_text, url), None
+        except requests.RequestException as e:
+            return url, None, str(e)
+    err = "no fetch attempts (INGEST_FETCH_RETRIES=0)"
+    for attempt in range(FETCH_RETRIES):
+        if attempt:
+            await asyncio.sleep(2 ** (attempt - 1))
+        async with limiter.slot(url):
+            try:
+                return url, await asyncio.to_thread(fetch_text, url), None
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                if status != 429 and status < 500:
+                    return url, None, f"HTTP {status}"
+                err = f"HTTP {status}"
+            except requests.RequestException as e:
+                err = str(e)
+    return url, None, err
+
+async def fetch_batch(limiter: HostLimiter, urls: List[str]):
+    return await asyncio.gather(*(fetch_one(limiter, u) for u in urls))
+
+def chunk_page(url: str, text: str):
+    """Split a page into nodes whose ids derive from their content hash."""
+    nodes = Settings.node_parser.get_nodes_from_documents([Document(text=text, metadata={"source_url": url}, doc_id=url)])
+    ids, seen = {}, {}
+    for n in nodes:
+        h = text_hash(n.get_content())
+        seen[h] = seen.get(h, 0) + 1
+        ids[n.node_id] = f"{url}#{h[:16]}" + (f"-{seen[h]}" if seen[h] > 1 else "")
+    for n in nodes:
+        n.id_ = ids[n.node_id]
+        for rel in (NodeRelationship.PREVIOUS, NodeRelationship.NEXT):
+            if rel in n.relationships:
+                n.relationships[rel].node_id = ids.get(n.relationships[rel].node_id, n.relationships[rel].node_id)
+    return nodes
+
+def index_batch(index, collection, pages, state, reembed: bool = False):
+    """Apply a batch of fetched pages; one embedding call + one Chroma add.
+
+    ``pages`` is [(url, lastmod, text)]. Pages whose normalized text hash is
+    unchanged are skipped; otherwise only chunks with new hashes are embedded
+    and chunks that disappeared are deleted. Returns (entries, stats).
+    """
+    entries: Dict[str,dict] = {}
+    add, drop_ids, drop_urls = [], [], []
+    skipped = 0
+    for url, lastmod, text in pages:
+        prev = state.get(url, {})
+        h = text_hash(text)
+        if not reembed and prev.get("content_hash") == h and "chunks" in prev:
+            entries[url] = {**prev, "lastmod": lastmod}
+            skipped += 1
+            continue
+        nodes = chunk_page(url, text)
+        chunks = {n.node_id: text_hash(n.get_content()) for n in nodes}
+        old = prev.get("chunks")
+        if old is None or reembed:
+            drop_urls.append(url)
+            add.extend(nodes)
+        else:
+            add.extend(n for n in nodes if n.node_id not in old)
+            drop_ids.extend(i for i in old if i not in chunks)
+        entries[url] = {"lastmod": lastmod, "content_hash": h, "chunks": chunks}
+    if drop_urls:
+        collection.delete(where={"source_url": {"$in": drop_urls}})
+    if drop_ids:
+        collection.delete(ids=drop_ids)
+    if add:
+        # insert_nodes embeds the whole batch at once, then adds to Chroma in bulk
+        index.insert_nodes(add)
+    return entries, {"skipped": skipped, "embedded": len(add), "deleted": len(drop_ids)}
+
+async def run_updates(index, collection, state, to_update, progress, full: bool, reembed: bool = False):
+    limiter = HostLimiter(FETCH_CONCURRENCY, PER_HOST_CONCURRENCY, HOST_DELAY)
+    batches = [to_update[i:i+BATCH_SIZE] for i in range(0, len(to_update), BATCH_SIZE)]
+    failed: Dict[str,str] = {}
+    totals = {"skipped": 0, "embedded": 0, "deleted": 0}
+    pending = asyncio.create_task(fetch_batch(limiter, [u for u, _ in batches[0]])) if batches else None
+    for i, batch in enumerate(batches):
+        fetched = await pending
+        # overlap fetching the next batch with embedding this one
+        if i + 1 < len(batches):
+            pending = asyncio.create_task(fetch_batch(limiter, [u for u, _ in batches[i+1]]))
+        lastmods = dict(batch)
+        pages = []
+        for u, text, err in fetched:
+            if err:
+                failed[u] = err
+                continue
+            pages.append((u, lastmods[u], text))
+        entries, stats = await asyncio.to_thread(index_batch, index, collection, pages, state, reembed)
+        # checkpoint: only pages that made it into Chroma are recorded
+        state.update(entries)
+        save_state(state)
+        if full:
+            progress["done"].extend(entries)
+            write_json(PROGRESS_FILE, progress)
+        for k in totals:
+            totals[k] += stats[k]
+        print(f"Batch {i+1}/{len(batches)}: {len(pages)} pages ({totals['skipped']} unchanged so far), "
+              f"{totals['embedded']} chunks embedded, {totals['deleted']} removed, {len(failed)} failed")
+    return failed
 
 def main():
+    ap = argparse.ArgumentParser(description="Incremental (or full, resumable) Chroma ingest")
+    ap.add_argument("--full", action="store_true", help="re-ingest every sitemap URL; resumes an interrupted full run")
+    ap.add_argument("--reembed", action="store_true", help="ignore content hashes and re-embed every fetched page")
+    args = ap.parse_args()
+
     mode = configure_settings()
     if mode != "openai":
         print("OPENAI_API_KEY missing; using FastEmbed fallback (retrieval-only mode).")
@@ -75,7 +226,15 @@ def main():
         index.set_index_id(INDEX_ID)
 
     # Determine changes
-    to_update = [(u,m) for (u,m) in pairs if state.get(u) != m]
+    progress = {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "done": []}
+    if args.full:
+        progress = load_json(PROGRESS_FILE, progress)
+        done = set(progress["done"])
+        if done:
+            print(f"Resuming full ingest started {progress['started_at']} ({len(done)} pages done)")
+        to_update = [(u,m) for (u,m) in pairs if u not in done]
+    else:
+        to_update = [(u,m) for (u,m) in pairs if state.get(u, {}).get("lastmod") != m]
     to_delete = [u for u in state.keys() if u not in current_urls]
 
     print(f"Changed: {len(to_update)} | Deleted: {len(to_delete)}")
@@ -87,25 +246,29 @@ def main():
         for i in range(0, len(to_delete), 100):
             batch = to_delete[i:i+100]
             collection.delete(where={"source_url": {"$in": batch}})
+        for u in to_delete:
+            state.pop(u, None)
+        save_state(state)
 
-    # For changed URLs: delete old vectors for that URL, then upsert fresh content
-    for u, _m in to_update:
-        collection.delete(where={"source_url": u})
-        text = fetch_text(u)
-        doc = Document(text=text, metadata={"source_url": u}, doc_id=u)
-        # insert via index (honors current Settings + chunking)
-        index.insert(doc)
-        time.sleep(0.1)
+    failed = asyncio.run(run_updates(index, collection, state, to_update, progress, args.full, args.reembed))
 
-    # Persist non-vector parts (index_store/docstore)
+    # Rebuild the BM25 sparse index used by hybrid retrieval, then persist the
+    # non-vector parts (index_store/docstore) once. The API reloads when those
+    # JSON files change, so they are written last and only at the end of the
+    # run: a reload then finds a sparse index that already matches Chroma
+    # instead of rebuilding BM25 itself after every batch.
+    sparse = SparseIndex.from_collection(collection)
+    sparse.save(PERSIST_DIR)
+    print(f"Sparse index: {len(sparse)} chunks")
     storage.persist(persist_dir=PERSIST_DIR)
 
-    # Update state
-    for u, m in to_update:
-        state[u] = m
-    for u in to_delete:
-        state.pop(u, None)
-    save_state(state)
+    print(f"HTTP: {crawl.stats['network']} downloaded, {crawl.stats['not_modified']} not modified, {crawl.stats['cache']} from cache")
+    if failed:
+        for u, err in sorted(failed.items()):
+            print(f"  failed: {u} ({err})")
+        print(f"{len(failed)} pages failed; re-run to retry them.")
+    elif args.full and os.path.exists(PROGRESS_FILE):
+        os.remove(PROGRESS_FILE)
     print("Incremental upsert complete.")
 
 if __name__ == "__main__":
@@ -1,8 +1,6 @@
-import os, time
+import os, sys, time
 from typing import List
 from itertools import islice
-import requests
-from bs4 import BeautifulSoup
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
@@ -15,6 +13,11 @@ from rag_config import (
     PERSIST_DIR,
     configure_settings,
 )
+from crawl import fetch_text
+
+# BM25 sparse index lives with the RAG API that serves it
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "rag_api"))
+from sparse_index import SparseIndex
 
 def batched(iterable, n=32):
     it = iter(iterable)
@@ -24,22 +27,6 @@ def batched(iterable, n=32):
             return
         yield chunk
 
-def shopify_headers():
-    si = os.getenv("SHOPIFY_SIGNATURE_INPUT")
-    s = os.getenv("SHOPIFY_SIGNATURE")
-    sa = os.getenv("SHOPIFY_SIGNATURE_AGENT")
-    headers = {"User-Agent": "HRAN-crawler/1.0"}
-    if si and s and sa:
-        headers.update({"Signature-Input": si, "Signature": s, "Signature-Agent": sa})
-    return headers
-
-def fetch_text(url: str) -> str:
-    r = requests.get(url, headers=shopify_headers(), timeout=30)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    for tag in soup(["script","style","noscript"]): tag.extract()
-    return soup.get_text(" ", strip=True)
-
 def load_urls(path="urls.txt") -> List[str]:
     with open(path, "r") as f:
         return [x.strip() for x in f if x.strip()]
@@ -70,6 +57,7 @@ def main():
     index = VectorStoreIndex.from_documents(docs, storage_context=storage_context)
     index.set_index_id(INDEX_ID)
     index.storage_context.persist(persist_dir=PERSIST_DIR)
+    SparseIndex.from_collection(collection).save(PERSIST_DIR)
     print(f"Bootstrap complete. Docs: {len(docs)} | index_id={INDEX_ID}")
 
 if __name__ == "__main__":
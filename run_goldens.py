@@ -3,6 +3,7 @@ import os, yaml, subprocess, sys
 GOLDENS = "goldens/qa.yaml"
 ROUTER = "query_chroma_router.py"
 TIMEOUT_S = 45  # fail fast if anything stalls
+RAG_API_URL = os.getenv("RAG_API_URL")  # when set, answer every golden in one /query/batch call
 
 def run_query(q):
     env = dict(os.environ)
@@ -13,6 +14,20 @@ def run_query(q):
         raise RuntimeError(f"Router errored: {p.stderr.strip()}")
     return p.stdout
 
+def format_result(res):
+    if "error" in res:
+        raise RuntimeError(res["error"])
+    lines = ["=== ANSWER ===", (res.get("answer") or "").strip(), "", "=== SOURCES ==="]
+    lines += [f"- {s}" for s in res.get("sources", [])]
+    return "\n".join(lines)
+
+def run_batch(questions):
+    import requests
+    r = requests.post(f"{RAG_API_URL.rstrip('/')}/query/batch", params={"stream": "false"},
+                      json={"questions": questions}, timeout=TIMEOUT_S * 4)
+    r.raise_for_status()
+    return [item.get("result") or {"error": item["error"]} for item in r.json()["results"]]
+
 def check_case(case, out):
     ok = True
     ans_start = out.find("=== ANSWER ===")
@@ -34,12 +49,13 @@ def main():
     if not os.path.exists(GOLDENS):
         print("Missing goldens/qa.yaml"); sys.exit(2)
     cases = yaml.safe_load(open(GOLDENS)) or []
+    batch = run_batch([case["q"] for case in cases]) if RAG_API_URL and cases else None
     failures = 0
     for i, case in enumerate(cases, 1):
         q = case["q"]
         print(f"\n[{i}] {q}")
         try:
-            out = run_query(q)
+            out = format_result(batch[i - 1]) if batch is not None else run_query(q)
         except subprocess.TimeoutExpired:
             print(f"[FAIL timeout] No response in {TIMEOUT_S}s"); failures += 1; continue
         except Exception as e:
@@ -2,11 +2,17 @@
 """Compare sitemap lastmod timestamps against ingest_state.json.
 
 Usage:
-  python scripts/check_ingest_staleness.py [--limit N]
+  python scripts/check_ingest_staleness.py [--limit N] [--verify-content]
 
 Outputs a summary of URLs whose sitemap lastmod is newer than the
 recorded ingest timestamp (or missing entirely from ingest_state). It also
 surfaces URLs that were ingested but no longer appear in the sitemap.
+
+ingest_state entries are ``{"lastmod", "content_hash", "chunks"}`` objects;
+legacy plain ``url -> lastmod`` entries are still understood. Note that a
+stale lastmod does not imply re-embedding: the ingest skips pages whose
+content hash is unchanged. ``--verify-content`` fetches stale pages through the
+shared crawl cache (conditional GETs) and reports which of them really changed.
 """
 from __future__ import annotations
 
@@ -44,16 +50,25 @@ def load_urls() -> Dict[str, datetime | None]:
     return data
 
 
-def load_ingest_state() -> Dict[str, datetime | None]:
+def load_raw_state() -> Dict[str, dict]:
     if not INGEST_STATE.exists():
         raise FileNotFoundError(f'missing {INGEST_STATE}')
     state_raw = json.loads(INGEST_STATE.read_text())
+    return {url: (entry if isinstance(entry, dict) else {'lastmod': entry}) for url, entry in state_raw.items()}
+
+
+def load_ingest_state() -> Dict[str, datetime | None]:
     parsed: Dict[str, datetime | None] = {}
-    for url, ts in state_raw.items():
-        parsed[url] = parse_lastmod(ts or '')
+    for url, entry in load_raw_state().items():
+        parsed[url] = parse_lastmod(entry.get('lastmod') or '')
     return parsed
 
 
+def count_unhashed() -> int:
+    """Entries without a content hash get fully re-embedded on their next change."""
+    return sum(1 for entry in load_raw_state().values() if not entry.get('content_hash'))
+
+
 def compute_stale(limit: int | None = None) -> Tuple[List[Tuple[str, datetime | None, datetime | None]], int]:
     sitemap = load_urls()
     ingest = load_ingest_state()
@@ -80,12 +95,36 @@ def compute_orphans(limit: int | None = None) -> Tuple[List[Tuple[str, datetime
     return orphans, total
 
 
+def verify_content(urls: List[str]) -> Dict[str, str]:
+    """Classify stale URLs as 'changed', 'unchanged', 'new' or 'error: ...' by content hash."""
+    import sys
+    sys.path.insert(0, str(ROOT))
+    from crawl import fetch_text, text_hash
+
+    state = load_raw_state()
+    verdicts: Dict[str, str] = {}
+    for url in urls:
+        known = state.get(url, {}).get('content_hash')
+        try:
+            current = text_hash(fetch_text(url))
+        except Exception as exc:
+            verdicts[url] = f'error: {exc}'
+            continue
+        if not known:
+            verdicts[url] = 'new'
+        else:
+            verdicts[url] = 'unchanged' if current == known else 'changed'
+    return verdicts
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description='Check ingest freshness vs sitemap lastmod.')
     parser.add_argument('--limit', type=int, default=10, help='Limit number of rows shown (default: 10)')
+    parser.add_argument('--verify-content', action='store_true', help='Fetch stale pages and compare content hashes')
     args = parser.parse_args()
 
     stale, total_stale = compute_stale(args.limit)
+    verdicts = verify_content([url for url, _, _ in stale]) if args.verify_content else {}
     orphans, total_orphans = compute_orphans(args.limit)
 
     print(f'Stale or missing entries: {total_stale}')
@@ -95,6 +134,8 @@ def main() -> None:
             lastmod_str = lastmod.isoformat() if lastmod else 'unknown'
             ingested_str = ingested.isoformat() if ingested else 'missing'
             print(f'- {url}\n    sitemap:  {lastmod_str}\n    ingested: {ingested_str}')
+            if url in verdicts:
+                print(f'    content:  {verdicts[url]}')
     else:
         print('No sitemap entries are newer than ingest_state.')
 
@@ -106,6 +147,10 @@ def main() -> None:
     else:
         print('\nNo orphans detected (ingest_state matches sitemap set).')
 
+    unhashed = count_unhashed()
+    if unhashed:
+        print(f'\nEntries without content hashes (legacy state): {unhashed}')
+
 
 if __name__ == '__main__':
     main()
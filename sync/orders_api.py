@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 import base64
+import json
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 DEFAULT_PAGE_SIZE = 12
 
@@ -25,6 +26,65 @@ def decode_offset_cursor(cursor: Optional[str]) -> int:
         return 0
 
 
+def encode_keyset_cursor(created_at: Optional[datetime], order_id: str, page: int) -> str:
+    """Position of one order in the (placed_at desc, id desc) listing plus the
+    page it was shown on, so page numbers survive keyset pagination."""
+    raw = json.dumps([created_at.isoformat() if created_at else None, order_id, page])
+    return "key:" + base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset_cursor(
+    cursor: Optional[str],
+) -> Optional[Tuple[Optional[datetime], str, int]]:
+    if not cursor or not cursor.startswith("key:"):
+        return None
+    try:
+        token = cursor[4:]
+        created_at, order_id, page = json.loads(
+            base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        )
+        return (
+            datetime.fromisoformat(created_at) if created_at else None,
+            str(order_id),
+            int(page),
+        )
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page_info(
+    page_orders: List[Dict[str, Any]],
+    *,
+    page: int,
+    page_size: int,
+    total: int,
+    has_next: bool,
+    has_previous: bool,
+) -> Dict[str, Any]:
+    start = (
+        encode_keyset_cursor(page_orders[0].get("created_at"), page_orders[0]["id"], page)
+        if page_orders
+        else None
+    )
+    end = (
+        encode_keyset_cursor(page_orders[-1].get("created_at"), page_orders[-1]["id"], page)
+        if page_orders
+        else None
+    )
+    return {
+        "startCursor": start,
+        "endCursor": end,
+        "nextCursor": end if has_next else None,
+        "previousCursor": start if has_previous else None,
+        "hasNextPage": has_next,
+        "hasPreviousPage": has_previous,
+        "page": page,
+        "pageSize": page_size,
+        "totalPages": max((total + page_size - 1) // page_size, 1),
+        "shopifyCursor": _shopify_cursor_hint(page_orders),
+    }
+
+
 def build_stub_orders_response(params: Dict[str, Optional[str]]) -> Dict[str, Any]:
     """Return the legacy stub payload for local integration tests."""
     page_size = int(params.get("pageSize") or DEFAULT_PAGE_SIZE)
@@ -85,52 +145,30 @@ def build_orders_payload(
     params: Dict[str, Optional[str]],
     page_orders: Iterable[Dict[str, Any]],
     total_orders: int,
-    metrics_orders: Iterable[Dict[str, Any]],
+    summary: Dict[str, Any],
+    page_info: Dict[str, Any],
 ) -> Dict[str, Any]:
+    """``summary`` carries the metrics, shipments, returns and inventory_blocks
+    sections built from the materialized metrics store (see ``summarize_*``);
+    ``page_info`` comes from ``keyset_page_info``. A page with no matching
+    orders is returned empty; only a store with no orders at all gets the
+    stub payload."""
     if total_orders == 0:
         return build_stub_orders_response(params)
 
-    page_size = int(params.get("pageSize") or DEFAULT_PAGE_SIZE)
-    offset = decode_offset_cursor(params.get("cursor"))
-
-    page_orders_list = list(page_orders)
-    metrics_orders_list = list(metrics_orders)
-
-    if not page_orders_list:
-        return build_stub_orders_response(params)
-
-    items = [_serialize_order(order) for order in page_orders_list]
-    shipments = _compute_shipments(metrics_orders_list)
-    returns = _compute_returns(metrics_orders_list)
-    inventory_blocks = _compute_inventory_blocks(metrics_orders_list)
-
+    items = [_serialize_order(order) for order in page_orders]
     period = _default_period(params.get("date_start"), params.get("date_end"))
-    metrics = _compute_metrics(metrics_orders_list, total_orders)
-
-    has_next = offset + page_size < total_orders
-    has_prev = offset > 0
 
     return {
         "period": period,
-        "metrics": metrics,
+        "metrics": summary["metrics"],
         "orders": {
             "items": items,
-            "page_info": {
-                "startCursor": encode_offset_cursor(offset) if items else None,
-                "endCursor": encode_offset_cursor(offset + len(items) - 1) if items else None,
-                "nextCursor": encode_offset_cursor(offset + page_size) if has_next else None,
-                "previousCursor": encode_offset_cursor(max(offset - page_size, 0)) if has_prev else None,
-                "hasNextPage": has_next,
-                "hasPreviousPage": has_prev,
-                "page": offset // page_size + 1,
-                "pageSize": page_size,
-                "totalPages": max((total_orders + page_size - 1) // page_size, 1),
-                "shopifyCursor": _shopify_cursor_hint(page_orders_list),
-            },
+            "page_info": page_info,
         },
-        "shipments": shipments,
-        "returns": returns,
-        "inventory_blocks": inventory_blocks,
+        "shipments": summary["shipments"],
+        "returns": summary["returns"],
+        "inventory_blocks": summary["inventory_blocks"],
         "alerts": ["Tracking sync skipped last run"],
         "data_gaps": [],
     }
@@ -150,7 +188,7 @@ def _default_period(date_start: Optional[str], date_end: Optional[str]) -> Dict[
 
 def _serialize_order(order: Dict[str, Any]) -> Dict[str, Any]:
     now = _now()
-    created_at = order.get("created_at")
+    created_at = _as_utc(order.get("created_at"))
     ship_by = order.get("ship_by")
     tags = [t.lower() for t in order.get("tags", []) if isinstance(t, str)]
     raw = order.get("raw", {})
@@ -159,7 +197,7 @@ def _serialize_order(order: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(created_at, datetime):
         age_hours = round((now - created_at).total_seconds() / 3600, 1)
 
-    priority = "vip" if any(tag in {"vip", "rush"} for tag in tags) else "standard"
+    priority = order_priority(tags)
     issue = _infer_issue(raw)
     timeline = _build_timeline(raw)
 
@@ -179,136 +217,201 @@ def _serialize_order(order: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _compute_metrics(orders: Iterable[Dict[str, Any]], total_orders: int) -> Dict[str, Any]:
-    orders_list = list(orders)
-    awaiting_fulfillment = sum(1 for order in orders_list if not order.get("fulfillment_status"))
-    awaiting_tracking = sum(
-        1
-        for order in orders_list
-        if _normalize_status(order.get("fulfillment_status")) == "awaiting_tracking"
-    )
-    overdue = sum(1 for order in orders_list if _is_overdue(order))
-    avg_hours = _avg_fulfillment_hours(orders_list)
-    breaches = sum(1 for order in orders_list if _is_breach(order))
+# Additive per-order facts kept as running totals in the metrics store.
+COUNTED_FACTS = (
+    "awaiting_fulfillment",
+    "awaiting_tracking",
+    "fulfilled_timed",
+    "fulfillment_hours",
+    "refunds_due",
+    "refund_value",
+    "pending_return_count",
+)
+OVERDUE_AFTER = timedelta(hours=24)
+BREACH_AFTER = timedelta(hours=48)
+TRACKING_PENDING_AFTER = timedelta(hours=2)
+DELAYED_AFTER = timedelta(hours=24)
+SUMMARY_LIST_LIMIT = 10
+
+
+def order_facts(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Contribution of one normalized order to the control-tower metrics.
+
+    The store keeps one row of these per order; counters move by the
+    difference between an order's old and new facts, so they cover every
+    order without rescanning raw payloads.
+    """
+    raw = order.get("raw", {}) or {}
+    created_at = _as_utc(order.get("created_at"))
+    status = _normalize_status(order.get("fulfillment_status"))
+    fulfillments = raw.get("fulfillments") or []
+
+    fulfillment_hours: Optional[float] = None
+    if fulfillments and created_at:
+        fulfilled_at = _as_utc(_parse_datetime(fulfillments[0].get("created_at")))
+        if fulfilled_at:
+            fulfillment_hours = (fulfilled_at - created_at).total_seconds() / 3600
+
+    transit: List[Dict[str, Any]] = []
+    delivered: List[datetime] = []
+    for fulfillment in fulfillments:
+        shipment_status = (
+            fulfillment.get("shipment_status") or fulfillment.get("status") or ""
+        ).lower()
+        updated_at = _as_utc(
+            _parse_datetime(fulfillment.get("updated_at") or fulfillment.get("created_at"))
+        )
+        if not updated_at:
+            continue
+        if shipment_status == "delivered":
+            delivered.append(updated_at)
+        elif shipment_status in {"in_transit", "out_for_delivery"}:
+            transit.append(
+                {
+                    "carrier": fulfillment.get("tracking_company") or "Unknown",
+                    "updated_at": updated_at.isoformat(),
+                }
+            )
+
+    refunds_due = 0
+    refund_value = 0.0
+    pending_returns: List[Dict[str, Any]] = []
+    for entry in raw.get("returns") or raw.get("refunds") or []:
+        stage = entry.get("status") or entry.get("state") or "pending"
+        if stage.lower() in {"completed", "refunded"}:
+            refund_value += _sum_refund_amount(entry)
+            refunds_due += 1
+        else:
+            pending_returns.append(
+                {
+                    "stage": stage,
+                    "reason": entry.get("reason") or entry.get("note") or "",
+                    "created_at": entry.get("created_at"),
+                    "refund_amount": round(_sum_refund_amount(entry), 2),
+                }
+            )
+
+    blocked_skus: List[Dict[str, Any]] = []
+    for line in raw.get("line_items", []):
+        if (line.get("fulfillable_quantity") or 0) <= 0:
+            continue
+        if (line.get("fulfillment_status") or "").lower() == "fulfilled":
+            continue
+        blocked_skus.append(
+            {
+                "sku": line.get("sku") or f"item-{line.get('id')}",
+                "name": line.get("name") or "Unknown",
+                "on_hand": line.get("quantity") or 0,
+            }
+        )
+
+    return {
+        "order_id": order.get("id"),
+        "order_number": order.get("name") or f"#{order.get('id')}",
+        "created_at": created_at,
+        "assigned_to": order.get("assigned_to"),
+        "open": status != "fulfilled",
+        "awaiting_fulfillment": 0 if order.get("fulfillment_status") else 1,
+        "awaiting_tracking": int(status == "awaiting_tracking"),
+        "fulfilled_timed": int(fulfillment_hours is not None),
+        "fulfillment_hours": fulfillment_hours or 0.0,
+        "refunds_due": refunds_due,
+        "refund_value": refund_value,
+        "pending_return_count": len(pending_returns),
+        "pending_returns": pending_returns,
+        "blocked_skus": blocked_skus,
+        "has_fulfillments": bool(fulfillments),
+        "transit": transit,
+        "transit_since": min((_parse_datetime(t["updated_at"]) for t in transit), default=None),
+        "delivered": [ts.isoformat() for ts in delivered],
+        "last_delivered_at": max(delivered, default=None),
+    }
 
+
+def summarize_metrics(counters: Dict[str, float], overdue: int, breaches: int) -> Dict[str, Any]:
+    total_orders = int(counters.get("total_orders", 0))
+    timed = counters.get("fulfilled_timed", 0)
+    avg_hours = counters.get("fulfillment_hours", 0.0) / timed if timed else 0.0
     return {
         "total_orders": total_orders,
-        "awaiting_fulfillment": awaiting_fulfillment,
-        "awaiting_tracking": awaiting_tracking,
+        "awaiting_fulfillment": int(counters.get("awaiting_fulfillment", 0)),
+        "awaiting_tracking": int(counters.get("awaiting_tracking", 0)),
         "overdue": overdue,
         "overdue_pct": round(overdue / total_orders, 2) if total_orders else 0,
-        "avg_fulfillment_hours": avg_hours,
+        "avg_fulfillment_hours": round(avg_hours, 2),
         "breaches": breaches,
     }
 
 
-def _compute_shipments(orders: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+def summarize_shipments(
+    untracked: Iterable[Any], in_transit: Iterable[Any], delivered: Iterable[Any]
+) -> Dict[str, Any]:
+    """Rows are order-facts rows already filtered by the store's indexes."""
     now = _now()
-    tracking_pending: List[Dict[str, Any]] = []
+    tracking_pending = [
+        {
+            "order_number": row.order_number,
+            "expected_ship_date": (_as_utc(row.created_at) + timedelta(hours=24)).isoformat(),
+            "owner": row.assigned_to or "unassigned",
+        }
+        for row in untracked
+    ]
     delayed: List[Dict[str, Any]] = []
-    delivered_today = 0
-
-    for order in orders:
-        raw = order.get("raw", {}) or {}
-        fulfillments = raw.get("fulfillments") or []
-        created_at = order.get("created_at")
-
-        if not fulfillments:
-            if isinstance(created_at, datetime) and (now - created_at) > timedelta(hours=2):
-                tracking_pending.append(
+    for row in in_transit:
+        for shipment in row.transit or []:
+            updated_at = _parse_datetime(shipment.get("updated_at"))
+            if updated_at and (now - updated_at) > DELAYED_AFTER:
+                delayed.append(
                     {
-                        "order_number": order.get("name") or f"#{order.get('id')}",
-                        "expected_ship_date": (
-                            created_at + timedelta(hours=24)
-                        ).isoformat()
-                        if isinstance(created_at, datetime)
-                        else None,
-                        "owner": order.get("assigned_to") or "unassigned",
+                        "order_number": row.order_number,
+                        "carrier": shipment.get("carrier") or "Unknown",
+                        "delay_hours": round((now - updated_at).total_seconds() / 3600, 1),
+                        "last_update": updated_at.isoformat(),
                     }
                 )
-            continue
-
-        for fulfillment in fulfillments:
-            status = (fulfillment.get("shipment_status") or fulfillment.get("status") or "").lower()
-            updated_at = _parse_datetime(
-                fulfillment.get("updated_at") or fulfillment.get("created_at")
-            )
-            if status == "delivered":
-                if updated_at and updated_at.date() == now.date():
-                    delivered_today += 1
-            elif status in {"in_transit", "out_for_delivery"}:
-                if updated_at and (now - updated_at) > timedelta(hours=24):
-                    delayed.append(
-                        {
-                            "order_number": order.get("name") or f"#{order.get('id')}",
-                            "carrier": fulfillment.get("tracking_company") or "Unknown",
-                            "delay_hours": round((now - updated_at).total_seconds() / 3600, 1),
-                            "last_update": updated_at.isoformat(),
-                        }
-                    )
-
+    delivered_today = sum(
+        1
+        for row in delivered
+        for value in row.delivered or []
+        if (ts := _parse_datetime(value)) and ts.date() == now.date()
+    )
     return {
-        "tracking_pending": tracking_pending[:10],
-        "delayed": delayed[:10],
+        "tracking_pending": tracking_pending[:SUMMARY_LIST_LIMIT],
+        "delayed": delayed[:SUMMARY_LIST_LIMIT],
         "delivered_today": delivered_today,
     }
 
 
-def _compute_returns(orders: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
-    pending: List[Dict[str, Any]] = []
-    refunds_due = 0
-    refund_value = 0.0
-
-    for order in orders:
-        raw = order.get("raw", {}) or {}
-        returns = raw.get("returns") or raw.get("refunds") or []
-        for entry in returns:
-            stage = entry.get("status") or entry.get("state") or "pending"
-            if stage.lower() in {"completed", "refunded"}:
-                refund_value += _sum_refund_amount(entry)
-                refunds_due += 1
-            else:
-                pending.append(
-                    {
-                        "order_number": order.get("name") or f"#{order.get('id')}",
-                        "stage": stage,
-                        "reason": entry.get("reason") or entry.get("note") or "",
-                        "age_days": _age_days(entry.get("created_at")),
-                        "refund_amount": round(_sum_refund_amount(entry), 2),
-                    }
-                )
-
+def summarize_returns(counters: Dict[str, float], with_returns: Iterable[Any]) -> Dict[str, Any]:
+    pending = [
+        {
+            "order_number": row.order_number,
+            "stage": entry.get("stage"),
+            "reason": entry.get("reason") or "",
+            "age_days": _age_days(entry.get("created_at")),
+            "refund_amount": entry.get("refund_amount") or 0.0,
+        }
+        for row in with_returns
+        for entry in row.pending_returns or []
+    ]
     return {
-        "pending": pending[:10],
-        "refunds_due": refunds_due,
-        "refund_value_usd": round(refund_value, 2),
+        "pending": pending[:SUMMARY_LIST_LIMIT],
+        "refunds_due": int(counters.get("refunds_due", 0)),
+        "refund_value_usd": round(counters.get("refund_value", 0.0), 2),
     }
 
 
-def _compute_inventory_blocks(orders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    accumulator: Dict[str, Dict[str, Any]] = {}
-    for order in orders:
-        raw = order.get("raw", {}) or {}
-        for line in raw.get("line_items", []):
-            fulfillable = line.get("fulfillable_quantity") or 0
-            if fulfillable <= 0:
-                continue
-            status = (line.get("fulfillment_status") or "").lower()
-            if status == "fulfilled":
-                continue
-            sku = line.get("sku") or f"item-{line.get('id')}"
-            block = accumulator.setdefault(
-                sku,
-                {
-                    "sku": sku,
-                    "name": line.get("name") or "Unknown",
-                    "orders_waiting": 0,
-                    "on_hand": line.get("quantity") or 0,
-                    "eta": None,
-                },
-            )
-            block["orders_waiting"] += 1
-    return list(accumulator.values())[:10]
+def summarize_inventory_blocks(sku_rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "sku": row.sku,
+            "name": row.name,
+            "orders_waiting": row.orders_waiting,
+            "on_hand": row.on_hand,
+            "eta": None,
+        }
+        for row in sku_rows
+    ][:SUMMARY_LIST_LIMIT]
 
 
 def _shopify_cursor_hint(page_orders: Iterable[Dict[str, Any]]) -> Optional[str]:
@@ -420,6 +523,16 @@ def _stub_inventory_blocks() -> List[Dict[str, Any]]:
     ]
 
 
+def order_priority(tags: Iterable[Any]) -> str:
+    lowered = {tag.lower() for tag in tags if isinstance(tag, str)}
+    return "vip" if lowered & {"vip", "rush"} else "standard"
+
+
+def order_status(fulfillment_status: Optional[str]) -> str:
+    """Control-tower status stored on the order and used by the status filter."""
+    return _normalize_status(fulfillment_status)
+
+
 def _normalize_status(status: Optional[str]) -> str:
     if not status:
         return "awaiting_fulfillment"
@@ -431,39 +544,6 @@ def _normalize_status(status: Optional[str]) -> str:
     return status
 
 
-def _is_overdue(order: Dict[str, Any]) -> bool:
-    created_at = order.get("created_at")
-    status = _normalize_status(order.get("fulfillment_status"))
-    if not isinstance(created_at, datetime):
-        return False
-    return status != "fulfilled" and (_now() - created_at) > timedelta(hours=24)
-
-
-def _is_breach(order: Dict[str, Any]) -> bool:
-    created_at = order.get("created_at")
-    status = _normalize_status(order.get("fulfillment_status"))
-    if not isinstance(created_at, datetime):
-        return False
-    return status != "fulfilled" and (_now() - created_at) > timedelta(hours=48)
-
-
-def _avg_fulfillment_hours(orders: Iterable[Dict[str, Any]]) -> float:
-    durations: List[float] = []
-    for order in orders:
-        created_at = order.get("created_at")
-        raw = order.get("raw", {}) or {}
-        fulfillments = raw.get("fulfillments") or []
-        if not fulfillments or not isinstance(created_at, datetime):
-            continue
-        first = fulfillments[0]
-        fulfilled_at = _parse_datetime(first.get("created_at"))
-        if fulfilled_at:
-            durations.append((fulfilled_at - created_at).total_seconds() / 3600)
-    if not durations:
-        return 0.0
-    return round(sum(durations) / len(durations), 2)
-
-
 def _build_timeline(raw: Dict[str, Any]) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
     for entry in (raw.get("events") or [])[-10:]:
@@ -524,6 +604,15 @@ def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
         return None
 
 
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware UTC; naive values (e.g. read back from SQLite) are UTC."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def _sum_refund_amount(entry: Dict[str, Any]) -> float:
     total = entry.get("total_refund_amount") or entry.get("amount")
     if total is not None:
@@ -545,7 +634,7 @@ def _sum_refund_amount(entry: Dict[str, Any]) -> float:
 
 
 def _age_days(created_at: Optional[str]) -> float:
-    ts = _parse_datetime(created_at)
+    ts = _as_utc(_parse_datetime(created_at))
     if not ts:
         return 0.0
     return round((_now() - ts).total_seconds() / 86400, 2)